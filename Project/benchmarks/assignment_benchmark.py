@@ -0,0 +1,184 @@
+"""
+Times the package-to-truck assignment engine on the bundled data and on
+synthetic manifests of 1,000 - 10,000 packages.
+
+Synthetic manifests spread the packages over a few hundred stops on a 30 x
+30 mile map, with a share of them pinned to truck 2, grouped with the two
+packages before them, or delayed until 9:05. Every assignment is checked
+against the rules before it is reported. Every truck has a driver, so the
+departure times are fixed. No assignment can keep every truck under the
+longest drive the packages that must travel together force on one truck,
+reported as the bound.
+
+Run from the Project directory:
+
+    python -m benchmarks.assignment_benchmark
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import time as clock_time
+from typing import Dict, List, Sequence, Set, Tuple
+
+from constants import (
+    BR_DELAYED_UNTIL_NINE_FIVE, BR_MUST_BE_DELIVERED_WITH_PREFIX, BR_ONLY_IN_TRUCK_PREFIX,
+    DEFAULT_DELIVERY_END_TIME, DEFAULT_DELIVERY_START_SECONDS, DELAYED_START_SECONDS,
+    MAX_TRUCK_CAPACITY
+)
+from dispatch.dispatcher import Dispatcher
+from model.package import Package
+from src.truck_assignment import TruckAssignment
+
+
+def _synthetic_manifest(
+        package_count: int,
+        stop_count: int,
+        generator: random.Random
+) -> Tuple[List[Package], List[int], List[List[float]]]:
+    """
+    Builds a manifest over random stops.
+
+    Returns:
+        The packages, the stop of each package and the distance matrix, depot first.
+    """
+    points: List[Tuple[float, float]] = [
+        (generator.uniform(0, 30), generator.uniform(0, 30)) for _ in range(stop_count + 1)
+    ]
+    distances: List[List[float]] = [[math.dist(start, end) for end in points] for start in points]
+
+    packages: List[Package] = []
+    for package_id in range(1, package_count + 1):
+        draw: float = generator.random()
+        notes: str = ""
+        if draw < 0.001:
+            notes = f"{BR_ONLY_IN_TRUCK_PREFIX} 2"
+        elif draw < 0.1:
+            notes = BR_DELAYED_UNTIL_NINE_FIVE
+        elif draw < 0.13 and package_id > 2:
+            notes = f"{BR_MUST_BE_DELIVERED_WITH_PREFIX} {package_id - 1}, {package_id - 2}"
+        packages.append(Package(
+            package_id=package_id, address="", city="", state="", zipcode=0,
+            delivery_time=clock_time(10, 30) if generator.random() < 0.3 else DEFAULT_DELIVERY_END_TIME,
+            weight=1, notes=notes
+        ))
+    stops: List[int] = [generator.randint(1, stop_count) for _ in range(package_count)]
+    return packages, stops, distances
+
+
+def _check_rules(packages: Sequence[Package], loads: List[List[int]], departure_times: Sequence[int]) -> None:
+    """
+    Checks that an assignment loads every package once and keeps to the
+    capacity and the rules in the notes.
+
+    Raises:
+        AssertionError: If a rule is broken.
+    """
+    truck_of: Dict[int, int] = {
+        package_id: truck for truck, load in enumerate(loads) for package_id in load
+    }
+    assert len(truck_of) == len(packages) == sum(map(len, loads)), "packages lost or loaded twice"
+    assert max(map(len, loads)) <= MAX_TRUCK_CAPACITY, "truck over capacity"
+    for package in packages:
+        truck: int = truck_of[package.package_id]
+        if package.notes.startswith(BR_ONLY_IN_TRUCK_PREFIX):
+            assert truck + 1 == int(package.notes.split()[-1]), f"package {package.package_id} on the wrong truck"
+        elif package.notes == BR_DELAYED_UNTIL_NINE_FIVE:
+            assert departure_times[truck] >= DELAYED_START_SECONDS, f"package {package.package_id} not at depot"
+        elif package.notes.startswith(BR_MUST_BE_DELIVERED_WITH_PREFIX):
+            for other in package.notes[len(BR_MUST_BE_DELIVERED_WITH_PREFIX):].split(","):
+                assert truck_of[int(other)] == truck, f"package {package.package_id} split from {other}"
+
+
+def _unit_bound(packages: Sequence[Package], stops: Sequence[int], distances: Sequence[Sequence[float]]) -> float:
+    """
+    Gets a drive some truck has to make whatever the assignment: packages
+    that must be delivered together go on one truck, so it drives from the
+    depot to each pair of their stops and back.
+
+    Returns:
+        The miles of the longest such drive.
+    """
+    stop_of: Dict[int, int] = {package.package_id: stop for package, stop in zip(packages, stops)}
+    parent: Dict[int, int] = {}
+
+    def find(package_id: int) -> int:
+        while parent.get(package_id, package_id) != package_id:
+            package_id = parent[package_id]
+        return package_id
+
+    for package in packages:
+        if package.notes.startswith(BR_MUST_BE_DELIVERED_WITH_PREFIX):
+            for other in package.notes[len(BR_MUST_BE_DELIVERED_WITH_PREFIX):].split(","):
+                parent[find(int(other))] = find(package.package_id)
+    unit_stops: Dict[int, Set[int]] = {}
+    for package_id, stop in stop_of.items():
+        unit_stops.setdefault(find(package_id), set()).add(stop)
+
+    depot: Sequence[float] = distances[0]
+    return max(
+        depot[first] + distances[first][second] + depot[second]
+        for members in unit_stops.values()
+        for first in members
+        for second in members
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000, 10000],
+        help="Number of packages in each synthetic manifest."
+    )
+    parser.add_argument("--stops", type=int, default=300, help="Stops in each synthetic manifest.")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    dispatcher: Dispatcher = Dispatcher()
+    start: float = time.perf_counter()
+    loads: List[List[int]] = dispatcher.assign_packages_to_trucks()
+    elapsed: float = time.perf_counter() - start
+    print(f"Bundled data: {elapsed * 1e3:.2f} ms, packages per truck {[len(load) for load in loads]}")
+    print()
+
+    generator = random.Random(arguments.seed)
+    print(
+        f"{'packages':>9} {'trucks':>7} {'seconds':>9} {'est. max mi':>12} {'est. mean mi':>13} {'bound mi':>9}"
+    )
+    for size in arguments.sizes:
+        packages, stops, distances = _synthetic_manifest(size, arguments.stops, generator)
+
+        # Some slack over the minimum number of trucks; half of them wait for the delayed packages
+        truck_count: int = math.ceil(size / MAX_TRUCK_CAPACITY * 1.03)
+        departure_times: List[int] = [
+            DEFAULT_DELIVERY_START_SECONDS if truck < truck_count // 2 else DELAYED_START_SECONDS
+            for truck in range(truck_count)
+        ]
+
+        start = time.perf_counter()
+        loads = TruckAssignment.assign(
+            packages=packages,
+            stops=stops,
+            distances=distances,
+            truck_count=truck_count,
+            departure_times=departure_times,
+            driver_count=None
+        )
+        elapsed = time.perf_counter() - start
+        _check_rules(packages, loads, departure_times)
+
+        estimates: List[float] = TruckAssignment.estimated_miles(
+            loads=loads,
+            stops_by_package={package.package_id: stop for package, stop in zip(packages, stops)},
+            distances=distances
+        )
+        print(
+            f"{size:>9} {truck_count:>7} {elapsed:>9.3f} "
+            f"{max(estimates):>12.1f} {sum(estimates) / len(estimates):>13.1f} "
+            f"{_unit_bound(packages, stops, distances):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
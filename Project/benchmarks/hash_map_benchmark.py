@@ -0,0 +1,109 @@
+"""
+Compares the chaining HashMap, the OpenAddressingHashMap and the built-in
+dict at 10^3 - 10^6 keys.
+
+Run from the Project directory:
+
+    python -m benchmarks.hash_map_benchmark
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from constants import DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES
+from src.hash_map import HashMap, OpenAddressingHashMap
+
+
+def _time_operations(table: object, keys: List[int], missing_keys: List[int]) -> Dict[str, float]:
+    """
+    Times add, get, contains and remove over `keys` on a HashMap-like table.
+
+    Returns:
+        Seconds spent in each operation.
+    """
+    timings: Dict[str, float] = {}
+
+    start: float = time.perf_counter()
+    for key in keys:
+        table.add(key=key, value=key)
+    timings["add"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        table.get(key)
+    timings["get"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in missing_keys:
+        table.contains(key)
+    timings["miss"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        table.remove(key)
+    timings["remove"] = time.perf_counter() - start
+
+    return timings
+
+
+class _DictTable:
+    """Adapts a dict to the HashMap methods used by the benchmark."""
+
+    def __init__(self) -> None:
+        self.table: Dict[int, int] = {}
+
+    def add(self, key: int, value: int) -> bool:
+        self.table[key] = value
+        return True
+
+    def get(self, key: int) -> int:
+        return self.table.get(key)
+
+    def contains(self, key: int) -> bool:
+        return key in self.table
+
+    def remove(self, key: int) -> bool:
+        return self.table.pop(key, None) is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--max-chaining-keys", type=int, default=10 ** 4,
+        help="Skip the fixed-size chaining HashMap above this many keys "
+             "(it scans buckets of keys / size entries per operation)."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    tables: Dict[str, Callable[[], object]] = {
+        f"HashMap(size={DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES})": lambda: HashMap(
+            size=DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES
+        ),
+        "OpenAddressingHashMap": OpenAddressingHashMap,
+        "dict": _DictTable,
+    }
+
+    print(f"{'keys':>9} {'table':<24} {'add':>9} {'get':>9} {'miss':>9} {'remove':>9}  (ns/op)")
+    for exponent in range(3, 7):
+        count: int = 10 ** exponent
+        generator = random.Random(arguments.seed)
+        keys: List[int] = generator.sample(range(count * 10), count)
+        missing_keys: List[int] = [key + count * 10 for key in keys]
+
+        for name, factory in tables.items():
+            if name.startswith("HashMap") and count > arguments.max_chaining_keys:
+                print(f"{count:>9} {name:<24} {'skipped':>9}")
+                continue
+
+            timings = _time_operations(factory(), keys, missing_keys)
+            print(
+                f"{count:>9} {name:<24} " +
+                " ".join(f"{timings[op] / count * 1e9:>9.0f}" for op in ("add", "get", "miss", "remove"))
+            )
+
+
+if __name__ == "__main__":
+    main()
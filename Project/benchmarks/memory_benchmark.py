@@ -0,0 +1,94 @@
+"""
+Measures the memory used per package by the slotted Package model against
+the previous dict-backed model, which stored a formatted status string in
+every package.
+
+Run from the Project directory:
+
+    python -m benchmarks.memory_benchmark
+"""
+
+import argparse
+import tracemalloc
+from datetime import time
+from typing import Callable, List
+
+from constants import AT_HUB_TEXT
+from model.package import Package, PackageStatus
+from utils.clock import time_to_seconds
+
+
+class _DictPackage:
+    """The Package model before it used __slots__ and status codes."""
+
+    def __init__(self, package_id, address, city, state, zipcode, delivery_time, weight, status, notes):
+        self.package_id = package_id
+        self.address = address
+        self.city = city
+        self.state = state
+        self.zipcode = zipcode
+        self.delivery_time = delivery_time
+        self.weight = weight
+        self.status = status
+        self.notes = notes
+
+
+def _build_dict_package(package_id: int, delivered_at: time) -> _DictPackage:
+    package = _DictPackage(
+        package_id, "410 S State St", "Salt Lake City", "UT", 84111,
+        time(10, 30), 5, AT_HUB_TEXT, ""
+    )
+    package.status = f"En route for delivery on truck no. {package_id % 3 + 1}"
+    package.status = f"Package delivered at {delivered_at} from truck no. [{package_id % 3 + 1}]"
+    return package
+
+
+def _build_slotted_package(package_id: int, delivered_at: time) -> Package:
+    package = Package(
+        package_id, "410 S State St", "Salt Lake City", "UT", 84111,
+        time(10, 30), 5, PackageStatus.AT_HUB, ""
+    )
+    package.update_status(status=PackageStatus.EN_ROUTE, truck_id=package_id % 3 + 1)
+    package.update_status(
+        status=PackageStatus.DELIVERED, truck_id=package_id % 3 + 1, status_time=time_to_seconds(delivered_at)
+    )
+    return package
+
+
+def _bytes_per_package(build: Callable[[int, time], object], count: int) -> float:
+    """
+    Builds `count` delivered packages and measures the memory they hold.
+
+    Returns:
+        The average number of bytes allocated per package.
+    """
+    delivery_times: List[time] = [time(8 + minute // 60, minute % 60) for minute in range(540)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    packages = [build(package_id, delivery_times[package_id % 540]) for package_id in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Exclude the list holding the packages
+    list_bytes: int = packages.__sizeof__()
+    return (after - before - list_bytes) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packages", type=int, default=100_000)
+    arguments = parser.parse_args()
+
+    before: float = _bytes_per_package(_build_dict_package, arguments.packages)
+    after: float = _bytes_per_package(_build_slotted_package, arguments.packages)
+
+    print(f"packages:                 {arguments.packages}")
+    print(f"dict-backed, text status: {before:8.1f} bytes/package")
+    print(f"__slots__, status codes:  {after:8.1f} bytes/package")
+    print(f"saved:                    {before - after:8.1f} bytes/package "
+          f"({(before - after) / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Compares the route construction strategies on the bundled data and on
+synthetic instances of 100 - 1000 stops, with and without the 2-opt / Or-opt
+improvement pass.
+
+For the bundled data each strategy plans every truck's manifest from the
+hub and then runs the whole delivery day, reporting the miles driven, the
+time the last package was delivered and how many packages missed their
+deadline. Synthetic instances place stops uniformly on a square map and
+use straight-line distances.
+
+Run from the Project directory:
+
+    python -m benchmarks.routing_benchmark
+"""
+
+import argparse
+import math
+import random
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from constants import (
+    DELAYED_START_SECONDS, ROUTE_IMPROVEMENT_BUDGET_SECONDS, ROUTE_STRATEGIES
+)
+from dispatch.dispatcher import Dispatcher
+from model.hub import Hub
+from model.package import PackageStatus
+from src.route_construction import RouteConstruction
+from src.route_improvement import RouteImprovement
+from utils.clock import seconds_to_time, time_to_seconds
+
+
+def _manifest_matrix(dispatcher: Dispatcher, package_ids: Sequence[int]) -> List[List[float]]:
+    """
+    Builds the distance matrix between the hub and the stops of a manifest.
+
+    Returns:
+        The matrix, hub first.
+    """
+    start_hub: Hub = next(iter(dispatcher.graph.adjacency_list))
+    hubs: List[Hub] = list(dict.fromkeys(dispatcher.graph.get_hubs_by_addresses(
+        hub_addresses=[dispatcher.indexed_packages.get(package_id).address for package_id in package_ids]
+    )))
+    stops: List[Hub] = [start_hub] + hubs
+    return [[dispatcher._distance_between(start, end) for end in stops] for start in stops]
+
+
+def _run_day(
+        dispatcher: Dispatcher,
+        route_strategy: str,
+        improvement_budget: float = 0.0
+) -> Tuple[float, int, int]:
+    """
+    Runs the delivery day the way the menu does, with one route strategy.
+
+    Returns:
+        The miles driven, the time the last package was delivered in seconds
+        and the number of packages delivered after their deadline.
+    """
+    dispatcher.reset_simulation()
+    dispatcher.load_truck_with_packages(truck_id=1)
+    dispatcher.load_truck_with_packages(truck_id=2)
+    driver_times: List[int] = [
+        dispatcher.begin_delivery(
+            truck=truck, route_strategy=route_strategy, improvement_budget=improvement_budget
+        )
+        for truck in dispatcher.trucks[:2]
+    ]
+    dispatcher.load_truck_with_packages(truck_id=3)
+    dispatcher.begin_delivery(
+        truck=dispatcher.trucks[2],
+        begin_time=max(*driver_times, DELAYED_START_SECONDS),
+        route_strategy=route_strategy,
+        improvement_budget=improvement_budget
+    )
+
+    late: int = sum(
+        1 for package in dispatcher.indexed_packages
+        if package.status_code != PackageStatus.DELIVERED
+        or package.status_time > time_to_seconds(package.delivery_time)
+    )
+    return (
+        sum(truck.miles for truck in dispatcher.trucks),
+        max(truck.truck_clock for truck in dispatcher.trucks),
+        late
+    )
+
+
+def _synthetic_matrix(stops: int, generator: random.Random) -> List[List[float]]:
+    """
+    Places the depot and stops uniformly on a 100 x 100 mile map.
+
+    Returns:
+        The straight-line distance matrix, depot first.
+    """
+    points: List[Tuple[float, float]] = [
+        (generator.uniform(0, 100), generator.uniform(0, 100)) for _ in range(stops + 1)
+    ]
+    return [[math.dist(start, end) for end in points] for start in points]
+
+
+def _time_strategies(
+        distances: List[List[float]],
+        improvement_budget: float
+) -> Dict[str, Tuple[float, float, float, float]]:
+    """
+    Builds a route over `distances` with every strategy, then improves it.
+
+    Returns:
+        The route length and seconds taken by each strategy, then the
+        improved length and seconds spent improving.
+    """
+    neighbors: List[List[int]] = RouteImprovement.neighbor_lists(distances)
+    results: Dict[str, Tuple[float, float, float, float]] = {}
+    for strategy in ROUTE_STRATEGIES:
+        start: float = time.perf_counter()
+        route: List[int] = RouteConstruction.build(distances=distances, strategy=strategy)
+        elapsed: float = time.perf_counter() - start
+
+        start = time.perf_counter()
+        improved: List[int] = RouteImprovement.improve(
+            distances=distances, route=route, budget_seconds=improvement_budget, neighbors=neighbors
+        )
+        improve_elapsed: float = time.perf_counter() - start
+        results[strategy] = (
+            RouteConstruction.route_length(distances, route), elapsed,
+            RouteConstruction.route_length(distances, improved), improve_elapsed
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 500, 1000],
+        help="Number of stops in each synthetic instance."
+    )
+    parser.add_argument(
+        "--improvement-budget", type=float, default=ROUTE_IMPROVEMENT_BUDGET_SECONDS,
+        help="Seconds the improvement pass may spend on each route."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    dispatcher: Dispatcher = Dispatcher()
+
+    print("Bundled data, per truck manifest (miles, ms)")
+    print(f"{'strategy':<20} {'truck 1':>16} {'truck 2':>16} {'truck 3':>16}")
+    matrices: List[List[List[float]]] = [
+        _manifest_matrix(dispatcher, package_ids)
+        for package_ids in dispatcher.assign_packages_to_trucks()
+    ]
+    timings: List[Dict[str, Tuple[float, float, float, float]]] = [
+        _time_strategies(matrix, arguments.improvement_budget) for matrix in matrices
+    ]
+    for strategy in ROUTE_STRATEGIES:
+        print(f"{strategy:<20} " + " ".join(
+            f"{timing[strategy][0]:>7.1f} {timing[strategy][1] * 1e3:>8.2f}" for timing in timings
+        ))
+
+    print()
+    print("Bundled data, full delivery day")
+    print(f"{'strategy':<20} {'improved':<9} {'miles':>8} {'finished':>9} {'late':>5} {'seconds':>9}")
+    for strategy in ROUTE_STRATEGIES:
+        for improvement_budget in (0.0, arguments.improvement_budget):
+            start: float = time.perf_counter()
+            miles, finished, late = _run_day(dispatcher, strategy, improvement_budget)
+            elapsed: float = time.perf_counter() - start
+            print(
+                f"{strategy:<20} {'yes' if improvement_budget else 'no':<9} {miles:>8.1f} "
+                f"{seconds_to_time(finished)!s:>9} {late:>5} {elapsed:>9.3f}"
+            )
+
+    generator = random.Random(arguments.seed)
+    for size in arguments.sizes:
+        print()
+        print(f"Synthetic, {size} stops")
+        print(f"{'strategy':<20} {'miles':>10} {'seconds':>9} {'improved':>10} {'seconds':>9}")
+        results = _time_strategies(_synthetic_matrix(size, generator), arguments.improvement_budget)
+        for strategy, (miles, elapsed, improved_miles, improve_elapsed) in results.items():
+            print(f"{strategy:<20} {miles:>10.1f} {elapsed:>9.3f} {improved_miles:>10.1f} {improve_elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measures the discrete-event delivery simulation in events per second, on
+the bundled data and on synthetic days with hundreds of trucks.
+
+The bundled day is simulated with the assignment engine's loads and with
+a plan from the VRP solver. Synthetic days spread the packages over a few
+hundred stops on a 30 x 30 mile map with two drivers for every three
+trucks, and a share of the packages delayed until 9:05.
+
+Run from the Project directory:
+
+    python -m benchmarks.simulation_benchmark
+"""
+
+import argparse
+import math
+import random
+from datetime import time as clock_time
+from typing import List, Sequence, Tuple
+
+from constants import (
+    BR_DELAYED_UNTIL_NINE_FIVE, DEFAULT_DELIVERY_END_TIME, MAX_TRUCK_CAPACITY
+)
+from dispatch.dispatcher import Dispatcher
+from model.package import Package
+from src.delivery_simulation import DeliverySimulation, SimulationResult
+from src.truck_assignment import TruckAssignment
+from src.vrp_solver import VrpProblem
+from utils.clock import seconds_to_time, time_to_seconds
+
+
+def _synthetic_day(
+        package_count: int,
+        stop_count: int,
+        generator: random.Random
+) -> Tuple[List[Package], List[int], List[List[float]]]:
+    """
+    Builds a manifest over random stops.
+
+    Returns:
+        The packages, the stop of each package and the distance matrix, depot first.
+    """
+    points: List[Tuple[float, float]] = [
+        (generator.uniform(0, 30), generator.uniform(0, 30)) for _ in range(stop_count + 1)
+    ]
+    distances: List[List[float]] = [[math.dist(start, end) for end in points] for start in points]
+    packages: List[Package] = [
+        Package(
+            package_id=package_id, address="", city="", state="", zipcode=0,
+            delivery_time=clock_time(10, 30) if generator.random() < 0.3 else DEFAULT_DELIVERY_END_TIME,
+            weight=1, notes=BR_DELAYED_UNTIL_NINE_FIVE if generator.random() < 0.1 else ""
+        )
+        for package_id in range(1, package_count + 1)
+    ]
+    stops: List[int] = [generator.randint(1, stop_count) for _ in range(package_count)]
+    return packages, stops, distances
+
+
+def _late(result: SimulationResult, package_ids: Sequence[int], deadlines: Sequence[int]) -> int:
+    """
+    Counts the packages not delivered by their deadline.
+    """
+    return sum(
+        1 for package_id, deadline in zip(package_ids, deadlines)
+        if result.delivery_times.get(package_id, math.inf) > deadline
+    )
+
+
+def _print_row(label: str, result: SimulationResult, late: int, truck_count: int) -> None:
+    """
+    Prints one line of results.
+    """
+    finished: int = max((at for at in result.return_times if at is not None), default=0)
+    print(
+        f"{label:<22} {truck_count:>7} {len(result.delivery_times):>9} {late:>5} "
+        f"{sum(result.miles):>9.1f} {seconds_to_time(finished)!s:>9} {result.events:>8} "
+        f"{result.wall_seconds:>8.3f} {result.events_per_second:>11,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000],
+        help="Number of packages in each synthetic day."
+    )
+    parser.add_argument("--stops", type=int, default=300, help="Stops in each synthetic day.")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    print(
+        f"{'day':<22} {'trucks':>7} {'delivered':>9} {'late':>5} {'miles':>9} "
+        f"{'finished':>9} {'events':>8} {'seconds':>8} {'events/s':>11}"
+    )
+
+    dispatcher: Dispatcher = Dispatcher()
+    for label, solution in (("bundled, assigned", None), ("bundled, VRP plan", dispatcher.optimise_plan())):
+        dispatcher.reset_simulation()
+        result: SimulationResult = dispatcher.simulate_day(solution=solution)
+        late: int = _late(
+            result,
+            [package.package_id for package in dispatcher.indexed_packages],
+            [time_to_seconds(package.delivery_time) for package in dispatcher.indexed_packages]
+        )
+        _print_row(label, result, late, len(dispatcher.trucks))
+
+    generator = random.Random(arguments.seed)
+    for size in arguments.sizes:
+        packages, stops, distances = _synthetic_day(size, arguments.stops, generator)
+        truck_count: int = math.ceil(size / MAX_TRUCK_CAPACITY * 1.03)
+        problem: VrpProblem = VrpProblem.from_packages(
+            packages=packages,
+            stops=stops,
+            distances=distances,
+            truck_count=truck_count,
+            driver_count=math.ceil(truck_count * 2 / 3)
+        )
+        loads: Sequence[Sequence[int]] = TruckAssignment.assign(
+            packages=packages,
+            stops=stops,
+            distances=distances,
+            truck_count=truck_count,
+            driver_count=problem.driver_count
+        )
+        result = DeliverySimulation(problem=problem, loads=loads).run()
+        _print_row(
+            f"synthetic, {size}", result, _late(result, problem.package_ids, problem.deadlines), truck_count
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Runs the VRP solver on the bundled data with several seeds and drives each
+plan through the Dispatcher.
+
+For every seed the solver's best plan so far is printed each time it
+improves, then the plan is run as a full delivery day and the miles driven
+and packages delivered late are compared with the solver's own estimate.
+It then runs the same budget as a multi-start search across a process
+pool and reports the best plan of all the starts. Finally one seed is
+solved twice with a fixed number of iterations to check that the search is
+reproducible.
+
+Run from the Project directory:
+
+    python -m benchmarks.vrp_benchmark
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+from constants import VRP_BUDGET_SECONDS
+from dispatch.dispatcher import Dispatcher
+from model.package import PackageStatus
+from src.vrp_solver import VrpSolution
+from utils.clock import seconds_to_time, time_to_seconds
+
+
+def _late_packages(dispatcher: Dispatcher) -> int:
+    """
+    Counts the packages not delivered by their deadline.
+
+    Returns:
+        The number of late or undelivered packages.
+    """
+    return sum(
+        1 for package in dispatcher.indexed_packages
+        if package.status_code != PackageStatus.DELIVERED
+        or package.status_time > time_to_seconds(package.delivery_time)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument(
+        "--budget", type=float, default=VRP_BUDGET_SECONDS,
+        help="Seconds the solver may spend on each seed."
+    )
+    parser.add_argument(
+        "--replay-iterations", type=int, default=100,
+        help="Iterations to run twice when checking reproducibility."
+    )
+    parser.add_argument(
+        "--starts", type=int, default=os.cpu_count() or 1,
+        help="Independent runs for the multi-start search."
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the multi-start search.")
+    arguments = parser.parse_args()
+
+    dispatcher: Dispatcher = Dispatcher()
+    print(f"{'seed':>5} {'iterations':>11} {'plan mi':>8} {'driven mi':>10} {'late':>5} {'finished':>9}")
+    for seed in arguments.seeds:
+        start: float = time.perf_counter()
+
+        def report(solution: VrpSolution) -> None:
+            print(
+                f"      {time.perf_counter() - start:>6.3f}s  iteration {solution.iterations:>5}: "
+                f"{solution.miles:.1f} miles, {solution.lateness:.0f}s late"
+            )
+
+        dispatcher.reset_simulation()
+        solution: VrpSolution = dispatcher.optimise_plan(
+            budget_seconds=arguments.budget, seed=seed, on_improvement=report
+        )
+        finished: int = dispatcher.dispatch_plan(solution)
+        print(
+            f"{seed:>5} {solution.iterations:>11} {solution.miles:>8.1f} "
+            f"{sum(truck.miles for truck in dispatcher.trucks):>10.1f} "
+            f"{_late_packages(dispatcher):>5} {seconds_to_time(finished)!s:>9}"
+        )
+
+    print()
+    dispatcher.reset_simulation()
+    start = time.perf_counter()
+    solution = dispatcher.optimise_plan(
+        budget_seconds=arguments.budget, seed=arguments.seeds[0],
+        starts=arguments.starts, workers=arguments.workers
+    )
+    elapsed: float = time.perf_counter() - start
+    finished = dispatcher.dispatch_plan(solution)
+    print(
+        f"Best of {arguments.starts} starts in {elapsed:.2f}s: seed {solution.seed}, "
+        f"{solution.miles:.1f} plan miles, {sum(truck.miles for truck in dispatcher.trucks):.1f} driven, "
+        f"{_late_packages(dispatcher)} late, finished {seconds_to_time(finished)}"
+    )
+
+    print()
+    replays: List[VrpSolution] = []
+    for _ in range(2):
+        dispatcher.reset_simulation()
+        replays.append(dispatcher.optimise_plan(
+            budget_seconds=float("inf"), seed=arguments.seeds[0], max_iterations=arguments.replay_iterations
+        ))
+    identical: bool = replays[0].routes == replays[1].routes and replays[0].cost == replays[1].cost
+    print(
+        f"Seed {arguments.seeds[0]}, {arguments.replay_iterations} iterations twice: "
+        f"{'identical' if identical else 'DIFFERENT'} plans ({replays[0].miles:.1f} miles)"
+    )
+
+
+if __name__ == "__main__":
+    main()
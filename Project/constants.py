@@ -1,18 +1,94 @@
 from datetime import date, time
-from typing import List
+from typing import Dict, List, Tuple
+
+from utils.clock import time_to_seconds
 
 DISTANCES_CSV_FILE: str = 'data/Distances.csv'
 PACKAGES_CSV_FILE: str = 'data/Packages.csv'
+COMPILED_BUNDLE_FILE: str = 'data/Dataset.bundle'
 
 # Parser constants. Other literal strings that should be treated as constants.
 HUB_TEXT: str = "HUB"
 EOD_TEXT: str = "EOD"
+DEADLINE_CACHE_SIZE: int = 256  # distinct deadline cells remembered by the parser
 WGU_ADDRESS: str = "4001 South 700 East"
 WGU_ZIPCODE: int = 84107
+ADDRESS_ABBREVIATIONS: Dict[str, str] = {
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "lane": "ln",
+}
+
+# Graph constants
+DEFAULT_DISTANCE_MATRIX_CAPACITY: int = 32
+
+# All-pairs shortest path constants
+APSP_METHOD_AUTO: str = "auto"
+APSP_METHOD_FLOYD_WARSHALL: str = "floyd-warshall"
+APSP_METHOD_DIJKSTRA: str = "dijkstra"
+APSP_DENSE_GRAPH_THRESHOLD: float = 0.25  # fraction of hub pairs joined by an edge
+APSP_CACHE_EXTENSION: str = ".apsp"
+APSP_CACHE_MAGIC: bytes = b"WGUAPSP1"
+APSP_TASKS_PER_WORKER: int = 4  # source ranges queued per worker process
+
+# Route construction constants
+ROUTE_STRATEGY_NEAREST_NEIGHBOR: str = "nearest-neighbor"
+ROUTE_STRATEGY_CHEAPEST_INSERTION: str = "cheapest-insertion"
+ROUTE_STRATEGY_FARTHEST_INSERTION: str = "farthest-insertion"
+ROUTE_STRATEGY_SAVINGS: str = "savings"
+ROUTE_STRATEGY_CHRISTOFIDES: str = "christofides"
+ROUTE_STRATEGIES: Tuple[str, ...] = (
+    ROUTE_STRATEGY_NEAREST_NEIGHBOR, ROUTE_STRATEGY_CHEAPEST_INSERTION,
+    ROUTE_STRATEGY_FARTHEST_INSERTION, ROUTE_STRATEGY_SAVINGS,
+    ROUTE_STRATEGY_CHRISTOFIDES
+)
+
+# Route improvement constants
+ROUTE_IMPROVEMENT_BUDGET_SECONDS: float = 0.2
+ROUTE_IMPROVEMENT_NEIGHBORS: int = 10
+OR_OPT_MAX_SEGMENT_LENGTH: int = 3
+
+# Truck assignment constants
+ASSIGNMENT_MAX_ITERATIONS: int = 3
+ASSIGNMENT_CANDIDATE_TRUCKS: int = 8  # closest eligible trucks compared per unit
+ASSIGNMENT_BALANCE_WEIGHT: float = 0.5  # miles of detour traded per estimated mile of load
+
+# VRP solver constants
+VRP_BUDGET_SECONDS: float = 1.0
+VRP_DEFAULT_SEED: int = 0
+VRP_LATENESS_PENALTY: float = 1.0  # miles of cost per second past a deadline
+VRP_MIN_REMOVAL_FRACTION: float = 0.1  # share of units a destroy operator removes, at least
+VRP_MAX_REMOVAL_FRACTION: float = 0.4  # and at most
+VRP_SEGMENT_ITERATIONS: int = 50  # iterations between operator weight updates
+VRP_REACTION_FACTOR: float = 0.2  # how far weights move towards the last segment's scores
+VRP_NEW_BEST_SCORE: float = 33.0
+VRP_IMPROVED_SCORE: float = 9.0
+VRP_ACCEPTED_SCORE: float = 13.0
+VRP_START_TEMPERATURE_RATIO: float = 0.05  # of the first solution's cost
+VRP_COOLING_RATE: float = 0.999  # per iteration
+
+# Compiled bundle constants
+BUNDLE_MAGIC: bytes = b"WGUBNDL1"
 
 # Hashmap constants
 AT_HUB_TEXT: str = "AT HUB"
 DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES: int = 40
+DEFAULT_OPEN_ADDRESSING_CAPACITY: int = 64
+DEFAULT_HASH_MAP_LOAD_FACTOR: float = 0.7
+
+# Package table constants
+PACKAGE_TABLE_NUMERIC_COLUMNS: Tuple[str, ...] = (
+    "package_id", "zipcode", "weight", "deadline", "hub_index", "status"
+)
+PACKAGE_CSV_CHUNKS_PER_WORKER: int = 4  # byte ranges queued per worker process
+PACKAGE_CSV_MIN_CHUNK_BYTES: int = 1 << 20  # smaller files are parsed in one piece
 
 # Truck / Dispatch constants
 MAX_TRUCK_SPEED_PER_HOUR: float = 18.0  # mph
@@ -20,11 +96,7 @@ MAX_TRUCK_DISTANCE_PER_SECOND: float = MAX_TRUCK_SPEED_PER_HOUR / 3600.0  # mps
 MAX_NUMBER_OF_TRUCKS_TO_DISPATCH: int = 3
 MAX_NUMBER_OF_PACKAGES_TO_DELIVER: int = 40
 MAX_TRUCK_CAPACITY: int = 16
-
-# Truck constants
-TRUCK_ONE_PACKAGES: List[int] = [1, 7, 8, 13, 14, 15, 16, 19, 20, 29, 30, 34, 37, 39, 40]
-TRUCK_TWO_PACKAGES: List[int] = [2, 3, 9, 12, 17, 18, 27, 33, 35, 36, 38]
-TRUCK_THREE_PACKAGES: List[int] = [4, 5, 6, 10, 11, 21, 22, 23, 24, 25, 28, 32, 26, 31]
+MAX_NUMBER_OF_DRIVERS: int = 2
 
 # Time constants
 DELIVERY_DATE: date = date.today()
@@ -32,20 +104,24 @@ DELAYED_START_TIME: time = time(hour=9, minute=5)  # 9:05 am
 DEFAULT_DELIVERY_START_TIME: time = time(hour=8, minute=0)  # 8:00 am
 DEFAULT_DELIVERY_END_TIME: time = time(hour=17, minute=0)  # 5:00 pm
 
+# Simulation clock constants, in seconds since midnight
+DELAYED_START_SECONDS: int = time_to_seconds(DELAYED_START_TIME)
+DEFAULT_DELIVERY_START_SECONDS: int = time_to_seconds(DEFAULT_DELIVERY_START_TIME)
+DEFAULT_DELIVERY_END_SECONDS: int = time_to_seconds(DEFAULT_DELIVERY_END_TIME)
+
 # Business rules constants
 BR_TIME_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE: time = time(hour=10, minute=20)  # 10:20 am
-BR_ONLY_IN_TRUCK_TWO: str = "Can only be on truck 2"
+BR_SECONDS_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE: int = time_to_seconds(BR_TIME_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE)
 BR_WRONG_ADDRESS: str = "Wrong address listed"
 BR_RIGHT_ADDRESS: str = "410 S State St"
+# The corrected address of each package listed with a wrong one, and when it is known
+BR_ADDRESS_CORRECTIONS: Dict[int, Tuple[str, int]] = {
+    9: (BR_RIGHT_ADDRESS, BR_SECONDS_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE),
+}
 BR_DELAYED_UNTIL_NINE_FIVE: str = "Delayed on flight---will not arrive to depot until 9:05 am"
-BR_MUST_BE_DELIVERED_WITH_ONE: str = "Must be delivered with 13, 15"
-BR_MUST_BE_DELIVERED_WITH_TWO: str = "Must be delivered with 13, 19"
-BR_MUST_BE_DELIVERED_WITH_THREE: str = "Must be delivered with 15, 19"
-BR_MUST_BE_DELIVERED: List[str] = [
-    BR_MUST_BE_DELIVERED_WITH_ONE,
-    BR_MUST_BE_DELIVERED_WITH_TWO,
-    BR_MUST_BE_DELIVERED_WITH_THREE
-]
+BR_DELAYED_PREFIX: str = "Delayed on flight"
+BR_ONLY_IN_TRUCK_PREFIX: str = "Can only be on truck"
+BR_MUST_BE_DELIVERED_WITH_PREFIX: str = "Must be delivered with"
 
 # Main Menu Constants
 MM_ONE_DISPLAY_OVERALL_SUMMARY: str = "[1] Display report at end-of-day"
@@ -1,90 +1,211 @@
-from datetime import datetime, time, timedelta
-from typing import List, Optional, Tuple
+from datetime import datetime, time
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from constants import (
-    AT_HUB_TEXT, BR_DELAYED_UNTIL_NINE_FIVE,
-    BR_MUST_BE_DELIVERED, BR_MUST_BE_DELIVERED_WITH_ONE,
-    BR_MUST_BE_DELIVERED_WITH_THREE,
-    BR_MUST_BE_DELIVERED_WITH_TWO, BR_ONLY_IN_TRUCK_TWO,
-    BR_RIGHT_ADDRESS,
-    BR_TIME_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE,
-    BR_WRONG_ADDRESS, DEFAULT_DELIVERY_END_TIME,
-    DEFAULT_DELIVERY_START_TIME,
-    DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES, DELAYED_START_TIME,
-    DELIVERY_DATE,
-    MAX_NUMBER_OF_TRUCKS_TO_DISPATCH, MAX_TRUCK_CAPACITY,
-    TRUCK_ONE_PACKAGES,
-    TRUCK_THREE_PACKAGES, TRUCK_TWO_PACKAGES
+    AT_HUB_TEXT, DEFAULT_DELIVERY_END_SECONDS,
+    DEFAULT_DELIVERY_START_SECONDS,
+    DELIVERY_DATE, DISTANCES_CSV_FILE,
+    MAX_NUMBER_OF_DRIVERS, MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+    MAX_TRUCK_CAPACITY, MAX_TRUCK_DISTANCE_PER_SECOND,
+    PACKAGES_CSV_FILE, ROUTE_STRATEGIES,
+    ROUTE_STRATEGY_NEAREST_NEIGHBOR, VRP_BUDGET_SECONDS,
+    VRP_DEFAULT_SEED
 )
 
 from model.hub import Hub
-from model.package import Package
+from model.package import Package, PackageStatus
 from model.truck import Truck
+from src.bundle import CompiledBundle
+from src.delivery_simulation import DeliverySimulation, SimulationResult
+from src.business_rules import BusinessRules, PackageRules
 from src.data_loader import Loader
 from src.graph import Graph
-from src.hash_map import HashMap
+from src.multi_start import MultiStart
+from src.package_store import PackageStore
 from src.parser import Parser
+from src.route_construction import RouteConstruction
+from src.route_improvement import RouteImprovement, TimeWindow
+from src.truck_assignment import TruckAssignment
+from src.vrp_solver import VrpProblem, VrpSolution, VrpSolver
+from utils.clock import seconds_to_time, time_to_seconds
+from utils.file_fingerprint import FileFingerprint
+
+# The manifest fields of a package: address, city, state, zip code,
+# deadline, weight and notes.
+ManifestRow = Tuple[str, str, str, int, time, int, str]
 
 
 class Dispatcher:
     graph: Graph
     hubs: List[Hub]
-    indexed_packages: HashMap
+    indexed_packages: PackageStore
     trucks: List[Truck]
-    business_rules: HashMap
+    business_rules: BusinessRules
+    truck_loads: Optional[List[List[int]]]
+    source_fingerprints: Dict[str, FileFingerprint]
 
-    def __init__(self):
+    def __init__(self, bundle_file: Optional[str] = None):
         """
         Initializes a Dispatcher object.
 
-        This method initializes the Dispatcher object by parsing and loading the hubs,
-        parsing and indexing the packages, loading the graph, and preparing trucks for dispatch.
+        This method initializes the Dispatcher object by loading the graph and its hubs,
+        parsing and indexing the packages, and preparing trucks for dispatch.
 
         Args:
             self: The current instance of the class.
+            bundle_file: A compiled bundle to map instead of parsing the spreadsheets.
 
         Returns:
             None.
         """
 
-        self.hubs = self._parse_hubs()
-        self.indexed_packages = self._parse_packages()
-        self.graph = self._load_graph()
+        # Fingerprint the data files first so edits made while loading are picked up by refresh
+        self.source_fingerprints = {
+            source_file: FileFingerprint(path=source_file)
+            for source_file in (DISTANCES_CSV_FILE, PACKAGES_CSV_FILE)
+        }
+
+        bundle: Optional[CompiledBundle] = (
+            CompiledBundle(bundle_file=bundle_file) if bundle_file else None
+        )
+        self.graph = self._load_graph(bundle=bundle)
+        self.hubs = self.graph.hubs
+        self.indexed_packages = self._parse_packages(bundle=bundle)
         self.trucks = self.prep_trucks_for_dispatch()
         self.business_rules = self._provide_logistical_rules_to_dispatch()
+        self.truck_loads = None
+        self._manifest: Dict[int, ManifestRow] = {
+            package.package_id: self._manifest_row(package)
+            for package in self.indexed_packages.values()
+        }
 
-    def _parse_hubs(self):
+    def refresh(self) -> None:
         """
-        Parses and loads the hubs.
+        Gets the dispatcher ready for another run without rebuilding it.
 
-        This method initializes a hubs parser, loads the hubs from the data file,
-        and returns the loaded hubs.
+        This method checks the data files for changes and applies only what
+        changed: the graph is reloaded only if the distances file changed,
+        and package rows are compared with the last load so new packages are
+        added, edited ones are updated in place and missing ones are removed.
+        It then resets the trucks and packages to the start of the day.
 
         Args:
             self: The current instance of the class.
 
         Returns:
-            The loaded hubs.
+            None
         """
+        if self.source_fingerprints[DISTANCES_CSV_FILE].check_for_changes():
+            self.graph = self._load_graph()
+            self.hubs = self.graph.hubs
 
-        # Initialize a hubs parser
-        hubs_parser: Parser = Parser()
+        self.reset_simulation()
+
+        if self.source_fingerprints[PACKAGES_CSV_FILE].check_for_changes():
+            self._apply_package_changes(
+                packages=Loader.load_packages_from_csv(packages_parser=Parser())
+            )
 
-        # Load the hubs from the data file
-        return Loader.load_hubs_from_csv(hubs_parser=hubs_parser)
+    def reset_simulation(self) -> None:
+        """
+        Resets the trucks and packages to the start of the day.
+
+        Every package goes back to the hub with its manifest address, undoing
+        address corrections made during the last run, the trucks are
+        replaced with empty ones and the packages are assigned to trucks
+        again on the next load.
 
-    def _parse_packages(self):
+        Args:
+            self: The current instance of the class.
+
+        Returns:
+            None
+        """
+        self.trucks = self.prep_trucks_for_dispatch()
+        self.truck_loads = None
+        self.business_rules.clear_loads()
+
+        for package in self.indexed_packages.values():
+            manifest_address: str = self._manifest[package.package_id][0]
+            if package.address != manifest_address:
+                self.indexed_packages.change_address(
+                    package_id=package.package_id,
+                    address=manifest_address
+                )
+        self.indexed_packages.reset_statuses()
+
+    def _apply_package_changes(self, packages: List[Package]) -> None:
+        """
+        Applies a newly loaded manifest to the package store.
+
+        Args:
+            self: The current instance of the class.
+            packages: Every package in the new manifest.
+
+        Returns:
+            None
+        """
+        manifest: Dict[int, ManifestRow] = {
+            package.package_id: self._manifest_row(package) for package in packages
+        }
+
+        # Packages dropped from the manifest
+        for package_id in [package_id for package_id in self._manifest if package_id not in manifest]:
+            self.indexed_packages.remove(package_id)
+
+        for package in packages:
+            previous_row: Optional[ManifestRow] = self._manifest.get(package.package_id)
+            if previous_row is None:
+                # New package
+                self.indexed_packages.add(package)
+            elif previous_row != manifest[package.package_id]:
+                # Edited package, updated in place
+                stored_package: Package = self.indexed_packages.get(package.package_id)
+                if stored_package.address != package.address:
+                    self.indexed_packages.change_address(
+                        package_id=package.package_id,
+                        address=package.address
+                    )
+                if stored_package.delivery_time != package.delivery_time:
+                    self.indexed_packages.change_deadline(
+                        package_id=package.package_id,
+                        delivery_time=package.delivery_time
+                    )
+                stored_package.city = package.city
+                stored_package.state = package.state
+                stored_package.zipcode = package.zipcode
+                stored_package.weight = package.weight
+                stored_package.notes = package.notes
+
+        self._manifest = manifest
+        # Groups can span edited and unchanged packages, so the rules are compiled again
+        self.business_rules = self._provide_logistical_rules_to_dispatch()
+
+    @staticmethod
+    def _manifest_row(package: Package) -> ManifestRow:
+        """
+        Private method that gets the manifest fields of a package.
+        """
+        return (
+            package.address, package.city, package.state, package.zipcode,
+            package.delivery_time, package.weight, package.notes
+        )
+
+    def _parse_packages(self, bundle: Optional[CompiledBundle] = None):
         """
         Parses and indexes the packages.
 
         This method initializes a packages parser, loads the packages from the data file,
-        and indexes them using a hash map.
+        and indexes them in a package store.
 
         Args:
             self: The current instance of the class.
+            bundle: A compiled bundle to read the packages from instead of the data file.
 
         Returns:
-            The indexed packages stored in a hash map.
+            The indexed packages stored in a package store.
         """
+        if bundle is not None:
+            return PackageStore(packages=bundle.packages())
 
         # Initialize a packages parser
         packages_parser: Parser = Parser()
@@ -92,66 +213,44 @@ class Dispatcher:
         # Load the packages from the data file
         packages: List[Package] = Loader.load_packages_from_csv(packages_parser=packages_parser)
 
-        # Initialize a hash map to index the packages
-        indexed_packages: HashMap = HashMap(
-            size=DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES
-        )
-
-        # Index each package using its package ID
-        for package in packages:
-            indexed_packages.add(
-                key=package.package_id, value=package
-            )
-
-        # Return the indexed packages stored in the hash map
-        return indexed_packages
+        # Index each package by id, address, status, truck and deadline
+        return PackageStore(packages=packages)
 
-    def _load_graph(self):
+    def _load_graph(self, bundle: Optional[CompiledBundle] = None):
         """
         Loads the graph with hubs and distances.
 
-        This method initializes a graph object, loads the hubs into the graph,
-        and loads the distances between the hubs from the distances data file.
+        This method initializes a graph object and loads the hubs and the
+        distances between them from the distances data file, reading the
+        file once.
 
         Args:
             self: The current instance of the class.
+            bundle: A compiled bundle whose mapped distances to use instead of the data file.
 
         Returns:
             The loaded graph object.
         """
 
-        # Initialize a new graph object
-        graph = Graph()
+        # Initialize a new graph object backed by a dense distance matrix
+        graph = Graph(use_matrix=True)
 
-        # Load the hubs into the graph
-        graph = Loader.load_graph_hubs(graph=graph, hubs=self.hubs)
+        if bundle is not None:
+            graph.load_distance_matrix(bundle.distance_matrix)
+            return graph
 
-        # Load the distances between the hubs from the distances data file
-        distances_parser: Parser = Parser()
-        return Loader.load_graph_distances_from_csv(
-            graph=graph,
-            hubs=self.hubs
-        )
+        # Stream the hubs and the distances between them into the graph
+        hubs_parser: Parser = Parser()
+        return Loader.load_graph_from_csv(graph=graph, hubs_parser=hubs_parser)
 
-    def _provide_logistical_rules_to_dispatch(self) -> HashMap:
+    def _provide_logistical_rules_to_dispatch(self) -> BusinessRules:
         """
         Provides logistical rules to dispatch based on package notes.
 
         Returns:
-            HashMap: A HashMap object containing package IDs as keys and associated notes as values.
+            BusinessRules: The rules of every package, compiled from its notes.
         """
-        # Initialize a HashMap to store the business rules
-        business_rules = HashMap(
-            DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES
-        )
-
-        # Iterate over all packages in the indexed_packages
-        for package in self.indexed_packages.get_all_elements():
-            # Add package ID as key and associated notes as value to the business_rules HashMap
-            business_rules.add(key=package[1].package_id, value=package[1].notes)
-
-        # Return the populated business_rules HashMap
-        return business_rules
+        return BusinessRules(packages=self.indexed_packages.values())
 
     def prep_trucks_for_dispatch(
             self,
@@ -184,7 +283,8 @@ class Dispatcher:
         Loads packages onto a specific truck.
 
         This method takes a truck ID as input and loads the corresponding packages onto
-        the truck. The packages to load are determined based on the provided truck ID.
+        the truck. The packages are split between the trucks by the assignment engine
+        the first time a truck is loaded.
 
         Args:
             self: The current instance of the class.
@@ -195,15 +295,13 @@ class Dispatcher:
         """
 
         truck_to_load: Optional[Truck] = None
-        packages_to_load: List[int] = []
 
         # Determine the packages to load based on the truck ID
-        if truck_id == 1:
-            packages_to_load = TRUCK_ONE_PACKAGES
-        if truck_id == 2:
-            packages_to_load = TRUCK_TWO_PACKAGES
-        if truck_id == 3:
-            packages_to_load = TRUCK_THREE_PACKAGES
+        if self.truck_loads is None:
+            self.truck_loads = self.assign_packages_to_trucks()
+        packages_to_load: List[int] = (
+            self.truck_loads[truck_id - 1] if 0 < truck_id <= len(self.truck_loads) else []
+        )
 
         # Find the truck to load based on the truck ID
         for truck in self.trucks:
@@ -214,16 +312,306 @@ class Dispatcher:
         # Load the packages onto the truck
         if isinstance(truck_to_load, Truck):
             for package_number in packages_to_load:
-                package: Package = self.indexed_packages.get(key=package_number)
-                package.status = f"En route for delivery on truck no. {truck_to_load.truck_id}"
+                package: Optional[Package] = self.indexed_packages.get(key=package_number)
+                if package is None:
+                    # The package is no longer on the manifest
+                    continue
                 truck_to_load.load_truck(package=package)
+                self.business_rules.record_load(
+                    package_id=package_number,
+                    truck_id=truck_to_load.truck_id
+                )
+                self.indexed_packages.set_status(
+                    package_id=package_number,
+                    status=PackageStatus.EN_ROUTE,
+                    truck_id=truck_to_load.truck_id
+                )
+
+    def assign_packages_to_trucks(self) -> List[List[int]]:
+        """
+        Splits the packages at the hub between the trucks.
+
+        This method builds the distance matrix between the hub and every
+        package's stop and hands it to the assignment engine, which keeps
+        to the truck capacity and the business rules in the package notes.
+
+        Args:
+            self: The current instance of the class.
+
+        Returns:
+            The package IDs to load on each truck, truck 1 first.
+        """
+        packages, stops, distances, _ = self._packages_at_hub()
+        return TruckAssignment.assign(
+            packages=packages,
+            stops=stops,
+            distances=distances,
+            truck_count=len(self.trucks),
+            capacity=MAX_TRUCK_CAPACITY
+        )
+
+    def optimise_plan(
+            self,
+            budget_seconds: float = VRP_BUDGET_SECONDS,
+            seed: int = VRP_DEFAULT_SEED,
+            max_iterations: Optional[int] = None,
+            on_improvement: Optional[Callable[[VrpSolution], None]] = None,
+            starts: int = 1,
+            workers: Optional[int] = None
+    ) -> VrpSolution:
+        """
+        Plans the loads and stop order of every truck together.
+
+        This method hands the packages at the hub to the VRP solver, which
+        searches for the plan with the fewest miles that keeps to the
+        deadlines, the truck capacity, the number of drivers and the
+        business rules in the package notes. With several starts the solver
+        runs once per seed across a process pool within the same budget and
+        the best plan is kept.
+
+        Args:
+            self: The current instance of the class.
+            budget_seconds: How long the solver may search for.
+            seed: Seeds the solver; the same seed and max_iterations give the same plan.
+                Multiple starts use the seeds from `seed` up.
+            max_iterations: Stop after this many iterations even if there is time left.
+            on_improvement: Called with the best plan so far every time it improves.
+                With multiple starts it is called as finished runs beat the best one so far.
+            starts: The number of independent runs.
+            workers: The number of processes for multiple starts, one per CPU if not given.
+
+        Returns:
+            The best plan found, to run with `dispatch_plan`.
+        """
+        problem, _ = self._vrp_problem()
+        if starts > 1:
+            return MultiStart.solve(
+                problem=problem,
+                seeds=range(seed, seed + starts),
+                budget_seconds=budget_seconds,
+                max_iterations=max_iterations,
+                workers=workers,
+                on_improvement=on_improvement
+            )
+        return VrpSolver(problem=problem, seed=seed).solve(
+            budget_seconds=budget_seconds,
+            max_iterations=max_iterations,
+            on_improvement=on_improvement
+        )
+
+    def dispatch_plan(
+            self,
+            solution: VrpSolution,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS
+    ) -> int:
+        """
+        Loads the trucks and runs the delivery day as a plan says.
+
+        The first trucks leave when the plan says. Every other truck waits
+        for the first driver back at the hub as well, in case the day runs
+        behind the plan.
+
+        Args:
+            self: The current instance of the class.
+            solution: A plan from `optimise_plan`.
+            end_time: The end time for delivery in seconds (default: 5:00 PM).
+
+        Returns:
+            The time the last truck finished, in seconds.
+        """
+        self.truck_loads = solution.loads
+        driver_times: List[int] = []
+        finish_times: List[int] = []
+        for truck, route, departure_time in zip(self.trucks, solution.routes, solution.departure_times):
+            if departure_time is None:
+                continue
+            self.load_truck_with_packages(truck_id=truck.truck_id)
+            if len(driver_times) >= MAX_NUMBER_OF_DRIVERS:
+                departure_time = max(departure_time, driver_times.pop(driver_times.index(min(driver_times))))
+            finish_time: int = self.begin_delivery(
+                truck=truck,
+                begin_time=departure_time,
+                end_time=end_time,
+                planned_route=list(dict.fromkeys(self.graph.get_hubs_by_addresses(
+                    hub_addresses=[
+                        self._planned_address(package=self.indexed_packages.get(package_id))
+                        for package_id in route
+                    ]
+                )))
+            )
+            driver_times.append(finish_time)
+            finish_times.append(finish_time)
+        return max(finish_times, default=DEFAULT_DELIVERY_START_SECONDS)
+
+    def simulate_day(
+            self,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS,
+            solution: Optional[VrpSolution] = None
+    ) -> SimulationResult:
+        """
+        Runs the delivery day as a discrete-event simulation.
+
+        Unlike loading and starting the trucks one after another, every
+        truck moves at once in simulated time: drivers swap onto waiting
+        trucks the moment they get back, delayed packages and the corrected
+        address of a package come in as events, and trucks drive back to
+        the hub when they are done. The trucks and packages are left as the
+        day stood at `end_time`, ready for the usual reports.
+
+        Args:
+            self: The current instance of the class.
+            end_time: The time to stop the day at, in seconds (default: 5:00 PM).
+            solution: A plan from `optimise_plan` to follow; without one the
+                trucks carry the assignment engine's loads and drive to the
+                nearest stop each time.
+
+        Returns:
+            What happened, including the number of events handled per second.
+        """
+        problem, redirects = self._vrp_problem(end_time=end_time)
+        if solution is not None:
+            self.truck_loads = solution.loads
+        elif self.truck_loads is None:
+            self.truck_loads = self.assign_packages_to_trucks()
+
+        result: SimulationResult = DeliverySimulation(
+            problem=problem,
+            loads=self.truck_loads,
+            routes=solution.routes if solution is not None else None,
+            redirects=redirects
+        ).run()
+        self._apply_simulation(result)
+        return result
+
+    def _apply_simulation(self, result: SimulationResult) -> None:
+        """
+        Private method that brings the trucks and packages up to where a
+        simulated day left them.
+
+        Args:
+            self: The current instance of the class.
+            result: The simulated day.
+
+        Returns:
+            None
+        """
+        for index, truck in enumerate(self.trucks[:len(result.departure_times)]):
+            if result.departure_times[index] is None:
+                continue
+            self.load_truck_with_packages(truck_id=truck.truck_id)
+            truck.miles = result.miles[index]
+            truck.truck_clock = result.departure_times[index]
+            truck.status = "Out on deliveries"
+
+        for package_id in result.address_changes:
+            rules: Optional[PackageRules] = self.business_rules.get(package_id)
+            package: Optional[Package] = self.indexed_packages.get(package_id)
+            if package is not None and rules is not None and package.address != rules.new_address:
+                self.indexed_packages.change_address(package_id=package_id, address=rules.new_address)
+
+        for package_id, delivery_time in sorted(result.delivery_times.items(), key=lambda item: item[1]):
+            truck: Truck = self.trucks[result.delivered_by[package_id]]
+            truck.truck_clock = delivery_time
+            self.indexed_packages.set_status(
+                package_id=package_id,
+                status=PackageStatus.DELIVERED,
+                truck_id=truck.truck_id,
+                status_time=delivery_time
+            )
+            truck.deliver_package(package=self.indexed_packages.get(package_id), packages_delivered=[])
+
+        for index, return_time in enumerate(result.return_times):
+            if return_time is not None:
+                self.trucks[index].truck_clock = return_time
+                self.trucks[index].status = AT_HUB_TEXT
+
+    def _vrp_problem(
+            self,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS
+    ) -> Tuple[VrpProblem, Dict[int, int]]:
+        """
+        Private method that describes the packages at the hub as a
+        VrpProblem for the solver and the simulation.
+
+        Args:
+            self: The current instance of the class.
+            end_time: When the last delivery must be made, in seconds.
+
+        A package with a corrected address is planned to its corrected stop;
+        it cannot be handed over before the correction comes through anyway.
+
+        Returns:
+            The problem, and the stop each package with a corrected address
+            really goes to, by package id.
+        """
+        packages, stops, distances, redirects = self._packages_at_hub()
+        problem: VrpProblem = VrpProblem.from_packages(
+            packages=packages,
+            stops=[redirects.get(package.package_id, stop) for package, stop in zip(packages, stops)],
+            distances=distances,
+            truck_count=len(self.trucks),
+            driver_count=MAX_NUMBER_OF_DRIVERS,
+            capacity=MAX_TRUCK_CAPACITY,
+            speed=MAX_TRUCK_DISTANCE_PER_SECOND,
+            end_time=end_time
+        )
+        return problem, redirects
+
+    def _packages_at_hub(self) -> Tuple[List[Package], List[int], List[List[float]], Dict[int, int]]:
+        """
+        Private method that gets the packages still at the hub, the
+        distance matrix index of each one's stop and the distance matrix,
+        with the start hub first. The hubs of corrected addresses are in
+        the matrix too.
+
+        Args:
+            self: The current instance of the class.
+
+        Returns:
+            The packages, their stops, the distance matrix and the stop of
+            each corrected address by package id.
+        """
+        start_hub: Hub = next(iter(self.graph.adjacency_list))
+        packages: List[Package] = [
+            package for package in self.indexed_packages.values()
+            if package.status_code == PackageStatus.AT_HUB
+        ]
+        package_hubs: List[Optional[Hub]] = self.graph.get_hubs_by_addresses(
+            hub_addresses=[package.address for package in packages]
+        )
+
+        redirected: List[Package] = [
+            package for package in packages
+            if (self.business_rules.get(package.package_id) or PackageRules()).new_address is not None
+        ]
+        redirect_hubs: List[Optional[Hub]] = self.graph.get_hubs_by_addresses(
+            hub_addresses=[self.business_rules.get(package.package_id).new_address for package in redirected]
+        )
+
+        # Packages for addresses without a hub are treated as staying at the start hub
+        stops: List[Hub] = list(dict.fromkeys(
+            [start_hub] + [hub for hub in package_hubs + redirect_hubs if hub]
+        ))
+        stop_indexes: Dict[Hub, int] = {hub: index for index, hub in enumerate(stops)}
+        return (
+            packages,
+            [stop_indexes[hub] if hub else 0 for hub in package_hubs],
+            self._distance_rows(stops),
+            {
+                package.package_id: stop_indexes[hub] if hub else 0
+                for package, hub in zip(redirected, redirect_hubs)
+            }
+        )
 
     def begin_delivery(
             self,
             truck: Truck,
-            begin_time=DEFAULT_DELIVERY_START_TIME,
-            end_time=DEFAULT_DELIVERY_END_TIME
-    ):
+            begin_time: int = DEFAULT_DELIVERY_START_SECONDS,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS,
+            route_strategy: str = ROUTE_STRATEGY_NEAREST_NEIGHBOR,
+            improvement_budget: float = 0.0,
+            planned_route: Optional[List[Hub]] = None
+    ) -> int:
         """
         Begins the delivery process for a truck.
 
@@ -232,11 +620,19 @@ class Dispatcher:
         determines the route to deliver the packages, and updates the truck's status,
         location, and time during the delivery process.
 
+        All times are whole seconds since midnight.
+
         Args:
             self: The current instance of the class.
             truck: The truck to begin delivery.
-            begin_time: The begin time for delivery (default: 8:00 AM).
-            end_time: The end time for delivery (default: 5:00 PM).
+            begin_time: The begin time for delivery in seconds (default: 8:00 AM).
+            end_time: The end time for delivery in seconds (default: 5:00 PM).
+            route_strategy: How to order the stops, one of the ROUTE_STRATEGY_* constants
+                (default: nearest neighbor, chosen one stop at a time while driving).
+            improvement_budget: Seconds to spend shortening the planned route with
+                2-opt and Or-opt moves, or 0 to drive the route as constructed.
+            planned_route: The hubs to visit in order, e.g. from `optimise_plan`, to
+                drive instead of planning a route here.
 
         Returns:
             The current time when the truck is at the hub or the end time if the delivery is complete.
@@ -250,81 +646,152 @@ class Dispatcher:
             return begin_time
 
         # Sort the packages by delivery deadline
-        truck.packages = sorted(truck.packages, key=lambda package: package.delivery_time)
+        truck.packages.sort(key=lambda package: package.delivery_time)
+        delivery_order: Dict[int, int] = {
+            package.package_id: position for position, package in enumerate(truck.packages)
+        }
 
-        # Get the hubs to deliver the packages
-        hubs_to_deliver: List[Hub] = [
-            self.graph.get_hub_by_address(
-                hub_address=package.address
-            ) for package in truck.packages
-        ]
-
-        # Initialize the current location and time
+        # Initialize the current location
         start_loc: Hub = next(iter(self.graph.adjacency_list))
         current_location: Hub = start_loc
-        current_time: time = begin_time
+
+        follow_plan: bool = (
+            planned_route is not None
+            or route_strategy != ROUTE_STRATEGY_NEAREST_NEIGHBOR
+            or improvement_budget > 0
+        )
+
+        # Get the hubs to deliver the packages, visiting each hub once, in route order.
+        # A planned route goes to corrected addresses from the start, as the truck
+        # could never hand a package over at its wrong one.
+        truck_hubs: List[Hub] = list(dict.fromkeys(self.graph.get_hubs_by_addresses(
+            hub_addresses=[
+                self._planned_address(package=package) if follow_plan else package.address
+                for package in truck.packages
+            ]
+        )))
+        if planned_route is not None:
+            # Hubs the plan left out are visited after it
+            hubs_to_deliver: List[Hub] = list(dict.fromkeys(planned_route + truck_hubs))
+        else:
+            hubs_to_deliver = self.plan_route(
+                start_hub=current_location,
+                hubs=truck_hubs,
+                route_strategy=route_strategy,
+                improvement_budget=improvement_budget,
+                truck=truck,
+                start_time=begin_time
+            )
+
+        # Initialize the time
+        current_time: int = begin_time
         retry_hubs: List[Hub] = []
         packages_delivered: List[Package] = []
         # Initialize the remaining time
-        remaining_time = self.calculate_remaining_time(
+        remaining_time: int = self.calculate_remaining_time(
             start_time=begin_time,
             end_time=end_time
         )
 
         # While there are still packages to deliver and there is still time remaining
         validation_passes: bool = True
+        delivered_since_retry: bool = False
         while hubs_to_deliver and remaining_time > 0:
-            # Find the next nearest hub to deliver a package
-            next_hub, distance = self.next_nearest_hub(
-                current_hub=current_location,
-                unvisited_queue=hubs_to_deliver
-            )
+            # Drive to corrected addresses once dispatch has sent them
+            for corrected_hub in self._correct_addresses(truck=truck, current_time=current_time):
+                if corrected_hub not in hubs_to_deliver:
+                    hubs_to_deliver.append(corrected_hub)
+
+            # Find the next hub to deliver a package
+            if follow_plan:
+                next_hub = hubs_to_deliver.pop(0)
+                distance = self._distance_between(current_location, next_hub)
+            else:
+                next_hub, distance = self.next_nearest_hub(
+                    current_hub=current_location,
+                    unvisited_queue=hubs_to_deliver
+                )
 
             # If there is enough time remaining to deliver the next package
             seconds_to_drive_to_next_hub: float = distance / truck.speed
             if remaining_time >= seconds_to_drive_to_next_hub:
-                # Deliver the next package
-                for package in truck.packages:
-                    temp_hub: Hub = self.graph.get_hub_by_address(
-                        hub_address=package.address
-                    )
-                    if (temp_hub.address == next_hub.address):
-                        # Drive to the next package
-                        if self._is_package_deliverable(
-                                package=package,
-                                truck=truck,
-                                packages_delivered=packages_delivered,
-                                time_to_get_to_destination=int(seconds_to_drive_to_next_hub)
-                        ):
-                            truck.update_miles_driven(miles_traveled=distance)
-                            current_time, elapsed_time = truck.update_truck_clock(
-                                distance_traveled=distance,
-                                current_clock=current_time
-                            )
-                            remaining_time -= elapsed_time
-                            truck.deliver_package(
-                                package=package,
-                                packages_delivered=packages_delivered
-                            )
-                            # Distance must be reset in case we have to drop off multiple
-                            # packages at the same location.
-                            distance = 0
-                        else:
-                            validation_passes = False
-
-                # Update the current location and time
-                if validation_passes:
+                # Deliver the packages on this truck that are addressed to the next hub
+                delivered_at_hub: bool = False
+                for package in self._packages_to_drop_off(
+                        truck=truck,
+                        hub=next_hub,
+                        delivery_order=delivery_order
+                ):
+                    # Drive to the next package
+                    if self._is_package_deliverable(
+                            package=package,
+                            truck=truck,
+                            current_time=current_time
+                    ):
+                        truck.update_miles_driven(miles_traveled=distance)
+                        current_time, elapsed_time = truck.update_truck_clock(
+                            distance_traveled=distance,
+                            current_clock=current_time
+                        )
+                        remaining_time -= elapsed_time
+                        self.indexed_packages.set_status(
+                            package_id=package.package_id,
+                            status=PackageStatus.DELIVERED,
+                            truck_id=truck.truck_id,
+                            status_time=current_time
+                        )
+                        truck.deliver_package(
+                            package=package,
+                            packages_delivered=packages_delivered
+                        )
+                        # Distance must be reset in case we have to drop off multiple
+                        # packages at the same location.
+                        distance = 0
+                        delivered_at_hub = True
+                    else:
+                        validation_passes = False
+
+                # The truck only moves when it drops something off
+                if delivered_at_hub:
                     current_location = next_hub
-                else:
+                    delivered_since_retry = True
+
+                if not validation_passes:
                     # When validation fails, we want to add the hub to the end of the queue.
                     retry_hubs.append(next_hub)
                     validation_passes = True
 
                 if retry_hubs and not hubs_to_deliver:
+                    if not delivered_since_retry:
+                        # Nothing could be delivered since the last retry, so the driver
+                        # waits until the next rule holding a package back is lifted.
+                        release_time: Optional[int] = self._next_release_time(
+                            truck=truck, current_time=current_time
+                        )
+                        if release_time is None:
+                            break
+                        waiting_time: int = self.calculate_remaining_time(
+                            start_time=current_time, end_time=release_time
+                        )
+                        if waiting_time > remaining_time:
+                            break
+                        remaining_time -= waiting_time
+                        current_time = release_time
+                        truck.truck_clock = release_time
+
                     # Our current queue has been exhausted but if there are hubs to retry
                     # We will add them here to give the driver an opportunity to pass by again.
+                    delivered_since_retry = False
                     while retry_hubs:
                         hubs_to_deliver.append(retry_hubs.pop(0))
+                    hubs_to_deliver = self.plan_route(
+                        start_hub=current_location,
+                        hubs=hubs_to_deliver,
+                        route_strategy=route_strategy,
+                        improvement_budget=improvement_budget,
+                        truck=truck,
+                        start_time=current_time
+                    )
             else:
                 truck.status = AT_HUB_TEXT
                 return current_time
@@ -334,29 +801,196 @@ class Dispatcher:
         packages_delivered.clear()
         return current_time
 
-    def calculate_remaining_time(self, start_time: time, end_time: time) -> float:
+    def _packages_to_drop_off(
+            self,
+            truck: Truck,
+            hub: Hub,
+            delivery_order: Dict[int, int]
+    ) -> List[Package]:
+        """
+        Finds the packages a truck still has to deliver at a hub.
+
+        This method looks the hub's address up in the package store's address
+        index, so it only looks at the packages going to that stop.
+
+        Args:
+            self: The current instance of the class.
+            truck: The truck making the stop.
+            hub: The hub the truck is stopping at.
+            delivery_order: Each package's position in the truck's deadline-sorted load.
+
+        Returns:
+            The packages to drop off, in the truck's deadline order.
         """
-        Calculates the time difference between two time values.
+        on_truck: Set[int] = self.indexed_packages.ids_on_truck(truck.truck_id)
+        packages: List[Package] = [
+            self.indexed_packages.get(package_id)
+            for package_id in self.indexed_packages.ids_at_address(hub.address)
+            if package_id in on_truck and
+            self.indexed_packages.status_of(package_id) is PackageStatus.EN_ROUTE
+        ]
+        packages.sort(key=lambda package: delivery_order[package.package_id])
+        return packages
 
-        This method takes the start time and end time as input and calculates
-        the time difference between them in seconds.
+    def _correct_addresses(self, truck: Truck, current_time: int) -> List[Hub]:
+        """
+        Private method that gives the packages on a truck whose corrected
+        address is known by `current_time` their new address.
 
         Args:
             self: The current instance of the class.
-            start_time: The start time.
-            end_time: The end time.
+            truck: The truck carrying the packages.
+            current_time: The truck's current time in seconds.
+
+        Returns:
+            The hubs of the addresses that changed.
+        """
+        new_addresses: List[str] = []
+        for package_id in self.indexed_packages.ids_on_truck(truck.truck_id):
+            rules: Optional[PackageRules] = self.business_rules.get(package_id)
+            if (
+                    rules is None
+                    or rules.new_address is None
+                    or current_time < rules.address_change_at
+                    or self.indexed_packages.status_of(package_id) is not PackageStatus.EN_ROUTE
+            ):
+                continue
+            if self.indexed_packages.get(package_id).address != rules.new_address:
+                self.indexed_packages.change_address(package_id=package_id, address=rules.new_address)
+                new_addresses.append(rules.new_address)
+        return [hub for hub in self.graph.get_hubs_by_addresses(hub_addresses=new_addresses) if hub]
+
+    def _next_release_time(self, truck: Truck, current_time: int) -> Optional[int]:
+        """
+        Finds the earliest time after `current_time` at which a business rule
+        stops holding back one of the packages still on a truck.
+
+        Args:
+            self: The current instance of the class.
+            truck: The truck that is waiting.
+            current_time: The truck's current time in seconds.
+
+        Returns:
+            The release time in seconds, or None if waiting would not help any package.
+        """
+        future_release_times: List[int] = [
+            release_time
+            for release_time in (self.business_rules.hold_until(package.package_id) for package in truck.packages)
+            if release_time is not None and release_time > current_time
+        ]
+        return min(future_release_times) if future_release_times else None
+
+    def calculate_remaining_time(self, start_time: int, end_time: int) -> int:
+        """
+        Calculates the time difference between two clock readings.
+
+        Args:
+            self: The current instance of the class.
+            start_time: The start time in seconds since midnight.
+            end_time: The end time in seconds since midnight.
 
         Returns:
             The time difference between the start time and end time in seconds.
         """
+        return end_time - start_time
+
+    def plan_route(
+            self,
+            start_hub: Hub,
+            hubs: List[Hub],
+            route_strategy: str = ROUTE_STRATEGY_NEAREST_NEIGHBOR,
+            improvement_budget: float = 0.0,
+            truck: Optional[Truck] = None,
+            start_time: int = DEFAULT_DELIVERY_START_SECONDS
+    ) -> List[Hub]:
+        """
+        Orders the hubs to visit from a starting hub.
+
+        This method builds the distance matrix between the starting hub and
+        the hubs once and hands it to a route construction strategy. Nearest
+        neighbor routes are chosen one stop at a time while driving, so for
+        that strategy the hubs are returned as they are unless the route is
+        also to be improved.
+
+        The improvement pass keeps the truck's deadlines: each hub must be
+        reached before the earliest deadline of the truck's packages there,
+        and not before the business rules release all of them. Packages with
+        a corrected address are timed at the hub of the corrected address.
+
+        Args:
+            self: The current instance of the class.
+            start_hub: The hub the truck leaves from.
+            hubs: The hubs to visit.
+            route_strategy: One of the ROUTE_STRATEGY_* constants.
+            improvement_budget: Seconds to spend improving the route, or 0 to skip it.
+            truck: The truck driving the route, whose packages set the time windows.
+            start_time: When the truck leaves the starting hub, in seconds.
+
+        Returns:
+            The hubs in visiting order.
+        """
+        if route_strategy not in ROUTE_STRATEGIES:
+            raise ValueError(f"Unknown route strategy {route_strategy!r}")
+        if (route_strategy == ROUTE_STRATEGY_NEAREST_NEIGHBOR and improvement_budget <= 0) or len(hubs) < 2:
+            return list(hubs)
+
+        stops: List[Hub] = [start_hub] + hubs
+        distances: List[List[float]] = self._distance_rows(stops)
+        route: List[int] = RouteConstruction.build(distances=distances, strategy=route_strategy)
+
+        if improvement_budget > 0:
+            route = RouteImprovement.improve(
+                distances=distances,
+                route=route,
+                time_windows=self._time_windows(stops=stops, truck=truck) if truck else None,
+                start_time=start_time,
+                speed=truck.speed if truck else MAX_TRUCK_DISTANCE_PER_SECOND,
+                budget_seconds=improvement_budget
+            )
+        return [hubs[stop - 1] for stop in route]
+
+    def _time_windows(self, stops: List[Hub], truck: Truck) -> List[Optional[TimeWindow]]:
+        """
+        Private method that gets the time window of each stop from the
+        deadlines and business rules of the packages a truck carries there.
+
+        Args:
+            self: The current instance of the class.
+            stops: The stops in distance matrix order.
+            truck: The truck carrying the packages.
+
+        Returns:
+            The window of each stop, or None for stops with no packages.
+        """
+        windows: Dict[Hub, TimeWindow] = {}
+        packages: List[Package] = list(truck.packages)
+        for hub, package in zip(
+                self.graph.get_hubs_by_addresses(
+                    hub_addresses=[self._planned_address(package=package) for package in packages]
+                ),
+                packages
+        ):
+            ready: int = self.business_rules.hold_until(package.package_id) or 0
+            due: int = time_to_seconds(package.delivery_time)
+            if hub in windows:
+                ready = max(ready, windows[hub][0])
+                due = min(due, windows[hub][1])
+            windows[hub] = (ready, due)
+        return [windows.get(stop) for stop in stops]
+
+    def _planned_address(self, package: Package) -> str:
+        """
+        Private method that gets the address a planned route takes a package
+        to: its corrected address if it has one, otherwise its own.
 
-        # Combine the delivery date with the start and end times
-        start_date: datetime = datetime.combine(DELIVERY_DATE, start_time)
-        end_date: datetime = datetime.combine(DELIVERY_DATE, end_time)
+        Args:
+            self: The current instance of the class.
+            package: The package.
 
-        # Calculate the time difference in seconds
-        time_diff: timedelta = end_date - start_date
-        return time_diff.total_seconds()
+        Returns:
+            The address.
+        """
+        return (self.business_rules.get(package.package_id) or PackageRules()).new_address or package.address
 
     def next_nearest_hub(
             self,
@@ -382,54 +1016,49 @@ class Dispatcher:
 
         # Initialize variables
         smallest_distance_index: int = 0
-        initial_shortest_distance: float = self.graph.distance.get(
-            (current_hub, unvisited_queue[smallest_distance_index])
+        initial_shortest_distance: float = self._distance_between(
+            current_hub, unvisited_queue[smallest_distance_index]
         )
 
         # Find the next nearest hub
         for i, next_hub in enumerate(unvisited_queue[1:], start=1):
-            next_shortest_distance: float = self.graph.distance.get(
-                (current_hub, next_hub)
-            )
-            if initial_shortest_distance is None:
-                print(initial_shortest_distance)
-            if (
-                    next_shortest_distance is not None and
-                    next_shortest_distance < initial_shortest_distance
-            ):
+            next_shortest_distance: float = self._distance_between(current_hub, next_hub)
+            if next_shortest_distance < initial_shortest_distance:
                 initial_shortest_distance = next_shortest_distance
                 smallest_distance_index = i
 
-        # Get the distance to travel to the next nearest hub
-        distance_to_travel: float = self.graph.distance.get(
-            (current_hub, unvisited_queue[smallest_distance_index])
-        )
+        # Get the next nearest hub and the distance to travel to it
+        return unvisited_queue.pop(smallest_distance_index), initial_shortest_distance
 
-        if distance_to_travel is None:
-            # We are at the last delivery stop, so we will deliver it here.
-            return unvisited_queue.pop(smallest_distance_index), 0
-        else:
-            return unvisited_queue.pop(smallest_distance_index), distance_to_travel
+    def _distance_between(self, start_hub: Hub, end_hub: Hub) -> float:
+        """
+        Gets the distance to drive between two hubs.
 
-    def _add_shortest_paths_to_graph(self) -> None:
+        Args:
+            self: The current instance of the class.
+            start_hub: The hub the truck is at.
+            end_hub: The hub the truck is driving to.
+
+        Returns:
+            The distance between the hubs, zero if they are the same hub, or
+            infinity if the distance is unknown.
         """
-        Adds shortest paths to the graph.
+        if start_hub is end_hub:
+            return 0.0
+        return self.graph.get_distance(start_hub=start_hub, end_hub=end_hub)
 
-        This method iterates over each hub in the graph's adjacency list and
-        computes the shortest paths using Dijkstra's algorithm from the current hub
-        to all other hubs in the graph. The shortest paths are added to the graph.
+    def _distance_rows(self, stops: List[Hub]) -> List[List[float]]:
+        """
+        Private method that builds the distance matrix between some hubs.
 
         Args:
             self: The current instance of the class.
+            stops: The hubs, in matrix order.
 
         Returns:
-            None
+            The distance between every pair of the hubs.
         """
-
-        # Iterate over hubs in the graph's adjacency list
-        for hub in self.graph.adjacency_list:
-            # Compute the shortest paths using Dijkstra's algorithm from the current hub
-            self.graph.dijkstra_shortest_path(start_hub=hub)
+        return [[self._distance_between(start, end) for end in stops] for start in stops]
 
     def clear_out_trucks(self):
         """
@@ -483,7 +1112,7 @@ class Dispatcher:
         # Clear the indexed package dictionary
         self.indexed_packages.clear()
 
-    def end_delivery_report(self, end_time: Optional[time] = None):
+    def end_delivery_report(self, end_time: Optional[int] = None):
         """
         Generates and displays the end of delivery report.
 
@@ -494,13 +1123,15 @@ class Dispatcher:
 
         Args:
             self: The current instance of the class.
+            end_time: The time the report was run for in seconds, used for
+                trucks that have not delivered anything yet.
         Returns:
             None
         """
 
         # Initialize variables
         total_distance: float = 0.0
-        truck_times: List[datetime] = []
+        truck_times: List[int] = []
 
         # Display package status
         self.indexed_packages.display_package_status()
@@ -508,8 +1139,9 @@ class Dispatcher:
         # Iterate over trucks
         for truck in self.trucks:
             # Track truck clock times
-            if not isinstance(truck.truck_clock, datetime) and end_time is not None:
-                truck_times.append(datetime.combine(truck.truck_clock.today(), end_time))
+            if truck.truck_clock is None:
+                if end_time is not None:
+                    truck_times.append(end_time)
             else:
                 truck_times.append(truck.truck_clock)
 
@@ -523,98 +1155,53 @@ class Dispatcher:
         print(f"Total distance traveled: {round(total_distance, 2)} miles.")
 
         # Print the latest truck time as the delivery completion time
-        print(f"All delivery procedures have ended as of {max(truck_times)}")
+        completion_time: datetime = datetime.combine(DELIVERY_DATE, seconds_to_time(max(truck_times)))
+        print(f"All delivery procedures have ended as of {completion_time}")
 
     def _is_package_deliverable(
             self,
             package: Package,
             truck: Truck,
-            packages_delivered: List[Package],
-            time_to_get_to_destination: int
+            current_time: int
     ) -> bool:
         """
         Checks if a package is deliverable based on business rules.
 
         This method checks if a package is deliverable based on the business rules defined
-        for the package. It takes into account the package, the truck, the list of packages
-        already delivered, and the time it takes to get to the destination.
+        for the package. It takes into account the package, the truck and the truck's
+        current time; whether the packages it must go with were loaded on the truck
+        is looked up in the business rules.
 
         Args:
             self: The current instance of the class.
             package: The package to be checked for deliverability.
             truck: The truck carrying the package.
-            packages_delivered: The list of packages already delivered.
-            time_to_get_to_destination: The time it takes to get to the destination in seconds.
+            current_time: The truck's current time in seconds since midnight.
 
         Returns:
             bool: True if the package is deliverable, False otherwise.
         """
 
-        rule: str = self.business_rules.get(package.package_id)
+        rules: Optional[PackageRules] = self.business_rules.get(package.package_id)
 
         # There are no special notes. We can deliver this.
-        if not rule:
+        if rules is None:
             return True
 
-        # Package has been delayed until 9:05 am.  We cannot deliver until after
-        # that time.
-        if rule == BR_DELAYED_UNTIL_NINE_FIVE:
-            if truck.truck_clock.time() >= DELAYED_START_TIME:
-                return True
+        # Package is delayed and cannot be delivered before it reaches the depot.
+        if rules.available_after is not None and current_time < rules.available_after:
             return False
 
-        # A package that has been given a wrong address and only at 10:20 am can
-        # this new address be communicated from dispatch to the truck, so
-        # it can deliver the package.
-        if rule == BR_WRONG_ADDRESS:
-            added_time_time_to_get_to_destination: time = time(
-                minute=(time_to_get_to_destination // 60) % 60,
-                second=(time_to_get_to_destination % 60)
-            )
-            estimated_time_of_arrival: datetime = (
-                    datetime.combine(date=DELIVERY_DATE, time=added_time_time_to_get_to_destination)
-                    + timedelta(
-                hours=truck.truck_clock.time().hour,
-                minutes=truck.truck_clock.time().minute,
-                seconds=truck.truck_clock.time().second
-            )
-            )
-            if estimated_time_of_arrival.time() >= BR_TIME_FOR_NEW_ADDRESS_FOR_PACKAGE_NINE:
-                package.address = BR_RIGHT_ADDRESS
-                return True
+        # A package that has been given a wrong address can only be delivered
+        # once the new address is communicated from dispatch to the truck,
+        # and then only at the new address.
+        if rules.new_address is not None and package.address != rules.new_address:
             return False
 
-        # A package that can only be delivered in truck number 2.
-        if rule == BR_ONLY_IN_TRUCK_TWO:
-            if truck.truck_id == 2:
-                return True
+        # A package that can only be delivered by some trucks.
+        if rules.trucks is not None and truck.truck_id not in rules.trucks:
             return False
 
-        # Series of rules where packages need to be delivered along with other
-        # similar packages.  These packages need to be in the same truck
-        br_packages_count: int = 0
-        if rule in BR_MUST_BE_DELIVERED:
-            if rule == BR_MUST_BE_DELIVERED_WITH_ONE:
-                for package in truck.packages:
-                    if package.package_id == 13 or package.package_id == 15:
-                        br_packages_count += 1
-                for package in packages_delivered:
-                    if package.package_id == 13 or package.package_id == 15:
-                        br_packages_count += 1
-                return br_packages_count == 2
-            elif rule == BR_MUST_BE_DELIVERED_WITH_TWO:
-                for package in truck.packages:
-                    if package.package_id == 13 or package.package_id == 19:
-                        br_packages_count += 1
-                for package in packages_delivered:
-                    if package.package_id == 13 or package.package_id == 19:
-                        br_packages_count += 1
-                return br_packages_count == 2
-            elif rule == BR_MUST_BE_DELIVERED_WITH_THREE:
-                for package in truck.packages:
-                    if package.package_id == 19 or package.package_id == 15:
-                        br_packages_count += 1
-                for package in packages_delivered:
-                    if package.package_id == 19 or package.package_id == 15:
-                        br_packages_count += 1
-                return br_packages_count == 2
+        # The packages this one must be delivered with must all have been
+        # loaded on this truck, whether still on board or delivered.
+        return self.business_rules.named_on_truck(package_id=package.package_id, truck_id=truck.truck_id)
@@ -5,16 +5,19 @@ WGU Student ID: 002520248
 2023-05-18
 """
 
-from datetime import datetime, time
+from datetime import time
 from typing import Optional
 
 from constants import (
-    DEFAULT_DELIVERY_END_TIME,
-    DELAYED_START_TIME,
+    COMPILED_BUNDLE_FILE,
+    DEFAULT_DELIVERY_END_SECONDS,
+    DELAYED_START_SECONDS,
     MM_USER_MENU,
     DEFAULT_MAXIMUM_NUMBER_OF_PACKAGES
 )
 from dispatch.dispatcher import Dispatcher
+from src.bundle import BundleCompiler
+from utils.clock import time_to_seconds
 from utils.color_printer import ColorPrinter as cp
 
 
@@ -35,7 +38,14 @@ class MainMenu:
             str: The user's menu selection.
 
         """
-        self.dispatcher = Dispatcher()
+        if self.dispatcher is None:
+            # Map the compiled bundle when it is current instead of parsing the spreadsheets
+            self.dispatcher = Dispatcher(
+                bundle_file=COMPILED_BUNDLE_FILE if BundleCompiler.is_up_to_date() else None
+            )
+        else:
+            # Pick up edits to the data files and start the day over
+            self.dispatcher.refresh()
         self.printer.print_color(text="\n--------------------------------------", color_code=cp.CYAN)
         self.printer.print_color(text="Please make a selection from the menu:", color_code=cp.CYAN)
         self.printer.print_color(text="--------------------------------------", color_code=cp.CYAN)
@@ -81,7 +91,7 @@ class MainMenu:
             parsed_time = self._time_parser(input())
 
         self._start_dispatcher(new_delivery_stop_time=parsed_time)
-        self.dispatcher.end_delivery_report(end_time=parsed_time)
+        self.dispatcher.end_delivery_report(end_time=time_to_seconds(parsed_time))
 
         # Reset printer
         self.printer.reset_color()
@@ -126,11 +136,12 @@ class MainMenu:
             new_delivery_stop_time (Optional[time]): The new delivery stop time to use, if provided.
 
         """
-        # Set the end time for deliveries based on the provided new_delivery_stop_time or use the default value
-        end_time: time = (
-            new_delivery_stop_time
+        # Set the end time for deliveries based on the provided new_delivery_stop_time or use the default value.
+        # The simulation runs on seconds since midnight.
+        end_time: int = (
+            time_to_seconds(new_delivery_stop_time)
             if new_delivery_stop_time
-            else DEFAULT_DELIVERY_END_TIME
+            else DEFAULT_DELIVERY_END_SECONDS
         )
 
         # Load packages into trucks 1 and 2
@@ -138,18 +149,18 @@ class MainMenu:
         self.dispatcher.load_truck_with_packages(truck_id=2)
 
         # Begin delivery for truck 1 and truck 2
-        driver_one_time: time = self.dispatcher.begin_delivery(
+        driver_one_time: int = self.dispatcher.begin_delivery(
             truck=self.dispatcher.trucks[0], end_time=end_time
         )
-        driver_two_time: time = self.dispatcher.begin_delivery(
+        driver_two_time: int = self.dispatcher.begin_delivery(
             truck=self.dispatcher.trucks[1], end_time=end_time
         )
 
-        # Determine the start time based on the maximum time between driver_one_time, driver_two_time, and DELAYED_START_TIME
-        start_time: time = max(driver_one_time, driver_two_time, DELAYED_START_TIME)
+        # Determine the start time based on the maximum time between driver_one_time, driver_two_time, and DELAYED_START_SECONDS
+        start_time: int = max(driver_one_time, driver_two_time, DELAYED_START_SECONDS)
 
         # Calculate the remaining time for deliveries
-        time_remaining: float = self.dispatcher.calculate_remaining_time(
+        time_remaining: int = self.dispatcher.calculate_remaining_time(
             start_time=start_time,
             end_time=end_time
         )
@@ -164,10 +175,7 @@ class MainMenu:
             )
         else:
             # Adding time to the last truck to keep report uniform.
-            self.dispatcher.trucks[2].truck_clock = datetime.combine(
-                self.dispatcher.trucks[2].truck_clock.today(),
-                end_time
-            )
+            self.dispatcher.trucks[2].truck_clock = end_time
 
     def _package_parser(self, package_id: str) -> Optional[int]:
         """
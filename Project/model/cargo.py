@@ -0,0 +1,86 @@
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from model.package import Package
+
+
+class Cargo:
+    """
+    The packages loaded on a truck, keyed by package id.
+
+    Membership checks and removals are O(1), and iteration follows the load
+    order until `sort` puts the packages in a new order. Removing a package
+    keeps the order of the others, so a route sorted by deadline stays sorted
+    as packages are delivered.
+
+    Attributes:
+        _packages (Dict[int, Package]): Package id -> package, in cargo order.
+    """
+
+    __slots__ = ("_packages",)
+
+    def __init__(self) -> None:
+        self._packages: Dict[int, Package] = {}
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    def __iter__(self) -> Iterator[Package]:
+        return iter(self._packages.values())
+
+    def __contains__(self, package: Package) -> bool:
+        return package.package_id in self._packages
+
+    def __repr__(self):
+        return f"Cargo({list(self._packages)})"
+
+    def add(self, package: Package) -> None:
+        """
+        Adds a package after the ones already loaded.
+
+        Args:
+            package (Package): The package to load.
+        """
+        self._packages[package.package_id] = package
+
+    def remove(self, package: Package) -> bool:
+        """
+        Removes a package, keeping the order of the rest.
+
+        Args:
+            package (Package): The package to unload.
+
+        Returns:
+            True if the package was removed, False if it was not loaded.
+        """
+        return self._packages.pop(package.package_id, None) is not None
+
+    def get(self, package_id: int) -> Optional[Package]:
+        """
+        Gets a loaded package by id.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The package, or None if it is not loaded.
+        """
+        return self._packages.get(package_id)
+
+    def sort(self, key: Callable[[Package], Any]) -> None:
+        """
+        Reorders the packages, e.g. by delivery deadline. The sort is stable,
+        so packages with equal keys keep their current order.
+
+        Args:
+            key (Callable[[Package], Any]): Gets the sort key of a package.
+        """
+        self._packages = {
+            package.package_id: package
+            for package in sorted(self._packages.values(), key=key)
+        }
+
+    def clear(self) -> None:
+        """
+        Unloads every package.
+        """
+        self._packages.clear()
@@ -1,7 +1,3 @@
-import math
-from typing import Optional
-
-
 class Hub:
     """
     Model class for a hub.  A hub is a location / node.
@@ -15,10 +11,10 @@ class Hub:
         hub_name: The name of the hub.
         address: The address of the hub.
         zipcode: The zipcode of the hub.
-        previous_hub: The previous hub in the shortest path from the start hub.
-        distance: The distance from the start hub to this hub.
     """
 
+    __slots__ = ("hub_name", "address", "zipcode")
+
     def __init__(
             self,
             hub_name: str,
@@ -28,8 +24,6 @@ class Hub:
         self.hub_name = hub_name
         self.address = address
         self.zipcode = zipcode
-        self.previous_hub: Optional["Hub"] = None
-        self.distance: float = math.inf
 
     def __repr__(self):
         """
@@ -39,16 +33,3 @@ class Hub:
             A string representation of the hub.
         """
         return f"{self.address}"
-
-    def __lt__(self, other: "Hub") -> bool:
-        """
-        Less than '<' monkey patch to compare distances.
-
-        Args:
-            other: The other hub to compare to.
-
-        Returns:
-            True if the distance to this hub is less than the distance
-            to the other hub.
-        """
-        return self.distance < other.distance
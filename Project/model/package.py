@@ -1,7 +1,25 @@
+from enum import IntEnum
+from typing import Optional
+
+from constants import AT_HUB_TEXT
+from utils.clock import seconds_to_time
+
+
+class PackageStatus(IntEnum):
+    """The stages a package moves through during the day."""
+
+    AT_HUB = 0
+    EN_ROUTE = 1
+    DELIVERED = 2
+
+
 class Package:
     """A model to create a package object that then gets
     stored into a hash table and truck object.
 
+    The status is kept as a PackageStatus code plus the truck and time it
+    refers to. The human readable text is only built when `status` is read.
+
     Attributes:
         package_id: The unique identifier of the package.
         address: The address of the destination.
@@ -10,11 +28,29 @@ class Package:
         zipcode: The zip code of the destination.
         delivery_time: The delivery time of the package.
         weight: The weight of the package.
-        status: The current status of the package.
+        status_code: The current stage of the package.
+        status_truck_id: The truck the package is on or was delivered from.
+        status_time: The time the package was delivered, in seconds since midnight.
         notes: Any additional notes about the package.
     """
 
-    def __init__(self, package_id, address, city, state, zipcode, delivery_time, weight, status, notes):
+    __slots__ = (
+        "package_id", "address", "city", "state", "zipcode", "delivery_time",
+        "weight", "status_code", "status_truck_id", "status_time", "notes"
+    )
+
+    def __init__(
+            self,
+            package_id,
+            address,
+            city,
+            state,
+            zipcode,
+            delivery_time,
+            weight,
+            status: PackageStatus = PackageStatus.AT_HUB,
+            notes: str = ""
+    ):
         self.package_id = package_id
         self.address = address
         self.city = city
@@ -22,8 +58,46 @@ class Package:
         self.zipcode = zipcode
         self.delivery_time = delivery_time
         self.weight = weight
-        self.status = status
+        self.status_code: PackageStatus = status
+        self.status_truck_id: Optional[int] = None
+        self.status_time: Optional[int] = None
         self.notes = notes
 
+    def update_status(
+            self,
+            status: PackageStatus,
+            truck_id: Optional[int] = None,
+            status_time: Optional[int] = None
+    ) -> None:
+        """
+        Moves the package to a new stage.
+
+        Args:
+            status (PackageStatus): The new stage.
+            truck_id (Optional[int]): The truck the package is on or was delivered from.
+            status_time (Optional[int]): The time the package was delivered,
+                in seconds since midnight.
+        """
+        self.status_code = status
+        self.status_truck_id = truck_id
+        self.status_time = status_time
+
+    @property
+    def status(self) -> str:
+        """
+        Formats the current status for display.
+
+        Returns:
+            The human readable status of the package.
+        """
+        if self.status_code is PackageStatus.DELIVERED:
+            return (
+                f"Package delivered at {seconds_to_time(self.status_time)} "
+                f"from truck no. [{self.status_truck_id}]"
+            )
+        if self.status_code is PackageStatus.EN_ROUTE:
+            return f"En route for delivery on truck no. {self.status_truck_id}"
+        return AT_HUB_TEXT
+
     def __repr__(self):
         return f"Package ID: {self.package_id}, Delivery address: {self.address}, Deliver by: {self.delivery_time}, Status: {self.status}"
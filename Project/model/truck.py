@@ -1,12 +1,12 @@
-from datetime import datetime, time, timedelta
-from typing import List
+from typing import List, Optional, Tuple
 
 from constants import (
-    AT_HUB_TEXT, DELIVERY_DATE, MAX_TRUCK_CAPACITY,
+    AT_HUB_TEXT, MAX_TRUCK_CAPACITY,
     MAX_TRUCK_DISTANCE_PER_SECOND
 )
 
-from model.package import Package
+from model.cargo import Cargo
+from model.package import Package, PackageStatus
 
 
 class Truck:
@@ -15,21 +15,24 @@ class Truck:
         package objects.
 
     Attributes:
-        packages: A list of package objects.
+        packages: The package objects on board, with O(1) membership and removal.
         speed: The speed of the truck in miles per second.
         miles: The number of miles the truck has traveled.
         capacity: The maximum capacity of the truck in terms of the number
             of packages it can hold.
         status: The current status of the truck, such as
             "AT HUB" or "Out for Delivery".
-        truck_clock: A truck object's internal clock for delivery confirmation
+        truck_clock: A truck object's internal clock for delivery confirmation,
+            in whole seconds since midnight. None until the truck has a time.
     """
 
+    __slots__ = ("truck_id", "packages", "miles", "truck_clock", "capacity", "status", "speed")
+
     def __init__(self, truck_id):
         self.truck_id = truck_id
-        self.packages: List[Package] = []
+        self.packages: Cargo = Cargo()
         self.miles = 0.0
-        self.truck_clock = datetime.today()
+        self.truck_clock: Optional[int] = None
         self.capacity = MAX_TRUCK_CAPACITY
         self.status = AT_HUB_TEXT
         self.speed = MAX_TRUCK_DISTANCE_PER_SECOND
@@ -43,17 +46,19 @@ class Truck:
         """
         return f"{self.truck_id}"
 
-    def load_truck(self, package: Package, starting_time: datetime = DELIVERY_DATE) -> None:
+    def load_truck(self, package: Package, starting_time: Optional[int] = None) -> None:
         """
         Loads a Package object into a Truck object.
 
         Args:
             package (Package): Package object
+            starting_time (Optional[int]): The truck's clock in seconds since
+                midnight, or None if it has not started its route.
         Returns:
             None
         """
         if isinstance(package, Package) and self.capacity != 0:
-            self.packages.append(package)
+            self.packages.add(package)
             self.capacity -= 1
             self.truck_clock = starting_time
             self.speed = MAX_TRUCK_DISTANCE_PER_SECOND
@@ -70,50 +75,28 @@ class Truck:
         # Add the miles traveled to the current total miles
         self.miles += miles_traveled
 
-    def update_truck_clock(self, distance_traveled: float, current_clock: time):
+    def update_truck_clock(self, distance_traveled: float, current_clock: int) -> Tuple[int, int]:
         """
         Updates the truck's clock based on the distance traveled and current clock time.
 
         Args:
             distance_traveled (float): The distance traveled by the truck.
-            current_clock (time): The current time on the truck's clock.
+            current_clock (int): The current time on the truck's clock in seconds since midnight.
 
         Returns:
-            Tuple[time, int]: A tuple containing the new truck time (time object) and the elapsed time in seconds.
+            Tuple[int, int]: A tuple containing the new truck time and the elapsed time, both in seconds.
 
         """
-        # Calculate the elapsed time based on the distance traveled and the truck's speed
-        delta_time: timedelta = timedelta(seconds=distance_traveled / self.speed)
-
-        # Convert the elapsed time to a time object
-        elapsed_time: time = time(
-            hour=delta_time.seconds // 3600,
-            minute=(delta_time.seconds // 60) % 60,
-            second=delta_time.seconds % 60
-        )
-
-        # Create a datetime object combining the delivery date with the elapsed time
-        date_time_from_elapsed_time: datetime = datetime.combine(
-            date=DELIVERY_DATE, time=elapsed_time
-        )
-
-        # Create a datetime object combining the delivery date with the current clock time
-        date_time_from_current_clock: datetime = datetime.combine(
-            date=DELIVERY_DATE, time=current_clock
-        )
-
-        # Calculate the new truck time by adding the elapsed time to the current clock time
-        new_truck_time: datetime = date_time_from_elapsed_time + timedelta(
-            hours=date_time_from_current_clock.hour,
-            minutes=date_time_from_current_clock.minute,
-            seconds=date_time_from_current_clock.second
-        )
+        # Calculate the elapsed time based on the distance traveled and the truck's speed,
+        # dropping fractions of a second. Rounding to the microsecond first keeps
+        # floating point error (e.g. 479.9999999) from costing a whole second.
+        elapsed_seconds: int = int(round(distance_traveled / self.speed, 6))
 
         # Update the truck's clock with the new time
-        self.truck_clock = new_truck_time
+        self.truck_clock = current_clock + elapsed_seconds
 
-        # Return the new truck time as a time object and the elapsed time in seconds
-        return (new_truck_time.time(), delta_time.seconds)
+        # Return the new truck time and the elapsed time in seconds
+        return (self.truck_clock, elapsed_seconds)
 
     def deliver_package(self, package: Package, packages_delivered: List[Package]):
         """
@@ -128,16 +111,20 @@ class Truck:
             Otherwise, it updates the package status, appends it to packages_delivered, and removes it from self.packages.
 
         """
-        # Check if the package is in the list of packages to be delivered
+        # Check if the package is in the cargo to be delivered
         if package not in self.packages:
             # Print the package (for error handling or debugging purposes)
             print(package)
         else:
             # Update the package status with the delivery information
-            package.status = f'Package delivered at {self.truck_clock.time()} from truck no. [{self.truck_id}]'
+            package.update_status(
+                status=PackageStatus.DELIVERED,
+                truck_id=self.truck_id,
+                status_time=self.truck_clock
+            )
 
             # Append the delivered package to the list of packages delivered
             packages_delivered.append(package)
 
-            # Remove the delivered package from the list of packages to be delivered
+            # Remove the delivered package from the cargo to be delivered
             self.packages.remove(package)
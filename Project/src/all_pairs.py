@@ -0,0 +1,434 @@
+import glob
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from constants import (
+    APSP_CACHE_EXTENSION,
+    APSP_CACHE_MAGIC,
+    APSP_DENSE_GRAPH_THRESHOLD,
+    APSP_METHOD_AUTO,
+    APSP_METHOD_DIJKSTRA,
+    APSP_METHOD_FLOYD_WARSHALL,
+    APSP_TASKS_PER_WORKER
+)
+from model.hub import Hub
+from src.graph import Graph
+
+# Cache header: magic, byte order flag (1 = little endian), number of hubs.
+_CACHE_HEADER: struct.Struct = struct.Struct("<8sBxxxI")
+
+# Shared memory blocks attached once per worker process by _attach_worker.
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_graph: Optional[Tuple[memoryview, memoryview, memoryview, memoryview]] = None
+
+
+class AllPairsShortestPaths:
+    """
+    The shortest distance between every pair of hubs in a graph.
+
+    Distances are kept in one flat row-major buffer of float64 values, which
+    is either an in-memory array or a read-only view over a memory-mapped
+    cache file.
+
+    Attributes:
+        hubs (List[Hub]): The hubs in matrix order.
+        hub_index (Dict[Hub, int]): A dictionary mapping each hub to its
+            row / column in the matrix.
+        distances (Union[array, memoryview]): The row-major distance buffer.
+    """
+
+    def __init__(
+            self,
+            hubs: Sequence[Hub],
+            distances: Union[array, memoryview],
+            mapped_file: Optional[mmap.mmap] = None
+    ) -> None:
+        self.hubs: List[Hub] = list(hubs)
+        self.hub_index: Dict[Hub, int] = {hub: index for index, hub in enumerate(self.hubs)}
+        self.distances: Union[array, memoryview] = distances
+        self._mapped_file: Optional[mmap.mmap] = mapped_file
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        """
+        Whether the distances are read straight from a cache file.
+
+        Returns:
+            True if the distances are memory mapped, False otherwise.
+        """
+        return self._mapped_file is not None
+
+    def distance_by_index(self, row: int, column: int) -> float:
+        """
+        Gets the shortest distance between two hub indices.
+
+        Args:
+            row (int): The index of the first hub.
+            column (int): The index of the second hub.
+
+        Returns:
+            The shortest distance, or infinity if there is no path.
+        """
+        return self.distances[row * len(self.hubs) + column]
+
+    def distance(self, start_hub: Hub, end_hub: Hub) -> float:
+        """
+        Gets the shortest distance between two hubs.
+
+        Args:
+            start_hub (Hub): The first hub.
+            end_hub (Hub): The second hub.
+
+        Returns:
+            The shortest distance, or infinity if there is no path.
+        """
+        return self.distance_by_index(self.hub_index[start_hub], self.hub_index[end_hub])
+
+
+class AllPairsSolver:
+    """
+    Computes the shortest distance between every pair of hubs and caches
+    the result on disk next to the spreadsheet it was built from.
+    """
+
+    @staticmethod
+    def solve(
+            graph: Graph,
+            method: str = APSP_METHOD_AUTO,
+            workers: Optional[int] = None
+    ) -> AllPairsShortestPaths:
+        """
+        Computes all-pairs shortest paths for a graph.
+
+        Args:
+            graph (Graph): The graph to solve.
+            method (str): APSP_METHOD_FLOYD_WARSHALL, APSP_METHOD_DIJKSTRA, or
+                APSP_METHOD_AUTO to pick Floyd-Warshall for dense graphs and
+                repeated Dijkstra for sparse ones.
+            workers (Optional[int]): When greater than one, run Dijkstra from
+                every hub across this many processes instead, regardless
+                of `method`.
+
+        Returns:
+            The shortest distances between every pair of hubs.
+        """
+        if workers is not None and workers > 1:
+            return AllPairsShortestPaths(
+                hubs=graph.hubs,
+                distances=AllPairsSolver._parallel_dijkstra(graph=graph, workers=workers)
+            )
+
+        if method == APSP_METHOD_AUTO:
+            method = (
+                APSP_METHOD_FLOYD_WARSHALL
+                if AllPairsSolver.edge_density(graph) >= APSP_DENSE_GRAPH_THRESHOLD
+                else APSP_METHOD_DIJKSTRA
+            )
+
+        if method == APSP_METHOD_FLOYD_WARSHALL:
+            distances: array = AllPairsSolver._floyd_warshall(graph)
+        elif method == APSP_METHOD_DIJKSTRA:
+            distances = AllPairsSolver._repeated_dijkstra(graph)
+        else:
+            raise ValueError(f"Unknown all-pairs shortest path method: {method}")
+
+        return AllPairsShortestPaths(hubs=graph.hubs, distances=distances)
+
+    @staticmethod
+    def edge_density(graph: Graph) -> float:
+        """
+        Gets the fraction of hub pairs that are joined by an edge.
+
+        Args:
+            graph (Graph): The graph to measure.
+
+        Returns:
+            A number between 0.0 (no edges) and 1.0 (complete graph).
+        """
+        size: int = len(graph.hubs)
+        if size < 2:
+            return 1.0
+
+        edges: int = sum(len(set(neighbors)) for neighbors in graph.adjacency_list.values())
+        return edges / (size * (size - 1))
+
+    @staticmethod
+    def load_or_solve(
+            graph: Graph,
+            source_file: str,
+            method: str = APSP_METHOD_AUTO,
+            workers: Optional[int] = None
+    ) -> AllPairsShortestPaths:
+        """
+        Loads the cached all-pairs shortest paths for a graph, computing and
+        caching them first if there is no cache for the current contents of
+        `source_file`.
+
+        The cache file lives next to `source_file` and its name carries a
+        hash of the file contents and the hub order, so an edited spreadsheet
+        never reads a stale cache. Cache files for older contents are removed.
+
+        Args:
+            graph (Graph): The graph built from `source_file`.
+            source_file (str): The spreadsheet the graph was loaded from.
+            method (str): The method to use if the paths must be computed.
+            workers (Optional[int]): The number of processes to use if the
+                paths must be computed. See `solve`.
+
+        Returns:
+            The shortest distances between every pair of hubs.
+        """
+        cache_file: str = AllPairsSolver.cache_path(graph=graph, source_file=source_file)
+
+        cached: Optional[AllPairsShortestPaths] = AllPairsSolver._load_cache(
+            graph=graph, cache_file=cache_file
+        )
+        if cached is not None:
+            return cached
+
+        result: AllPairsShortestPaths = AllPairsSolver.solve(
+            graph=graph, method=method, workers=workers
+        )
+        AllPairsSolver._write_cache(result=result, cache_file=cache_file)
+        return AllPairsSolver._load_cache(graph=graph, cache_file=cache_file) or result
+
+    @staticmethod
+    def cache_path(graph: Graph, source_file: str) -> str:
+        """
+        Gets the cache file name for a graph built from `source_file`.
+
+        Args:
+            graph (Graph): The graph built from `source_file`.
+            source_file (str): The spreadsheet the graph was loaded from.
+
+        Returns:
+            The path of the cache file.
+        """
+        content_hash = hashlib.sha256()
+        with open(source_file, 'rb') as source:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                content_hash.update(chunk)
+        for hub in graph.hubs:
+            content_hash.update(hub.address.encode())
+            content_hash.update(b"\0")
+
+        stem: str = os.path.splitext(source_file)[0]
+        return f"{stem}.{content_hash.hexdigest()[:16]}{APSP_CACHE_EXTENSION}"
+
+    @staticmethod
+    def _load_cache(graph: Graph, cache_file: str) -> Optional[AllPairsShortestPaths]:
+        """
+        Private method that memory maps a cache file.
+
+        Returns:
+            The cached shortest paths, or None if the file is missing or
+            does not match the graph.
+        """
+        if not os.path.exists(cache_file):
+            return None
+
+        with open(cache_file, 'rb') as cache:
+            mapped_file: mmap.mmap = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+
+        size: int = len(graph.hubs)
+        expected_length: int = _CACHE_HEADER.size + size * size * 8
+        if len(mapped_file) != expected_length:
+            mapped_file.close()
+            return None
+
+        magic, little_endian, cached_size = _CACHE_HEADER.unpack_from(mapped_file, 0)
+        if (
+                magic != APSP_CACHE_MAGIC or
+                cached_size != size or
+                bool(little_endian) != (sys.byteorder == "little")
+        ):
+            mapped_file.close()
+            return None
+
+        distances: memoryview = memoryview(mapped_file)[_CACHE_HEADER.size:].cast('d')
+        return AllPairsShortestPaths(
+            hubs=graph.hubs, distances=distances, mapped_file=mapped_file
+        )
+
+    @staticmethod
+    def _write_cache(result: AllPairsShortestPaths, cache_file: str) -> None:
+        """
+        Private method that writes a result to a cache file, replacing the
+        caches of older spreadsheet contents.
+        """
+        stale_pattern: str = cache_file.rsplit(".", 2)[0] + ".*" + APSP_CACHE_EXTENSION
+        for stale_file in glob.glob(stale_pattern):
+            if stale_file != cache_file:
+                os.remove(stale_file)
+
+        temporary_file: str = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, 'wb') as cache:
+            cache.write(_CACHE_HEADER.pack(
+                APSP_CACHE_MAGIC, sys.byteorder == "little", len(result.hubs)
+            ))
+            cache.write(memoryview(result.distances).cast('B'))
+        os.replace(temporary_file, cache_file)
+
+    @staticmethod
+    def _edge_weights(graph: Graph) -> List[List[float]]:
+        """
+        Private method that builds one row of direct edge weights per hub,
+        with zero on the diagonal and infinity where there is no edge.
+        """
+        size: int = len(graph.hubs)
+        rows: List[List[float]] = [[math.inf] * size for _ in range(size)]
+
+        for hub, neighbors in graph.adjacency_list.items():
+            row_index: int = graph.hub_index[hub]
+            row: List[float] = rows[row_index]
+            row[row_index] = 0.0
+            for neighbor in neighbors:
+                row[graph.hub_index[neighbor]] = graph.get_distance(
+                    start_hub=hub, end_hub=neighbor
+                )
+
+        return rows
+
+    @staticmethod
+    def _floyd_warshall(graph: Graph) -> array:
+        """
+        Private method implementing Floyd-Warshall one row at a time: for
+        each intermediate hub k, every row is relaxed against row k with a
+        single element-wise minimum instead of an inner Python loop.
+        """
+        rows: List[List[float]] = AllPairsSolver._edge_weights(graph)
+
+        for k, row_k in enumerate(rows):
+            for i, row_i in enumerate(rows):
+                distance_to_k: float = row_i[k]
+                if distance_to_k == math.inf or i == k:
+                    continue
+                rows[i] = list(map(min, row_i, map(distance_to_k.__add__, row_k)))
+
+        distances: array = array('d')
+        for row in rows:
+            distances.extend(row)
+        return distances
+
+    @staticmethod
+    def _repeated_dijkstra(graph: Graph) -> array:
+        """
+        Private method that runs the heap-based Dijkstra from every hub.
+        """
+        distances: array = array('d')
+        for hub in graph.hubs:
+            distances.extend(graph.dijkstra_shortest_path(start_hub=hub).distances)
+        return distances
+
+    @staticmethod
+    def _parallel_dijkstra(graph: Graph, workers: int) -> array:
+        """
+        Private method that runs Dijkstra from every hub across a process pool.
+
+        The graph is copied once into shared memory in compressed sparse row
+        form (row offsets, neighbor indices, edge weights), and every worker
+        writes its rows straight into a shared result matrix, so neither hubs
+        nor rows are pickled between processes. Each task is a contiguous
+        range of source hubs.
+        """
+        size: int = len(graph.hubs)
+        offsets: array = array('q', [0])
+        neighbors: array = array('q')
+        weights: array = array('d')
+        for hub in graph.hubs:
+            for neighbor in dict.fromkeys(graph.adjacency_list[hub]):
+                neighbors.append(graph.hub_index[neighbor])
+                weights.append(graph.get_distance(start_hub=hub, end_hub=neighbor))
+            offsets.append(len(neighbors))
+
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            result: array = array('d', [math.inf]) * (size * size)
+            for source in (offsets, neighbors, weights, result):
+                length: int = len(source) * source.itemsize
+                block = shared_memory.SharedMemory(create=True, size=max(1, length))
+                blocks.append(block)
+                block.buf[:length] = memoryview(source).cast('B')
+
+            tasks: int = max(1, min(size, workers * APSP_TASKS_PER_WORKER))
+            bounds: List[int] = [size * task // tasks for task in range(tasks + 1)]
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_attach_worker,
+                    initargs=(tuple(block.name for block in blocks), size)
+            ) as executor:
+                for _ in executor.map(_solve_rows, bounds[:-1], bounds[1:]):
+                    pass
+
+            memoryview(result).cast('B')[:] = blocks[3].buf[:size * size * 8]
+            return result
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+def _attach_worker(block_names: Tuple[str, ...], size: int) -> None:
+    """
+    Process pool initializer that attaches the shared graph and result
+    matrix once per worker.
+    """
+    global _worker_graph
+
+    for name in block_names:
+        _worker_blocks.append(shared_memory.SharedMemory(name=name))
+
+    offsets, neighbors, weights, distances = _worker_blocks
+    row_offsets: memoryview = offsets.buf[:(size + 1) * 8].cast('q')
+    edges: int = row_offsets[size]
+    _worker_graph = (
+        row_offsets,
+        neighbors.buf[:edges * 8].cast('q'),
+        weights.buf[:edges * 8].cast('d'),
+        distances.buf[:size * size * 8].cast('d')
+    )
+
+
+def _solve_rows(first_source: int, last_source: int) -> int:
+    """
+    Runs a heap-based Dijkstra from every source index in
+    [first_source, last_source) over the shared graph and writes each
+    result row into the shared matrix.
+
+    Returns:
+        The number of rows written.
+    """
+    offsets, neighbors, weights, distances = _worker_graph
+    size: int = len(offsets) - 1
+
+    for source in range(first_source, last_source):
+        row: List[float] = [math.inf] * size
+        row[source] = 0.0
+        settled: bytearray = bytearray(size)
+        heap: List[Tuple[float, int]] = [(0.0, source)]
+
+        while heap:
+            current_distance, current = heapq.heappop(heap)
+            if settled[current]:
+                continue
+            settled[current] = 1
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor: int = neighbors[edge]
+                new_distance: float = current_distance + weights[edge]
+                if new_distance < row[neighbor]:
+                    row[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+
+        distances[source * size:(source + 1) * size] = array('d', row)
+
+    return last_source - first_source
@@ -0,0 +1,341 @@
+"""
+Compiles the distance and package spreadsheets into one binary bundle that
+can be memory mapped instead of parsed.
+
+Run from the Project directory to compile the bundle:
+
+    python -m src.bundle
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple
+
+from constants import (
+    BUNDLE_MAGIC, COMPILED_BUNDLE_FILE,
+    DISTANCES_CSV_FILE, PACKAGES_CSV_FILE
+)
+from model.hub import Hub
+from model.package import Package
+from src.data_loader import Loader
+from src.distance_matrix import TriangularDistanceMatrix
+from src.package_table import PackageTable
+from src.parser import Parser
+from utils.clock import seconds_to_time
+
+# Bundle header: magic, byte order flag (1 = little endian), number of hubs,
+# packages and strings, then the byte offset of the distance, hub, package
+# and string sections.
+_BUNDLE_HEADER: struct.Struct = struct.Struct("<8sBxxxIIIQQQQ")
+
+# Distances are stored as float64 so they read back exactly as parsed from the
+# spreadsheet; float32 would shift delivery times by a second on some legs.
+_DISTANCE_TYPECODE: str = 'd'
+
+# Each hub record is three int32s: name string id, address string id, zip code.
+_HUB_FIELDS: int = 3
+
+# Package columns in bundle order, each stored as one block of int32s.
+# Text columns hold string ids.
+_PACKAGE_COLUMNS: Tuple[str, ...] = (
+    "package_id", "zipcode", "weight", "deadline", "hub_index",
+    "address", "city", "state", "notes"
+)
+_PACKAGE_TEXT_COLUMNS: Tuple[str, ...] = ("address", "city", "state", "notes")
+
+# Sections start on 8 byte boundaries so each one can be cast in place.
+_SECTION_ALIGNMENT: int = 8
+
+
+class CompiledBundle:
+    """
+    A compiled bundle memory mapped for reading.
+
+    The bundle holds a hub table, the lower triangle of the distance matrix
+    as float64, one int32 block per package column and a string table for
+    names, addresses and notes. Opening a bundle maps the file and casts
+    each section in place; distances and package columns are read straight
+    from the mapping and strings are only decoded when they are read.
+
+    Attributes:
+        hubs (List[Hub]): The hubs in distance matrix order.
+        distance_matrix (TriangularDistanceMatrix): The distances between
+            the hubs, read from the mapped file.
+        package_count (int): The number of packages in the bundle.
+    """
+
+    def __init__(self, bundle_file: str = COMPILED_BUNDLE_FILE) -> None:
+        """
+        Maps a compiled bundle.
+
+        Args:
+            bundle_file (str): The bundle to open.
+
+        Raises:
+            ValueError: If the file is not a bundle or was compiled on a
+                machine with a different byte order.
+        """
+        with open(bundle_file, 'rb') as bundle:
+            self._mapped_file: mmap.mmap = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic, little_endian, hub_count, package_count, string_count,
+            distances_offset, hubs_offset, packages_offset, strings_offset
+        ) = _BUNDLE_HEADER.unpack_from(self._mapped_file, 0)
+        if magic != BUNDLE_MAGIC or bool(little_endian) != (sys.byteorder == "little"):
+            self._mapped_file.close()
+            raise ValueError(f"{bundle_file} is not a bundle compiled for this machine")
+
+        buffer: memoryview = memoryview(self._mapped_file)
+        self.package_count: int = package_count
+
+        string_data_offset: int = strings_offset + (string_count + 1) * 8
+        self._string_offsets: memoryview = buffer[strings_offset:string_data_offset].cast('q')
+        self._string_data: memoryview = buffer[string_data_offset:]
+
+        self._package_columns: Dict[str, memoryview] = {}
+        for position, column in enumerate(_PACKAGE_COLUMNS):
+            start: int = packages_offset + position * package_count * 4
+            self._package_columns[column] = buffer[start:start + package_count * 4].cast('i')
+
+        hub_records: memoryview = buffer[hubs_offset:hubs_offset + hub_count * _HUB_FIELDS * 4].cast('i')
+        self.hubs: List[Hub] = [
+            Hub(
+                hub_name=self.string(hub_records[record]),
+                address=self.string(hub_records[record + 1]),
+                zipcode=hub_records[record + 2]
+            )
+            for record in range(0, hub_count * _HUB_FIELDS, _HUB_FIELDS)
+        ]
+
+        distance_cells: int = hub_count * (hub_count - 1) // 2
+        self.distance_matrix: TriangularDistanceMatrix = TriangularDistanceMatrix(
+            hubs=self.hubs,
+            cells=buffer[distances_offset:distances_offset + distance_cells * 8].cast(_DISTANCE_TYPECODE)
+        )
+
+    def string(self, string_id: int) -> str:
+        """
+        Reads a string from the string table.
+
+        Args:
+            string_id (int): The string id.
+
+        Returns:
+            The decoded string.
+        """
+        return str(
+            self._string_data[self._string_offsets[string_id]:self._string_offsets[string_id + 1]],
+            'utf-8'
+        )
+
+    def package_table(self) -> PackageTable:
+        """
+        Gets the packages as a table whose columns read from the mapped file.
+        Only the status column is allocated, since it changes during the day.
+
+        Returns:
+            The packages in spreadsheet order.
+        """
+        columns: Dict[str, Sequence] = {}
+        for column, values in self._package_columns.items():
+            columns[column] = (
+                _StringColumn(bundle=self, string_ids=values)
+                if column in _PACKAGE_TEXT_COLUMNS else values
+            )
+        return PackageTable.from_columns(columns)
+
+    def packages(self) -> Iterator[Package]:
+        """
+        Builds a Package object for each package in the bundle.
+
+        Returns:
+            An iterator of packages in spreadsheet order.
+        """
+        columns: Dict[str, memoryview] = self._package_columns
+        for row in range(self.package_count):
+            yield Package(
+                package_id=columns["package_id"][row],
+                address=self.string(columns["address"][row]),
+                city=self.string(columns["city"][row]),
+                state=self.string(columns["state"][row]),
+                zipcode=columns["zipcode"][row],
+                delivery_time=seconds_to_time(columns["deadline"][row]),
+                weight=columns["weight"][row],
+                notes=self.string(columns["notes"][row])
+            )
+
+
+class _StringColumn:
+    """
+    A read-only text column that decodes each value from a bundle's string
+    table when it is read.
+    """
+
+    __slots__ = ("_bundle", "_string_ids")
+
+    def __init__(self, bundle: CompiledBundle, string_ids: memoryview) -> None:
+        self._bundle: CompiledBundle = bundle
+        self._string_ids: memoryview = string_ids
+
+    def __len__(self) -> int:
+        return len(self._string_ids)
+
+    def __getitem__(self, row: int) -> str:
+        return self._bundle.string(self._string_ids[row])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._bundle.string, self._string_ids)
+
+
+class BundleCompiler:
+    """
+    Compiles the distance and package spreadsheets into a bundle that
+    CompiledBundle can map.
+    """
+
+    @staticmethod
+    def compile(
+            bundle_file: str = COMPILED_BUNDLE_FILE,
+            distances_file: str = DISTANCES_CSV_FILE,
+            packages_file: str = PACKAGES_CSV_FILE
+    ) -> str:
+        """
+        Compiles the spreadsheets into a bundle.
+
+        The distances are streamed straight from the spreadsheet into the
+        bundle one row at a time, so the matrix is never held in memory.
+        The bundle is written to a temporary file first and moved into
+        place once it is complete.
+
+        Args:
+            bundle_file (str): The bundle to write.
+            distances_file (str): The distances spreadsheet.
+            packages_file (str): The packages spreadsheet.
+
+        Returns:
+            The path of the bundle.
+        """
+        parser: Parser = Parser()
+        strings: Dict[str, int] = {}
+
+        def string_id(text: str) -> int:
+            return strings.setdefault(text, len(strings))
+
+        temporary_file: str = f"{bundle_file}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_file, 'wb') as bundle:
+                bundle.write(bytes(_BUNDLE_HEADER.size))
+
+                # Distances, one lower-triangular row per hub
+                distances_offset: int = BundleCompiler._align(bundle)
+                hub_records: array = array('i')
+                hub_indexes_by_address: Dict[str, int] = {}
+                for hub, distances in Loader.stream_hubs_and_distances_from_csv(
+                        hubs_parser=parser,
+                        file_path=distances_file
+                ):
+                    array(_DISTANCE_TYPECODE, distances).tofile(bundle)
+                    hub_indexes_by_address.setdefault(
+                        Parser.normalize_address(hub.address), len(hub_records) // _HUB_FIELDS
+                    )
+                    hub_records.extend((string_id(hub.hub_name), string_id(hub.address), hub.zipcode))
+
+                # Hub table
+                hubs_offset: int = BundleCompiler._align(bundle)
+                hub_records.tofile(bundle)
+
+                # Package columns
+                table: PackageTable = Loader.load_package_table_from_csv(
+                    packages_parser=parser,
+                    file_path=packages_file
+                )
+                packages_offset: int = BundleCompiler._align(bundle)
+                for column in _PACKAGE_COLUMNS:
+                    if column in _PACKAGE_TEXT_COLUMNS:
+                        values: array = array('i', map(string_id, getattr(table, column)))
+                    elif column == "hub_index":
+                        values = array('i', (
+                            hub_indexes_by_address.get(Parser.normalize_address(address), -1)
+                            for address in table.address
+                        ))
+                    else:
+                        values = array('i', getattr(table, column))
+                    values.tofile(bundle)
+
+                # String table: len(strings) + 1 offsets, then the UTF-8 text
+                strings_offset: int = BundleCompiler._align(bundle)
+                encoded_strings: List[bytes] = [text.encode('utf-8') for text in strings]
+                string_offsets: array = array('q', [0])
+                for encoded in encoded_strings:
+                    string_offsets.append(string_offsets[-1] + len(encoded))
+                string_offsets.tofile(bundle)
+                bundle.write(b"".join(encoded_strings))
+
+                bundle.seek(0)
+                bundle.write(_BUNDLE_HEADER.pack(
+                    BUNDLE_MAGIC, sys.byteorder == "little",
+                    len(hub_records) // _HUB_FIELDS, len(table), len(strings),
+                    distances_offset, hubs_offset, packages_offset, strings_offset
+                ))
+
+            os.replace(temporary_file, bundle_file)
+        finally:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+        return bundle_file
+
+    @staticmethod
+    def is_up_to_date(
+            bundle_file: str = COMPILED_BUNDLE_FILE,
+            distances_file: str = DISTANCES_CSV_FILE,
+            packages_file: str = PACKAGES_CSV_FILE
+    ) -> bool:
+        """
+        Checks whether a bundle exists and is newer than both spreadsheets.
+
+        Returns:
+            True if the bundle can be used in place of the spreadsheets.
+        """
+        if not os.path.exists(bundle_file):
+            return False
+        bundle_time: float = os.path.getmtime(bundle_file)
+        return all(
+            os.path.getmtime(source_file) <= bundle_time
+            for source_file in (distances_file, packages_file)
+        )
+
+    @staticmethod
+    def _align(bundle: BinaryIO) -> int:
+        """
+        Private method that pads the file to the next section boundary.
+
+        Returns:
+            The offset the next section starts at.
+        """
+        bundle.write(bytes(-bundle.tell() % _SECTION_ALIGNMENT))
+        return bundle.tell()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--distances", default=DISTANCES_CSV_FILE)
+    parser.add_argument("--packages", default=PACKAGES_CSV_FILE)
+    parser.add_argument("--output", default=COMPILED_BUNDLE_FILE)
+    arguments = parser.parse_args()
+
+    bundle_file: str = BundleCompiler.compile(
+        bundle_file=arguments.output,
+        distances_file=arguments.distances,
+        packages_file=arguments.packages
+    )
+    print(f"Compiled {bundle_file} ({os.path.getsize(bundle_file)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
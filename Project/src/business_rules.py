@@ -0,0 +1,320 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from constants import (
+    BR_ADDRESS_CORRECTIONS,
+    BR_DELAYED_PREFIX,
+    BR_MUST_BE_DELIVERED_WITH_PREFIX,
+    BR_ONLY_IN_TRUCK_PREFIX,
+    BR_WRONG_ADDRESS
+)
+from model.package import Package
+from src.hash_map import HashMap, OpenAddressingHashMap
+
+# A clock time inside a note, e.g. "9:05 am".
+_NOTE_TIME: re.Pattern = re.compile(r"(\d{1,2}):(\d{2})\s*([ap])\.?m\.?", re.IGNORECASE)
+_NOTE_NUMBER: re.Pattern = re.compile(r"\d+")
+
+# A corrected address and when it is known, in seconds.
+AddressCorrection = Tuple[str, int]
+
+
+class CoDeliveryGroup:
+    """
+    Packages that must all be loaded on the same truck.
+
+    Attributes:
+        group_id (int): The group's index in BusinessRules.groups, which
+            the loading engines key a group's packages by.
+        member_ids (FrozenSet[int]): The ids of the packages in the group.
+    """
+
+    __slots__ = ("group_id", "member_ids")
+
+    def __init__(self, group_id: int, member_ids: FrozenSet[int]) -> None:
+        self.group_id: int = group_id
+        self.member_ids: FrozenSet[int] = member_ids
+
+    def __repr__(self):
+        return f"CoDeliveryGroup({sorted(self.member_ids)})"
+
+
+class PackageRules:
+    """
+    The business rules for one package, compiled from its notes.
+
+    Attributes:
+        available_after (Optional[int]): When the package reaches the
+            depot, in seconds, or None if it is there from the start.
+        address_change_at (Optional[int]): When the package's corrected
+            address is known, in seconds, or None if its address is right.
+        new_address (Optional[str]): The corrected address.
+        trucks (Optional[FrozenSet[int]]): The ids of the trucks that may
+            carry the package, or None if any truck may.
+        delivered_with (Optional[FrozenSet[int]]): The ids its notes name,
+            which must be on its truck before it is delivered, or None.
+        group (Optional[CoDeliveryGroup]): The packages it must share a
+            truck with, or None.
+    """
+
+    __slots__ = ("available_after", "address_change_at", "new_address", "trucks", "delivered_with", "group")
+
+    def __init__(self) -> None:
+        self.available_after: Optional[int] = None
+        self.address_change_at: Optional[int] = None
+        self.new_address: Optional[str] = None
+        self.trucks: Optional[FrozenSet[int]] = None
+        self.delivered_with: Optional[FrozenSet[int]] = None
+        self.group: Optional[CoDeliveryGroup] = None
+
+    def __repr__(self):
+        rules: List[str] = [
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__ if getattr(self, name) is not None
+        ]
+        return f"PackageRules({', '.join(rules)})"
+
+
+class BusinessRules:
+    """
+    The business rules of a manifest, compiled once from the package notes.
+
+    Notes are parsed when the rules are built, so checking a rule during
+    delivery is a slot lookup instead of string matching. A package is
+    delivered once the packages its own notes name are loaded on its
+    truck. For loading, co-delivery groups are closed over: if A must go
+    with B and B with C, all three share a truck.
+
+    The notes understood are:
+        - "Delayed on flight---will not arrive to depot until H:MM am"
+        - "Wrong address listed", with the corrected address and the time
+          it is known taken from the corrections table
+        - "Can only be on truck N" (or "N, M")
+        - "Must be delivered with A, B"
+    Other notes carry no rules.
+    """
+
+    def __init__(
+            self,
+            packages: Iterable[Package] = (),
+            address_corrections: Dict[int, AddressCorrection] = BR_ADDRESS_CORRECTIONS
+    ) -> None:
+        """
+        Compiles the notes of every package.
+
+        Args:
+            packages (Iterable[Package]): The manifest.
+            address_corrections (Dict[int, AddressCorrection]): The corrected
+                address of each package listed with a wrong one, and when it
+                is known, by package id.
+
+        Raises:
+            ValueError: If a package is listed with a wrong address and
+                has no correction.
+        """
+        self._rules: HashMap = OpenAddressingHashMap()
+        self.groups: List[CoDeliveryGroup] = []
+        # Package id -> truck id it was last loaded on
+        self._loaded_on: HashMap = OpenAddressingHashMap()
+
+        manifest_ids: Set[int] = set()
+        named: Dict[int, List[int]] = {}
+        for package in packages:
+            manifest_ids.add(package.package_id)
+            try:
+                rules, co_delivery_ids = self.compile_notes(
+                    package.notes, address_corrections.get(package.package_id)
+                )
+            except ValueError as error:
+                raise ValueError(f"Package {package.package_id}: {error}") from error
+            if rules is not None:
+                self._rules.add(key=package.package_id, value=rules)
+            if co_delivery_ids:
+                named[package.package_id] = co_delivery_ids
+        self._build_groups(named, manifest_ids)
+
+    @staticmethod
+    def compile_notes(
+            notes: str,
+            address_correction: Optional[AddressCorrection] = None
+    ) -> Tuple[Optional[PackageRules], List[int]]:
+        """
+        Parses a package's notes.
+
+        Args:
+            notes (str): The package notes.
+            address_correction (Optional[AddressCorrection]): The corrected
+                address and when it is known, if the package has one.
+
+        Returns:
+            The package's rules, or None if the notes carry none, and the
+            ids of the packages it must be delivered with.
+
+        Raises:
+            ValueError: If the notes say the address is wrong and no
+                correction is given.
+        """
+        notes = notes.strip()
+        rules: PackageRules = PackageRules()
+        co_delivery_ids: List[int] = []
+
+        if notes.startswith(BR_DELAYED_PREFIX):
+            clock: Optional[re.Match] = _NOTE_TIME.search(notes)
+            if clock:
+                hour: int = int(clock.group(1)) % 12 + (12 if clock.group(3).lower() == "p" else 0)
+                rules.available_after = hour * 3600 + int(clock.group(2)) * 60
+        elif notes == BR_WRONG_ADDRESS:
+            if address_correction is None:
+                raise ValueError(f"\"{BR_WRONG_ADDRESS}\" but no corrected address is known")
+            rules.new_address, rules.address_change_at = address_correction
+        elif notes.startswith(BR_ONLY_IN_TRUCK_PREFIX):
+            rules.trucks = frozenset(map(int, _NOTE_NUMBER.findall(notes[len(BR_ONLY_IN_TRUCK_PREFIX):])))
+        elif notes.startswith(BR_MUST_BE_DELIVERED_WITH_PREFIX):
+            co_delivery_ids = list(map(int, _NOTE_NUMBER.findall(notes[len(BR_MUST_BE_DELIVERED_WITH_PREFIX):])))
+
+        if rules.available_after is None and rules.address_change_at is None and not rules.trucks:
+            return None, co_delivery_ids
+        return rules, co_delivery_ids
+
+    def get(self, package_id: int) -> Optional[PackageRules]:
+        """
+        Gets the rules for a package.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The package's rules, or None if no rule applies to it.
+        """
+        return self._rules.get(package_id)
+
+    def release_time(self, package_id: int) -> int:
+        """
+        Gets when a package reaches the depot.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The time in seconds, 0 if it is there from the start.
+        """
+        rules: Optional[PackageRules] = self._rules.get(package_id)
+        return (rules.available_after or 0) if rules else 0
+
+    def ready_time(self, package_id: int) -> int:
+        """
+        Gets the earliest a package can be handed over once it is on a
+        truck, i.e. when its corrected address is known.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The time in seconds, 0 if it can be delivered at any time.
+        """
+        rules: Optional[PackageRules] = self._rules.get(package_id)
+        return (rules.address_change_at or 0) if rules else 0
+
+    def hold_until(self, package_id: int) -> Optional[int]:
+        """
+        Gets the time the last rule holding a package back is lifted.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The time in seconds, or None if no rule holds the package back.
+        """
+        return max(self.release_time(package_id), self.ready_time(package_id)) or None
+
+    def group_of(self, package_id: int) -> Optional[CoDeliveryGroup]:
+        """
+        Gets the co-delivery group of a package.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The group, or None if the package may go on any truck its other rules allow.
+        """
+        rules: Optional[PackageRules] = self._rules.get(package_id)
+        return rules.group if rules else None
+
+    def record_load(self, package_id: int, truck_id: int) -> None:
+        """
+        Records the truck a package that must be delivered with others was
+        loaded on. A package counts once, on the last truck it was loaded on.
+
+        Args:
+            package_id (int): The package id.
+            truck_id (int): The truck it was loaded on.
+        """
+        if self.group_of(package_id) is not None:
+            self._loaded_on.add(key=package_id, value=truck_id)
+
+    def named_on_truck(self, package_id: int, truck_id: int) -> bool:
+        """
+        Checks whether every package a package's notes name was loaded on a truck.
+
+        Args:
+            package_id (int): The package id.
+            truck_id (int): The truck id.
+
+        Returns:
+            True if they are all on the truck or were delivered from it.
+        """
+        rules: Optional[PackageRules] = self._rules.get(package_id)
+        if rules is None or rules.delivered_with is None:
+            return True
+        return all(self._loaded_on.get(other) == truck_id for other in rules.delivered_with)
+
+    def clear_loads(self) -> None:
+        """
+        Resets the recorded loads for a new day.
+        """
+        self._loaded_on.clear()
+
+    def _build_groups(self, named: Dict[int, List[int]], manifest_ids: Set[int]) -> None:
+        """
+        Private method that joins packages named in each other's notes into
+        groups and attaches each group to the rules of its members, and each
+        package's named ids to its own rules. Ids that are not on the
+        manifest are left out.
+        """
+        parent: Dict[int, int] = {}
+
+        def find(package_id: int) -> int:
+            parent.setdefault(package_id, package_id)
+            while parent[package_id] != package_id:
+                parent[package_id] = parent[parent[package_id]]
+                package_id = parent[package_id]
+            return package_id
+
+        for package_id, co_delivery_ids in named.items():
+            on_manifest: FrozenSet[int] = frozenset(other for other in co_delivery_ids if other in manifest_ids)
+            for other in on_manifest:
+                parent[find(other)] = find(package_id)
+            if on_manifest:
+                self._rules_of(package_id).delivered_with = on_manifest
+
+        members: Dict[int, List[int]] = {}
+        for package_id in list(parent):
+            members.setdefault(find(package_id), []).append(package_id)
+
+        for member_ids in members.values():
+            if len(member_ids) < 2:
+                continue
+            group: CoDeliveryGroup = CoDeliveryGroup(group_id=len(self.groups), member_ids=frozenset(member_ids))
+            self.groups.append(group)
+            for package_id in member_ids:
+                self._rules_of(package_id).group = group
+
+    def _rules_of(self, package_id: int) -> PackageRules:
+        """
+        Private method that gets the rules of a package, adding empty rules
+        if it has none yet.
+        """
+        rules: Optional[PackageRules] = self._rules.get(package_id)
+        if rules is None:
+            rules = PackageRules()
+            self._rules.add(key=package_id, value=rules)
+        return rules
@@ -1,14 +1,19 @@
-from typing import List
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import csv
+import io
+import os
 
 from constants import (
-    AT_HUB_TEXT,
-    DISTANCES_CSV_FILE, PACKAGES_CSV_FILE
+    DISTANCES_CSV_FILE, PACKAGE_CSV_CHUNKS_PER_WORKER,
+    PACKAGE_CSV_MIN_CHUNK_BYTES, PACKAGES_CSV_FILE
 )
 
 from model.hub import Hub
 from model.package import Package
 from src.graph import Graph
+from src.package_table import PackageTable
 from src.parser import Parser
 
 
@@ -69,6 +74,67 @@ class Loader:
 
         return graph
 
+    @staticmethod
+    def stream_hubs_and_distances_from_csv(
+            hubs_parser: Parser,
+            file_path: str = DISTANCES_CSV_FILE
+    ) -> Iterator[Tuple[Hub, List[float]]]:
+        """
+        Reads the distances spreadsheet once, one row at a time.
+
+        Row i of the sheet describes hub i and its distances to hubs
+        0 .. i - 1, so each hub can be added to a graph as soon as its row
+        is read without holding the rest of the file in memory.
+
+        Args:
+            hubs_parser: The parser to use to parse the hub header cells.
+            file_path: The distances spreadsheet to read.
+
+        Yields:
+            Each hub with its distances to the hubs before it, in sheet order.
+        """
+        with open(file_path, 'r') as csv_file:
+            distances_data = csv.reader(csv_file)
+
+            # Skip the header row
+            next(distances_data, None)
+            for row_index, row in enumerate(distances_data):
+                hub_name, address, zipcode = hubs_parser.parse_hub_cells(
+                    name_cell=row[0], address_cell=row[1]
+                )
+                yield (
+                    Hub(hub_name=hub_name, address=address, zipcode=zipcode),
+                    list(map(float, row[2:row_index + 2]))
+                )
+
+    @staticmethod
+    def load_graph_from_csv(
+            graph: Graph,
+            hubs_parser: Parser,
+            file_path: str = DISTANCES_CSV_FILE
+    ) -> Graph:
+        """
+        Loads the hubs and the distances between them into a graph in a
+        single pass over the distances spreadsheet.
+
+        Args:
+            graph: The graph to load the hubs and distances into.
+            hubs_parser: The parser to use to parse the hub header cells.
+            file_path: The distances spreadsheet to read.
+
+        Returns:
+            The graph with the hubs and distances loaded.
+        """
+        for hub, distances in Loader.stream_hubs_and_distances_from_csv(
+                hubs_parser=hubs_parser,
+                file_path=file_path
+        ):
+            graph.add_node(hub)
+            for other_hub, distance in zip(graph.hubs, distances):
+                graph.add_edge(hub1=hub, hub2=other_hub, distance=distance)
+
+        return graph
+
     @staticmethod
     def load_hubs_from_csv(hubs_parser: Parser) -> List[Hub]:
         """
@@ -107,18 +173,22 @@ class Loader:
             return hubs
 
     @staticmethod
-    def load_packages_from_csv(packages_parser: Parser) -> List[Package]:
+    def load_packages_from_csv(
+            packages_parser: Parser,
+            file_path: str = PACKAGES_CSV_FILE
+    ) -> List[Package]:
         """
         Loads the packages from a spreadsheet.
 
         Args:
             packages_parser: The parser to use to parse the spreadsheet.
+            file_path: The packages spreadsheet to read.
 
         Returns:
             The list of packages loaded from the spreadsheet.
         """
         packages: List[Package] = []
-        with open(PACKAGES_CSV_FILE, 'r') as csv_file:
+        with open(file_path, 'r') as csv_file:
             packages_data = csv.reader(csv_file)
 
             for idx, package in enumerate(packages_data):
@@ -138,9 +208,167 @@ class Loader:
                                 )
                             ),
                             weight=int(package[6]),
-                            status=AT_HUB_TEXT,
                             notes=package[7] if package[7] else "",
                         )
                     )
 
         return packages
+
+    @staticmethod
+    def load_package_table_from_csv(
+            packages_parser: Parser,
+            graph: Optional[Graph] = None,
+            file_path: str = PACKAGES_CSV_FILE,
+            workers: Optional[int] = None
+    ) -> PackageTable:
+        """
+        Loads the packages from a spreadsheet straight into columns,
+        without creating a Package object per row.
+
+        Args:
+            packages_parser: The parser to use to parse the spreadsheet.
+            graph: The graph to look up each package's hub index in, if any.
+            file_path: The packages spreadsheet to read.
+            workers: When greater than one, split the file into byte ranges
+                on line boundaries and parse them in that many processes.
+                Rows must not contain line breaks inside quoted cells.
+
+        Returns:
+            The packages loaded from the spreadsheet.
+        """
+        if workers is not None and workers > 1:
+            return Loader._load_package_table_in_parallel(
+                graph=graph, file_path=file_path, workers=workers
+            )
+
+        table: PackageTable = PackageTable()
+        with open(file_path, 'r') as csv_file:
+            packages_data = csv.reader(csv_file)
+
+            for idx, package in enumerate(packages_data):
+                if idx == 0:
+                    continue
+
+                hub_index: int = -1
+                if graph is not None:
+                    hub: Optional[Hub] = graph.get_hub_by_address(hub_address=package[1])
+                    if hub is not None:
+                        hub_index = graph.hub_index[hub]
+
+                table.append(
+                    package_id=int(package[0]),
+                    address=package[1],
+                    city=package[2],
+                    state=package[3],
+                    zipcode=int(package[4]),
+                    delivery_time=packages_parser.validate_delivery_time_from_cell(
+                        cell=package[5]
+                    ),
+                    weight=int(package[6]),
+                    notes=package[7] if package[7] else "",
+                    hub_index=hub_index
+                )
+
+        return table
+
+    @staticmethod
+    def _load_package_table_in_parallel(
+            graph: Optional[Graph],
+            file_path: str,
+            workers: int
+    ) -> PackageTable:
+        """
+        Private method that parses byte ranges of the packages spreadsheet
+        across a process pool and concatenates their columns in file order.
+        """
+        chunks: List[Tuple[int, int]] = Loader._split_on_lines(
+            file_path=file_path,
+            chunks=workers * PACKAGE_CSV_CHUNKS_PER_WORKER
+        )
+
+        columns: Dict[str, object] = {
+            "package_id": array('l'), "zipcode": array('l'), "weight": array('l'),
+            "deadline": array('l'), "address": [], "city": [], "state": [], "notes": []
+        }
+        # A file that fits in one range is parsed in this process
+        executor: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=min(workers, len(chunks))) if len(chunks) > 1 else None
+        )
+        try:
+            parse = executor.map if executor is not None else map
+            for parsed_chunk in parse(
+                    _parse_package_rows,
+                    [file_path] * len(chunks),
+                    [start for start, _ in chunks],
+                    [end for _, end in chunks]
+            ):
+                for column, values in parsed_chunk.items():
+                    columns[column].extend(values)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Hub lookups need the graph, so they run here, once per distinct address
+        hub_indexes: Dict[str, int] = {}
+        if graph is not None:
+            for address in set(columns["address"]):
+                hub: Optional[Hub] = graph.get_hub_by_address(hub_address=address)
+                hub_indexes[address] = -1 if hub is None else graph.hub_index[hub]
+        columns["hub_index"] = array('l', (hub_indexes.get(address, -1) for address in columns["address"]))
+
+        return PackageTable.from_columns(columns)
+
+    @staticmethod
+    def _split_on_lines(file_path: str, chunks: int) -> List[Tuple[int, int]]:
+        """
+        Private method that splits a file after its header row into about
+        `chunks` byte ranges that each start and end on a line boundary.
+
+        Returns:
+            The (start, end) byte offsets of each range, in file order.
+        """
+        size: int = os.path.getsize(file_path)
+        with open(file_path, 'rb') as csv_file:
+            csv_file.readline()
+            first_row: int = csv_file.tell()
+
+            chunks = max(1, min(chunks, (size - first_row) // PACKAGE_CSV_MIN_CHUNK_BYTES))
+            bounds: List[int] = [first_row]
+            for chunk in range(1, chunks):
+                csv_file.seek(first_row + (size - first_row) * chunk // chunks)
+                csv_file.readline()
+                if bounds[-1] < csv_file.tell() < size:
+                    bounds.append(csv_file.tell())
+            bounds.append(size)
+
+        return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_package_rows(file_path: str, start: int, end: int) -> Dict[str, object]:
+    """
+    Parses the package rows in one byte range of the packages spreadsheet.
+    Runs in a worker process, so it only returns plain arrays and lists.
+
+    Args:
+        file_path (str): The packages spreadsheet.
+        start (int): The offset of the first row in the range.
+        end (int): The offset just past the last row in the range.
+
+    Returns:
+        The package columns for the range, without hub indexes.
+    """
+    with open(file_path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text: str = csv_file.read(end - start).decode('utf-8')
+
+    rows: List[List[str]] = [row for row in csv.reader(io.StringIO(text)) if row]
+    return {
+        "package_id": array('l', (int(row[0]) for row in rows)),
+        "address": [row[1] for row in rows],
+        "city": [row[2] for row in rows],
+        "state": [row[3] for row in rows],
+        "zipcode": array('l', (int(row[4]) for row in rows)),
+        "deadline": Parser.delivery_seconds_from_column([row[5] for row in rows]),
+        "weight": array('l', (int(row[6]) for row in rows)),
+        "notes": [row[7] if row[7] else "" for row in rows],
+    }
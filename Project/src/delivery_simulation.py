@@ -0,0 +1,392 @@
+import heapq
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.route_construction import DistanceRows
+from src.vrp_solver import VrpProblem
+
+
+class EventKind(IntEnum):
+    """
+    The kinds of event, in the order they are handled when they happen at
+    the same second: news first, then the trucks act on it.
+    """
+    PACKAGE_ARRIVAL = 0
+    ADDRESS_CHANGE = 1
+    DELIVERY = 2
+    DRIVER_RETURN = 3
+    TRUCK_DEPARTURE = 4
+    STOP_ARRIVAL = 5
+
+
+# Time in seconds, kind, sequence number to keep the heap stable, and the
+# package number or truck index the event is about.
+Event = Tuple[int, int, int, int]
+
+
+class SimulationResult:
+    """
+    What happened during a simulated day.
+
+    Attributes:
+        delivery_times (Dict[int, int]): When each delivered package was
+            delivered, in seconds, by package id.
+        delivered_by (Dict[int, int]): The truck index that delivered each
+            package, by package id.
+        departure_times (List[Optional[int]]): When each truck first left
+            the depot, or None if it never did.
+        return_times (List[Optional[int]]): When each truck was back at the
+            depot for good, or None if it was not by the end of the day.
+        miles (List[float]): The miles each truck drove, including the
+            drive back to the depot.
+        address_changes (List[int]): The ids of packages whose corrected
+            address came through.
+        event_counts (Dict[EventKind, int]): The events handled, by kind.
+        wall_seconds (float): How long the simulation took to run.
+    """
+
+    __slots__ = (
+        "delivery_times", "delivered_by", "departure_times", "return_times",
+        "miles", "address_changes", "event_counts", "wall_seconds"
+    )
+
+    def __init__(self, truck_count: int) -> None:
+        self.delivery_times: Dict[int, int] = {}
+        self.delivered_by: Dict[int, int] = {}
+        self.departure_times: List[Optional[int]] = [None] * truck_count
+        self.return_times: List[Optional[int]] = [None] * truck_count
+        self.miles: List[float] = [0.0] * truck_count
+        self.address_changes: List[int] = []
+        self.event_counts: Dict[EventKind, int] = {kind: 0 for kind in EventKind}
+        self.wall_seconds: float = 0.0
+
+    @property
+    def events(self) -> int:
+        """
+        The number of events handled.
+        """
+        return sum(self.event_counts.values())
+
+    @property
+    def events_per_second(self) -> float:
+        """
+        The events handled per second of wall-clock time.
+        """
+        return self.events / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def __repr__(self):
+        return (
+            f"SimulationResult(delivered={len(self.delivery_times)}, miles={sum(self.miles):.1f}, "
+            f"events={self.events})"
+        )
+
+
+class _TruckState:
+    """
+    Where a truck is and what it still has to do.
+    """
+
+    __slots__ = (
+        "index", "location", "target", "pending", "held", "missing",
+        "route", "has_driver", "waiting", "loaded"
+    )
+
+    def __init__(self, index: int) -> None:
+        self.index: int = index
+        self.location: int = 0
+        self.target: int = 0
+        # Stop -> package numbers to deliver there
+        self.pending: Dict[int, List[int]] = {}
+        # Packages on board whose address is not known yet
+        self.held: int = 0
+        # Packages still to reach the depot before the truck can leave
+        self.missing: int = 0
+        self.route: Optional[Deque[int]] = None
+        self.has_driver: bool = False
+        self.waiting: bool = False
+        self.loaded: bool = False
+
+
+class DeliverySimulation:
+    """
+    Simulates a delivery day as a queue of timed events.
+
+    Every truck moves at once in simulated time: the queue holds the next
+    thing that happens to each truck and package, and handling an event
+    schedules the ones that follow from it. A truck leaves once it has a
+    driver and all of its packages are at the depot, drives to the nearest
+    stop with something to deliver (or along a planned route), delivers and
+    moves on; with nothing left it drives back, and its driver takes the
+    next truck that is waiting. Delayed packages arrive at the depot and
+    corrected addresses come through as events of their own, so a truck
+    waiting on either carries on the moment it happens.
+
+    Packages a truck may not deliver under the business rules, e.g. part
+    of a group that was split between trucks, stay on board.
+    """
+
+    def __init__(
+            self,
+            problem: VrpProblem,
+            loads: Sequence[Sequence[int]],
+            routes: Optional[Sequence[Sequence[int]]] = None,
+            redirects: Optional[Dict[int, int]] = None
+    ) -> None:
+        """
+        Prepares a day.
+
+        Args:
+            problem (VrpProblem): The packages, distances, drivers and
+                timings of the day.
+            loads (Sequence[Sequence[int]]): The package ids each truck
+                carries, truck 1 first.
+            routes (Optional[Sequence[Sequence[int]]]): The package ids of
+                each truck in delivery order, e.g. from VrpSolution.routes,
+                to visit the stops in that order instead of nearest first.
+            redirects (Optional[Dict[int, int]]): The stop each package
+                with a corrected address really goes to, by package id.
+        """
+        self.problem: VrpProblem = problem
+        self.loads: Sequence[Sequence[int]] = loads
+        self.routes: Optional[Sequence[Sequence[int]]] = routes
+        self.redirects: Dict[int, int] = redirects or {}
+
+    def run(self) -> SimulationResult:
+        """
+        Runs the day until the last event or the end of the day.
+
+        Returns:
+            What happened.
+
+        Raises:
+            ValueError: If a package is loaded on more than one truck or is not in the problem.
+        """
+        started: float = time.perf_counter()
+        problem: VrpProblem = self.problem
+        truck_count: int = len(self.loads)
+        self._result: SimulationResult = SimulationResult(truck_count)
+        self._queue: List[Event] = []
+        self._sequence: int = 0
+        self._trucks: List[_TruckState] = [_TruckState(index) for index in range(truck_count)]
+        self._idle: Deque[int] = deque()
+
+        number_of: Dict[int, int] = {package_id: number for number, package_id in enumerate(problem.package_ids)}
+        self._stops: List[int] = list(problem.stops)
+        self._truck_of: List[Optional[int]] = [None] * len(problem.package_ids)
+        self._address_known: List[bool] = [ready <= problem.start_time for ready in problem.ready_times]
+        # Packages a truck is waiting for at the depot, and ones it holds until their address comes through
+        self._awaited: List[bool] = [False] * len(problem.package_ids)
+        self._held: List[bool] = [False] * len(problem.package_ids)
+
+        for truck, load in enumerate(self.loads):
+            for package_id in load:
+                number: Optional[int] = number_of.get(package_id)
+                if number is None or self._truck_of[number] is not None:
+                    raise ValueError(f"Package {package_id} is not on the manifest or is loaded twice")
+                self._truck_of[number] = truck
+        self._load_trucks()
+
+        for number, release in enumerate(problem.releases):
+            if release > problem.start_time:
+                self._schedule(release, EventKind.PACKAGE_ARRIVAL, number)
+        for number, ready in enumerate(problem.ready_times):
+            if ready > problem.start_time:
+                self._schedule(ready, EventKind.ADDRESS_CHANGE, number)
+
+        self._idle.extend(truck.index for truck in self._trucks if truck.loaded)
+        for _ in range(problem.driver_count):
+            self._assign_driver(problem.start_time)
+
+        handlers = {
+            EventKind.PACKAGE_ARRIVAL: self._package_arrival,
+            EventKind.ADDRESS_CHANGE: self._address_change,
+            EventKind.DELIVERY: self._delivery,
+            EventKind.DRIVER_RETURN: self._driver_return,
+            EventKind.TRUCK_DEPARTURE: self._truck_departure,
+            EventKind.STOP_ARRIVAL: self._stop_arrival
+        }
+        counts: Dict[EventKind, int] = self._result.event_counts
+        queue: List[Event] = self._queue
+        while queue and queue[0][0] <= problem.end_time:
+            now, kind, _, subject = heapq.heappop(queue)
+            kind = EventKind(kind)
+            counts[kind] += 1
+            handlers[kind](now, subject)
+
+        self._result.wall_seconds = time.perf_counter() - started
+        return self._result
+
+    def _load_trucks(self) -> None:
+        """
+        Private method that sorts each truck's packages by stop and sets
+        aside the ones it may not deliver.
+        """
+        problem: VrpProblem = self.problem
+        unit_of: Dict[int, int] = {
+            number: unit for unit, members in enumerate(problem.units) for number in members
+        }
+        # Group counters: members of each unit on each truck
+        unit_counts: List[Dict[int, int]] = [{} for _ in self._trucks]
+        numbers_by_truck: List[List[int]] = [[] for _ in self._trucks]
+        for number, owner in enumerate(self._truck_of):
+            if owner is not None:
+                numbers_by_truck[owner].append(number)
+                unit: int = unit_of[number]
+                unit_counts[owner][unit] = unit_counts[owner].get(unit, 0) + 1
+
+        for truck in self._trucks:
+            for number in numbers_by_truck[truck.index]:
+                unit = unit_of[number]
+                allowed: Optional[List[int]] = problem.unit_trucks[unit]
+                if (allowed is not None and truck.index not in allowed) or (
+                        unit_counts[truck.index][unit] != len(problem.units[unit])
+                ):
+                    continue
+                truck.loaded = True
+                if problem.releases[number] > problem.start_time:
+                    truck.missing += 1
+                    self._awaited[number] = True
+                if self._address_known[number]:
+                    truck.pending.setdefault(self._stops[number], []).append(number)
+                else:
+                    truck.held += 1
+                    self._held[number] = True
+
+        if self.routes is not None:
+            number_of: Dict[int, int] = {
+                package_id: number for number, package_id in enumerate(problem.package_ids)
+            }
+            for truck, route in zip(self._trucks, self.routes):
+                truck.route = deque(dict.fromkeys(self._stops[number_of[package_id]] for package_id in route))
+
+    def _schedule(self, at: int, kind: EventKind, subject: int) -> None:
+        """
+        Private method that adds an event to the queue.
+        """
+        self._sequence += 1
+        heapq.heappush(self._queue, (at, kind, self._sequence, subject))
+
+    def _drive_seconds(self, distance: float) -> int:
+        """
+        Private method that gets the whole seconds a drive takes, the way a
+        truck's clock counts them.
+        """
+        return int(round(distance / self.problem.speed, 6))
+
+    def _assign_driver(self, now: int) -> None:
+        """
+        Private method that gives a free driver the next truck waiting at
+        the depot, preferring one whose packages have all arrived.
+        """
+        if not self._idle:
+            return
+        ready: Optional[int] = next((index for index in self._idle if self._trucks[index].missing == 0), None)
+        index: int = ready if ready is not None else self._idle[0]
+        self._idle.remove(index)
+        truck: _TruckState = self._trucks[index]
+        truck.has_driver = True
+        if truck.missing == 0:
+            self._schedule(now, EventKind.TRUCK_DEPARTURE, index)
+
+    def _package_arrival(self, now: int, number: int) -> None:
+        """
+        Private method that handles a delayed package reaching the depot.
+        """
+        if not self._awaited[number]:
+            return
+        truck: _TruckState = self._trucks[self._truck_of[number]]
+        truck.missing -= 1
+        if truck.missing == 0 and truck.has_driver and self._result.departure_times[truck.index] is None:
+            self._schedule(now, EventKind.TRUCK_DEPARTURE, truck.index)
+
+    def _address_change(self, now: int, number: int) -> None:
+        """
+        Private method that handles a corrected address coming through. A
+        truck that was only waiting for it sets off again.
+        """
+        package_id: int = self.problem.package_ids[number]
+        self._address_known[number] = True
+        self._stops[number] = self.redirects.get(package_id, self._stops[number])
+        self._result.address_changes.append(package_id)
+
+        if not self._held[number]:
+            return
+        owner: int = self._truck_of[number]
+        truck: _TruckState = self._trucks[owner]
+        truck.held -= 1
+        truck.pending.setdefault(self._stops[number], []).append(number)
+        if truck.waiting:
+            truck.waiting = False
+            self._schedule(now, EventKind.TRUCK_DEPARTURE, owner)
+
+    def _delivery(self, now: int, number: int) -> None:
+        """
+        Private method that records a package being handed over.
+        """
+        package_id: int = self.problem.package_ids[number]
+        self._result.delivery_times[package_id] = now
+        self._result.delivered_by[package_id] = self._truck_of[number]
+
+    def _driver_return(self, now: int, index: int) -> None:
+        """
+        Private method that handles a truck getting back to the depot; its
+        driver moves on to the next truck.
+        """
+        truck: _TruckState = self._trucks[index]
+        self._result.miles[index] += self.problem.distances[truck.location][0]
+        truck.location = 0
+        truck.has_driver = False
+        self._result.return_times[index] = now
+        self._assign_driver(now)
+
+    def _truck_departure(self, now: int, index: int) -> None:
+        """
+        Private method that sends a truck to its next stop, back to the
+        depot when it has nothing left, or parks it until an address it
+        needs comes through.
+        """
+        truck: _TruckState = self._trucks[index]
+        if self._result.departure_times[index] is None:
+            self._result.departure_times[index] = now
+
+        next_stop: Optional[int] = self._next_stop(truck)
+        row: Sequence[float] = self.problem.distances[truck.location]
+        if next_stop is None:
+            if truck.held:
+                truck.waiting = True
+            else:
+                self._schedule(now + self._drive_seconds(row[0]), EventKind.DRIVER_RETURN, index)
+            return
+        truck.target = next_stop
+        self._schedule(now + self._drive_seconds(row[next_stop]), EventKind.STOP_ARRIVAL, index)
+
+    def _stop_arrival(self, now: int, index: int) -> None:
+        """
+        Private method that handles a truck reaching a stop: every package
+        for the stop is delivered, then the truck moves on.
+        """
+        truck: _TruckState = self._trucks[index]
+        self._result.miles[index] += self.problem.distances[truck.location][truck.target]
+        truck.location = truck.target
+        deadlines: List[int] = self.problem.deadlines
+        for number in sorted(truck.pending.pop(truck.location, ()), key=deadlines.__getitem__):
+            self._schedule(now, EventKind.DELIVERY, number)
+        self._schedule(now, EventKind.TRUCK_DEPARTURE, index)
+
+    def _next_stop(self, truck: _TruckState) -> Optional[int]:
+        """
+        Private method that picks a truck's next stop: the next one on its
+        route that still has packages, otherwise the nearest one.
+        """
+        pending: Dict[int, List[int]] = truck.pending
+        if truck.route:
+            while truck.route:
+                stop: int = truck.route.popleft()
+                if stop in pending:
+                    return stop
+        if not pending:
+            return None
+        distances: DistanceRows = self.problem.distances
+        return min(pending, key=distances[truck.location].__getitem__)
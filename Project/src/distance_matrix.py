@@ -0,0 +1,285 @@
+import math
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from constants import DEFAULT_DISTANCE_MATRIX_CAPACITY
+from model.hub import Hub
+
+
+class DistanceMatrix:
+    """
+    A dense distance matrix for storing the distances between hubs.
+
+    Every hub is given a dense integer index the first time it is added,
+    and distances live in one contiguous ``array('d')`` buffer laid out
+    row by row, so a lookup is a single index computation instead of
+    hashing a tuple of hubs.  Distances that have never been set are kept
+    as ``NaN``.
+
+    The matrix also behaves like the ``Dict[Tuple[Hub, Hub], float]`` the
+    graph used to keep, so ``matrix.get((hub1, hub2))`` keeps working for
+    existing callers.
+
+    Attributes:
+        hub_index (Dict[Hub, int]): A dictionary mapping each hub to its
+            row / column in the matrix.
+        hubs (List[Hub]): The hubs in index order.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_DISTANCE_MATRIX_CAPACITY) -> None:
+        """
+        Initialize an empty matrix with room for `capacity` hubs.
+
+        Args:
+            capacity (int): The number of hubs to reserve space for.
+                The matrix doubles its capacity when it runs out of room.
+        """
+        self.hub_index: Dict[Hub, int] = {}
+        self.hubs: List[Hub] = []
+        self._capacity: int = max(1, capacity)
+        self._cells: array = array('d', [math.nan]) * (self._capacity * self._capacity)
+        self._length: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Gets the number of hubs the matrix can hold before growing.
+
+        Returns:
+            The current capacity of the matrix.
+        """
+        return self._capacity
+
+    @property
+    def cells(self) -> array:
+        """
+        Gets the underlying row-major buffer.  Row `i` starts at
+        ``i * capacity``.
+
+        Returns:
+            The contiguous buffer holding the distances.
+        """
+        return self._cells
+
+    def add_hub(self, hub: Hub) -> int:
+        """
+        Assigns the next dense index to a hub, growing the matrix if needed.
+
+        Args:
+            hub (Hub): The hub to add.
+
+        Returns:
+            The index of the hub.
+        """
+        index: Optional[int] = self.hub_index.get(hub)
+        if index is not None:
+            return index
+
+        index = len(self.hubs)
+        if index >= self._capacity:
+            self._grow(new_capacity=self._capacity * 2)
+
+        self.hub_index[hub] = index
+        self.hubs.append(hub)
+        return index
+
+    def index_of(self, hub: Hub) -> Optional[int]:
+        """
+        Gets the dense index of a hub.
+
+        Args:
+            hub (Hub): The hub to look up.
+
+        Returns:
+            The index of the hub, or None if the hub is not in the matrix.
+        """
+        return self.hub_index.get(hub)
+
+    def set_by_index(self, row: int, column: int, distance: float) -> None:
+        """
+        Sets the distance between two hub indices in both directions.
+
+        Args:
+            row (int): The index of the first hub.
+            column (int): The index of the second hub.
+            distance (float): The distance between the two hubs.
+        """
+        for offset in (row * self._capacity + column, column * self._capacity + row):
+            if self._cells[offset] != self._cells[offset]:
+                self._length += 1
+            self._cells[offset] = distance
+
+    def get_by_index(self, row: int, column: int) -> float:
+        """
+        Gets the distance between two hub indices.
+
+        Args:
+            row (int): The index of the first hub.
+            column (int): The index of the second hub.
+
+        Returns:
+            The distance between the two hubs, or infinity if it was never set.
+        """
+        distance: float = self._cells[row * self._capacity + column]
+        return math.inf if distance != distance else distance
+
+    def _grow(self, new_capacity: int) -> None:
+        """
+        Private method that copies the matrix into a larger buffer.
+
+        Args:
+            new_capacity (int): The new number of hubs the matrix can hold.
+        """
+        cells: array = array('d', [math.nan]) * (new_capacity * new_capacity)
+        size: int = len(self.hubs)
+        for row in range(size):
+            old_start: int = row * self._capacity
+            new_start: int = row * new_capacity
+            cells[new_start:new_start + size] = self._cells[old_start:old_start + size]
+
+        self._cells = cells
+        self._capacity = new_capacity
+
+    def get(self, key: Tuple[Hub, Hub], default: Optional[float] = None) -> Optional[float]:
+        """
+        Gets the distance between a pair of hubs.
+
+        Args:
+            key (Tuple[Hub, Hub]): The pair of hubs.
+            default (Optional[float]): The value to return when there is no distance.
+
+        Returns:
+            The distance between the hubs, or `default` if it was never set.
+        """
+        row: Optional[int] = self.hub_index.get(key[0])
+        column: Optional[int] = self.hub_index.get(key[1])
+        if row is None or column is None:
+            return default
+
+        distance: float = self._cells[row * self._capacity + column]
+        return default if distance != distance else distance
+
+    def __getitem__(self, key: Tuple[Hub, Hub]) -> float:
+        distance: Optional[float] = self.get(key)
+        if distance is None:
+            raise KeyError(key)
+        return distance
+
+    def __setitem__(self, key: Tuple[Hub, Hub], distance: float) -> None:
+        self.set_by_index(
+            row=self.add_hub(key[0]),
+            column=self.add_hub(key[1]),
+            distance=distance
+        )
+
+    def __contains__(self, key: Tuple[Hub, Hub]) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Tuple[Hub, Hub]]:
+        for row, hub1 in enumerate(self.hubs):
+            start: int = row * self._capacity
+            for column, hub2 in enumerate(self.hubs):
+                distance: float = self._cells[start + column]
+                if distance == distance:
+                    yield hub1, hub2
+
+    def items(self) -> Iterator[Tuple[Tuple[Hub, Hub], float]]:
+        """
+        Iterates over every pair of hubs with a distance set.
+
+        Returns:
+            An iterator of ((hub1, hub2), distance) tuples.
+        """
+        for key in self:
+            yield key, self[key]
+
+
+class TriangularDistanceMatrix(DistanceMatrix):
+    """
+    A read-only distance matrix over an existing buffer holding only the
+    lower triangle, such as a block memory mapped from a compiled
+    bundle. Distance (i, j) for i > j lives at ``i * (i - 1) / 2 + j`` and
+    the matrix is symmetric, so a complete matrix of n hubs takes
+    n * (n - 1) / 2 cells and nothing is copied out of the buffer.
+
+    The diagonal is not stored and reads as unset, like in a DistanceMatrix
+    loaded from the spreadsheet.
+    """
+
+    def __init__(self, hubs: List[Hub], cells: Union[array, memoryview]) -> None:
+        """
+        Initialize the matrix over a lower-triangular buffer.
+
+        Args:
+            hubs (List[Hub]): The hubs in row order.
+            cells (Union[array, memoryview]): The lower triangle, row by row.
+        """
+        size: int = len(hubs)
+        if len(cells) != size * (size - 1) // 2:
+            raise ValueError(f"expected {size * (size - 1) // 2} cells for {size} hubs, got {len(cells)}")
+
+        self.hub_index: Dict[Hub, int] = {hub: index for index, hub in enumerate(hubs)}
+        self.hubs: List[Hub] = list(hubs)
+        self._capacity: int = size
+        self._cells: Union[array, memoryview] = cells
+        self._length: int = size * (size - 1)
+
+    @property
+    def cells(self) -> Union[array, memoryview]:
+        """
+        Gets the underlying lower-triangular buffer.  Row `i` starts at
+        ``i * (i - 1) / 2`` and holds `i` cells.
+
+        Returns:
+            The buffer holding the distances.
+        """
+        return self._cells
+
+    def add_hub(self, hub: Hub) -> int:
+        """
+        Gets the index of a hub already in the matrix.
+
+        Raises:
+            ValueError: If the hub is not in the matrix, since the matrix
+                cannot grow.
+        """
+        index: Optional[int] = self.hub_index.get(hub)
+        if index is None:
+            raise ValueError(f"{hub} is not in this read-only distance matrix")
+        return index
+
+    def set_by_index(self, row: int, column: int, distance: float) -> None:
+        raise TypeError("TriangularDistanceMatrix is read-only")
+
+    def get_by_index(self, row: int, column: int) -> float:
+        """
+        Gets the distance between two hub indices.
+
+        Args:
+            row (int): The index of the first hub.
+            column (int): The index of the second hub.
+
+        Returns:
+            The distance between the two hubs, or infinity on the diagonal.
+        """
+        if row > column:
+            return self._cells[row * (row - 1) // 2 + column]
+        if column > row:
+            return self._cells[column * (column - 1) // 2 + row]
+        return math.inf
+
+    def get(self, key: Tuple[Hub, Hub], default: Optional[float] = None) -> Optional[float]:
+        row: Optional[int] = self.hub_index.get(key[0])
+        column: Optional[int] = self.hub_index.get(key[1])
+        if row is None or column is None or row == column:
+            return default
+        return self.get_by_index(row, column)
+
+    def __iter__(self) -> Iterator[Tuple[Hub, Hub]]:
+        for hub1 in self.hubs:
+            for hub2 in self.hubs:
+                if hub1 is not hub2:
+                    yield hub1, hub2
@@ -1,7 +1,33 @@
+import heapq
 import math
-from typing import Dict, List, Optional, Tuple
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 
 from model.hub import Hub
+from src.distance_matrix import DistanceMatrix
+from src.parser import Parser
+from src.shortest_paths import ShortestPaths
+
+
+class _OtherHubs:
+    """
+    The neighbors of a hub in a complete graph: every other hub. It reads
+    the graph's hub list instead of storing one entry per edge.
+    """
+
+    __slots__ = ("_hubs", "_hub")
+
+    def __init__(self, hubs: List[Hub], hub: Hub) -> None:
+        self._hubs: List[Hub] = hubs
+        self._hub: Hub = hub
+
+    def __iter__(self) -> Iterator[Hub]:
+        hub: Hub = self._hub
+        return (other for other in self._hubs if other is not hub)
+
+    def __len__(self) -> int:
+        return len(self._hubs) - 1
 
 
 class Graph:
@@ -12,23 +38,77 @@ class Graph:
         adjacency_list (Dict[Hub, List[Hub]]): A dictionary
             mapping each location
             to a list of its adjacent locations.
-        distance (Dict[Tuple[Hub, Hub], float]): A dictionary
-            mapping each pair of
-            locations to the distance between them.
+        distance (Union[Dict[Tuple[Hub, Hub], float], DistanceMatrix]):
+            A dictionary mapping each pair of
+            locations to the distance between them, or a dense
+            DistanceMatrix offering the same lookups when the graph
+            is matrix backed.
+        hubs (List[Hub]): The hubs in the order they were added.
+        hub_index (Dict[Hub, int]): A dictionary mapping each hub to its
+            position in `hubs`.
+        hubs_by_address (Dict[str, Hub]): A dictionary mapping each
+            normalized hub address to its hub.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, use_matrix: bool = False) -> None:
         """
         Initialize the Graph with empty adjacency list
         and distance dictionary.
+
+        Args:
+            use_matrix (bool): Store distances in a dense DistanceMatrix
+                instead of a dictionary keyed by pairs of hubs.
         """
         self.adjacency_list: Dict[Hub, List[Hub]] = {}
-        self.distance: Dict[Tuple[Hub, Hub], float] = {}
+        self.distance: Union[Dict[Tuple[Hub, Hub], float], DistanceMatrix] = (
+            DistanceMatrix() if use_matrix else {}
+        )
+        self.hubs: List[Hub] = []
+        self.hub_index: Dict[Hub, int] = {}
+        self.hubs_by_address: Dict[str, Hub] = {}
+        # Read-only hubs and hub indexes shared by search results until a hub is added
+        self._hub_snapshot: Optional[Tuple[Tuple[Hub, ...], Mapping[Hub, int]]] = None
+
+    @property
+    def is_matrix_backed(self) -> bool:
+        """
+        Whether the distances are stored in a dense DistanceMatrix.
+
+        Returns:
+            True if the graph is matrix backed, False otherwise.
+        """
+        return isinstance(self.distance, DistanceMatrix)
 
     def add_node(self, hub: Hub) -> None:
         """Add a new node (Hub) to the graph."""
         if hub not in self.adjacency_list:
             self.adjacency_list[hub]: List[Hub] = []
+            self.hub_index[hub] = len(self.hubs)
+            self.hubs.append(hub)
+            self._hub_snapshot = None
+            self.hubs_by_address.setdefault(
+                Parser.normalize_address(hub.address), hub
+            )
+            if self.is_matrix_backed:
+                self.distance.add_hub(hub)
+
+    def load_distance_matrix(self, matrix: DistanceMatrix) -> None:
+        """
+        Loads a complete distance matrix, such as one mapped from a compiled
+        bundle, into an empty graph. Every hub in the matrix becomes a node
+        joined to every other hub, and distances are read from the matrix
+        without being copied.
+
+        Args:
+            matrix (DistanceMatrix): The matrix holding the hubs and distances.
+        """
+        if self.hubs:
+            raise ValueError("a distance matrix can only be loaded into an empty graph")
+
+        self.distance = matrix
+        for hub in matrix.hubs:
+            self.add_node(hub)
+            self.adjacency_list[hub] = _OtherHubs(hubs=self.hubs, hub=hub)
 
     def add_edge(self, hub1: Hub, hub2: Hub, distance: float) -> None:
         """
@@ -46,70 +126,56 @@ class Graph:
             self._update_hub_distance(hub1=hub1, hub2=hub2, distance=distance)
 
     def get_hub_by_address(self, hub_address: str) -> Optional[Hub]:
-
-        for hub in self.adjacency_list:
-            if hub.address == hub_address:
-                return hub
-        return None
-
-    def get_distance(self, start_hub: Hub, end_hub: Hub) -> float:
         """
-        Gets distance between two hubs as long as
-        these are already in the adjacency list.
+        Gets the hub at an address.
 
         Args:
-            start_hub (Hub): The first location.
-            end_hub (Hub): The second location.
+            hub_address (str): The address of the hub. Spelling variants
+                such as "South" / "S" resolve to the same hub.
         Returns:
-            distance (float): The distance between the two locations.
+            hub (Optional[Hub]): The hub at the address, or None if there
+                is no hub at that address.
         """
-        if (
-                not self.adjacency_list[start_hub] or
-                end_hub not in self.adjacency_list
-        ):
-            return math.inf
-        else:
-            for adj_node in self.adjacency_list.get(start_hub):
-                if adj_node == end_hub:
-                    return self.distance.get((start_hub, adj_node))
-            return math.inf
+        return self.hubs_by_address.get(Parser.normalize_address(hub_address))
 
-    def _initialize_hubs(self) -> List[Hub]:
-        """
-        Private method to help initialize the unvisited
-        queue list with hubs (Hub) from the adjacency list.
+    def get_hubs_by_addresses(
+            self,
+            hub_addresses: Iterable[str]
+    ) -> List[Optional[Hub]]:
         """
+        Gets the hubs at several addresses in one call.
 
-        queue: List[Hub] = []
-        for hub in self.adjacency_list:
-            hub.distance = math.inf
-            hub.previous_hub = None
-            queue.append(hub)
-
-        return queue
+        Args:
+            hub_addresses (Iterable[str]): The addresses to look up.
+        Returns:
+            hubs (List[Optional[Hub]]): The hub at each address, in the same
+                order, with None for addresses that have no hub.
+        """
+        hubs_by_address: Dict[str, Hub] = self.hubs_by_address
+        normalize = Parser.normalize_address
+        return [hubs_by_address.get(normalize(address)) for address in hub_addresses]
 
-    def _get_hub_with_smallest_distance(
-            self,
-            unvisited_queue: List[Hub]
-    ) -> Hub:
+    def get_distance(self, start_hub: Hub, end_hub: Hub) -> float:
         """
-        Private method that returns the next hub with the smallest distance
+        Gets distance between two hubs as long as
+        these are already in the adjacency list.
 
         Args:
-            unvisited_queue List(Hub): List of hubs that are yet to be visited.
+            start_hub (Hub): The first location.
+            end_hub (Hub): The second location.
         Returns:
-            hub (Hub): Hub object
+            distance (float): The distance between the two locations.
         """
-        smallest_distance_index: int = 0
-        for i in range(1, unvisited_queue.__len__()):
-            if (
-                    unvisited_queue[i].distance <
-                    unvisited_queue[smallest_distance_index].distance and
-                    unvisited_queue[i] != unvisited_queue[smallest_distance_index]
-            ):
-                smallest_distance_index = i
+        if self.is_matrix_backed:
+            start_index: Optional[int] = self.distance.index_of(start_hub)
+            end_index: Optional[int] = self.distance.index_of(end_hub)
+            if start_index is None or end_index is None:
+                return math.inf
+            return self.distance.get_by_index(start_index, end_index)
 
-        return unvisited_queue.pop(smallest_distance_index)
+        # Only hubs joined by an edge have an entry in the distance dictionary
+        distance: Optional[float] = self.distance.get((start_hub, end_hub))
+        return math.inf if distance is None else distance
 
     def _update_hub_distance(self, hub1: Hub, hub2: Hub, distance: float):
         """
@@ -123,43 +189,94 @@ class Graph:
         self.distance[(hub1, hub2)]: float = distance
         self.distance[(hub2, hub1)]: float = distance
 
-    def dijkstra_shortest_path(self, start_hub: Hub) -> None:
+    def dijkstra_shortest_path(
+            self,
+            start_hub: Hub,
+            targets: Optional[Iterable[Hub]] = None
+    ) -> ShortestPaths:
         """
-        Applies Dijkstra's shortest path algorithm to the graph,
-        updating distance values
-        if a shorter path from the start hub to a hub is found.
+        Applies Dijkstra's shortest path algorithm to the graph using a
+        binary heap with lazy deletion.  Stale heap entries are skipped when
+        popped instead of being removed when a shorter path is found.
+
+        The graph is never modified; the distances and previous hubs are
+        returned in an immutable ShortestPaths object.
 
         Args
             start_hub (Hub): The starting hub for the shortest path.
+            targets (Optional[Iterable[Hub]]): Stop as soon as every one of
+                these hubs has been settled. Hubs not settled by then are
+                reported as unreached.
+        Returns:
+            shortest_paths (ShortestPaths): The shortest distance and previous
+                hub for every hub reached from the start hub.
         """
-        # Initialize all hubs as unvisited and set the distance to infinity
-        unvisited_queue: List[Hub] = self._initialize_hubs()
+        hubs: List[Hub] = self.hubs
+        hub_index: Dict[Hub, int] = self.hub_index
+
+        distances: array = array('d', [math.inf]) * len(hubs)
+        predecessors: array = array('l', [-1]) * len(hubs)
+        settled: bytearray = bytearray(len(hubs))
 
         # Distance to starting hub is zero
-        start_hub.distance = 0.0
+        start_index: int = hub_index[start_hub]
+        distances[start_index] = 0.0
+
+        remaining_targets: Set[int] = (
+            {hub_index[hub] for hub in targets} if targets is not None else set()
+        )
+        heap: List[Tuple[float, int]] = [(0.0, start_index)]
+
+        while heap:
+            # Visit the hub with the smallest distance, skipping stale entries
+            current_distance, current_index = heapq.heappop(heap)
+            if settled[current_index]:
+                continue
+            settled[current_index] = 1
+
+            if targets is not None:
+                remaining_targets.discard(current_index)
+                if not remaining_targets:
+                    break
+
+            current_hub: Hub = hubs[current_index]
 
-        # Visit each hub in the graph, then remove it from the unvisited queue
-        while unvisited_queue:
-            # Visit the hub with the smallest distance
-            current_hub: Hub = self._get_hub_with_smallest_distance(
-                unvisited_queue=unvisited_queue
-            )
             # Check the distance to each neighbor hub
             for neighbor_hub in self.adjacency_list.get(current_hub):
-                distance_between_hubs: float = self.distance.get(
-                    (current_hub, neighbor_hub)
-                )
-                new_shortest_distance: float = (
-                        current_hub.distance + distance_between_hubs
+                neighbor_index: int = hub_index[neighbor_hub]
+                if settled[neighbor_index]:
+                    continue
+
+                new_shortest_distance: float = current_distance + self.get_distance(
+                    start_hub=current_hub, end_hub=neighbor_hub
                 )
 
-                # Update distance with new shortest distance and previous hub
-                # if a shorter path is found
-                if new_shortest_distance < neighbor_hub.distance:
-                    self._update_hub_distance(
-                        hub1=start_hub,
-                        hub2=neighbor_hub,
-                        distance=new_shortest_distance
-                    )
-                    neighbor_hub.distance = new_shortest_distance
-                    neighbor_hub.previous_hub = current_hub
+                # Record the shorter path and queue the neighbor again
+                if new_shortest_distance < distances[neighbor_index]:
+                    distances[neighbor_index] = new_shortest_distance
+                    predecessors[neighbor_index] = current_index
+                    heapq.heappush(heap, (new_shortest_distance, neighbor_index))
+
+        # Hubs that were queued but never settled are not final
+        for index in range(len(hubs)):
+            if not settled[index]:
+                distances[index] = math.inf
+                predecessors[index] = -1
+
+        shared_hubs, shared_hub_index = self._shared_hubs()
+        return ShortestPaths(
+            source=start_hub,
+            hubs=shared_hubs,
+            hub_index=shared_hub_index,
+            distances=distances,
+            predecessors=predecessors
+        )
+
+    def _shared_hubs(self) -> Tuple[Tuple[Hub, ...], Mapping[Hub, int]]:
+        """
+        Private method that gets a read-only copy of the hubs and their
+        indexes, made once and shared by every search until a hub is added.
+        """
+        if self._hub_snapshot is None:
+            self._hub_snapshot = (tuple(self.hubs), MappingProxyType(dict(self.hub_index)))
+        return self._hub_snapshot
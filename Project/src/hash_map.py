@@ -1,14 +1,32 @@
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple, Union
+
+from constants import (
+    DEFAULT_HASH_MAP_LOAD_FACTOR,
+    DEFAULT_OPEN_ADDRESSING_CAPACITY
+)
+
+# Slot markers for OpenAddressingHashMap. A tombstone keeps probe
+# chains intact after a removal.
+_EMPTY: object = object()
+_TOMBSTONE: object = object()
 
 
 class HashMap:
     """A hash map for storing key-value pairs.
 
+    Every entry is stored as a (hash code, lookup key, key, value) tuple, so
+    the hash is computed once per entry and compared before the keys
+    themselves are.
+
     Args:
         size: The size of the hash map.
+        key: An optional function that extracts the lookup key from every key
+            passed to the map, e.g. ``attrgetter('package_id')``. It is used
+            consistently by add, get, remove and contains.
 
     Attributes:
         size: The size of the hash map.
+        key: The key extractor, or None to use keys as they are.
         table: A list of lists, where each inner list represents
         a bucket in the hash map.
 
@@ -21,9 +39,50 @@ class HashMap:
         clear: Clears the hash map.
     """
 
-    def __init__(self, size: int = 100) -> None:
+    def __init__(
+            self,
+            size: int = 100,
+            key: Optional[Callable[[Any], Hashable]] = None
+    ) -> None:
         self.size: int = size
-        self.table: List[List[Any]] = [[] for _ in range(self.size)]
+        self.key: Optional[Callable[[Any], Hashable]] = key
+        self.table: List[List[Tuple[int, Hashable, Any, Any]]] = [[] for _ in range(self.size)]
+        self._count: int = 0
+
+    def _lookup_key(self, key: Any, object_key: Optional[str] = None) -> Hashable:
+        """
+        Private method that extracts the key used for hashing and comparison.
+
+        Args:
+            key: The key passed to the hash map.
+            object_key: The attribute of `key` to use for this call instead
+                of the map's key extractor.
+
+        Returns:
+            The lookup key.
+        """
+        if object_key:
+            return getattr(key, object_key)
+        if self.key is not None:
+            return self.key(key)
+        return key
+
+    def _find_in_bucket(
+            self,
+            bucket: List[Tuple[int, Hashable, Any, Any]],
+            lookup_key: Hashable,
+            hash_code: int
+    ) -> int:
+        """
+        Private method that finds an entry in a bucket.
+
+        Returns:
+            The position of the entry in the bucket, or -1 if it is not there.
+        """
+        for i, entry in enumerate(bucket):
+            if entry[0] == hash_code and (entry[1] is lookup_key or entry[1] == lookup_key):
+                return i
+        return -1
 
     def add(
             self,
@@ -36,20 +95,20 @@ class HashMap:
         Args:
             key: The key to add.
             value: The value to add.
+            object_key: The attribute of `key` to look it up by, if any.
 
         Returns:
             True if the key-value pair was added successfully, False otherwise.
         """
-        if object_key:
-            hash_code = hash(key.__getattribute__(object_key)) % self.size
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        hash_code: int = hash(lookup_key)
+        bucket = self.table[hash_code % self.size]
+        i: int = self._find_in_bucket(bucket, lookup_key, hash_code)
+        if i != -1:
+            bucket[i] = (hash_code, lookup_key, key, value)
         else:
-            hash_code = hash(key) % self.size
-        bucket = self.table[hash_code]
-        for i, kvp in enumerate(bucket):
-            if kvp[0] == key:
-                bucket[i] = (key, value)
-                return True
-        bucket.append((key, value))
+            bucket.append((hash_code, lookup_key, key, value))
+            self._count += 1
         return True
 
     def get(self, key: Any, object_key: Optional[str] = None) -> Optional[Any]:
@@ -57,55 +116,52 @@ class HashMap:
 
         Args:
             key: The key to get the value for.
+            object_key: The attribute of `key` to look it up by, if any.
 
         Returns:
             The value associated with the key, or None
             if the key is not present in the hash map.
         """
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        hash_code: int = hash(lookup_key)
+        bucket = self.table[hash_code % self.size]
+        i: int = self._find_in_bucket(bucket, lookup_key, hash_code)
+        return None if i == -1 else bucket[i][3]
 
-        if object_key:
-            hash_code = hash(key.__getattribute__(object_key)) % self.size
-        else:
-            hash_code = hash(key) % self.size
-        bucket = self.table[hash_code]
-        for kvp in bucket:
-            if kvp[0] == key:
-                return kvp[1]
-        return None
-
-    def remove(self, key: Any) -> bool:
+    def remove(self, key: Any, object_key: Optional[str] = None) -> bool:
         """Removes a key-value pair from the hash map.
 
         Args:
             key: The key to remove.
+            object_key: The attribute of `key` to look it up by, if any.
 
         Returns:
             True if the key-value pair was removed successfully,
             False otherwise.
         """
-        hash_code = hash(key) % self.size
-        bucket = self.table[hash_code]
-        for i, kvp in enumerate(bucket):
-            if kvp[0] == key:
-                bucket.pop(i)
-                return True
-        return False
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        hash_code: int = hash(lookup_key)
+        bucket = self.table[hash_code % self.size]
+        i: int = self._find_in_bucket(bucket, lookup_key, hash_code)
+        if i == -1:
+            return False
+        bucket.pop(i)
+        self._count -= 1
+        return True
 
-    def contains(self, key: Any) -> bool:
+    def contains(self, key: Any, object_key: Optional[str] = None) -> bool:
         """Checks if a key is present in the hash map.
 
         Args:
             key: The key to check for.
+            object_key: The attribute of `key` to look it up by, if any.
 
         Returns:
             True if the key is present in the hash map, False otherwise.
         """
-        hash_code = hash(key) % self.size
-        bucket = self.table[hash_code]
-        for kvp in bucket:
-            if kvp[0] == key:
-                return True
-        return False
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        hash_code: int = hash(lookup_key)
+        return self._find_in_bucket(self.table[hash_code % self.size], lookup_key, hash_code) != -1
 
     def size(self) -> int:
         """
@@ -121,13 +177,61 @@ class HashMap:
         Clears the hash map.
         """
         self.table = [[] for _ in range(self.size)]
+        self._count = 0
+
+    def __len__(self) -> int:
+        """
+        Gets the number of key-value pairs in the hash map. The count is
+        kept up to date by add and remove, so this is O(1).
+
+        Returns:
+            The number of key-value pairs.
+        """
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterates over the keys in the hash map without copying them.
+        """
+        return self.keys()
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        """
+        Iterates over the (key, value) pairs in the hash map without building
+        a list. The hash map must not be changed while iterating.
+
+        Returns:
+            An iterator of (key, value) tuples.
+        """
+        for bucket in self.table:
+            for entry in bucket:
+                yield entry[2], entry[3]
+
+    def keys(self) -> Iterator[Any]:
+        """
+        Iterates over the keys in the hash map without building a list.
+
+        Returns:
+            An iterator of keys.
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self) -> Iterator[Any]:
+        """
+        Iterates over the values in the hash map without building a list.
+
+        Returns:
+            An iterator of values.
+        """
+        for _, value in self.items():
+            yield value
 
     def display_package_status(self) -> None:
         """
         Displays all packages to the console, one package per line.
         """
-        all_packages = self.get_all_elements()
-        for package in all_packages:
+        for package in self.items():
             print(package)
 
     def print_package(self, key) -> None:
@@ -150,13 +254,229 @@ class HashMap:
             List (Any): A flattened list with all current elements
             in the HashMap.
         """
-        flat_list: List[Any] = []
-        for element in self.table:
-            if type(element) is list:
-                # If the element is of type list, iterate through the sublist
-                for item in element:
-                    if len(item) > 0:
-                        flat_list.append(item)
-            else:
-                flat_list.append(element)
-        return flat_list
+        return list(self.items())
+
+
+class OpenAddressingHashMap(HashMap):
+    """A hash map that stores key-value pairs with open addressing.
+
+    Entries live in flat slot lists and collisions are resolved with linear
+    probing. The table doubles in size whenever live entries plus
+    tombstones would exceed the load factor, so lookups stay O(1) no matter
+    how many keys are added. `remove` leaves a tombstone so later probes
+    still reach the keys after it. Tombstones are dropped on the next
+    resize.
+
+    Like HashMap, every slot keeps the hash code and lookup key of its
+    entry, so probing compares hash codes before keys.
+
+    Args:
+        size: The initial number of slots, rounded up to a power of two.
+        load_factor: The fraction of slots that may be used before
+            the table grows.
+        key: An optional function that extracts the lookup key from every
+            key passed to the map. See HashMap.
+
+    Attributes:
+        size: The current number of slots in the hash map.
+        load_factor: The fraction of slots that may be used before
+            the table grows.
+        key: The key extractor, or None to use keys as they are.
+    """
+
+    def __init__(
+            self,
+            size: int = DEFAULT_OPEN_ADDRESSING_CAPACITY,
+            load_factor: float = DEFAULT_HASH_MAP_LOAD_FACTOR,
+            key: Optional[Callable[[Any], Hashable]] = None
+    ) -> None:
+        if not 0.0 < load_factor < 1.0:
+            raise ValueError("load_factor must be between 0 and 1")
+
+        self.load_factor: float = load_factor
+        self.key: Optional[Callable[[Any], Hashable]] = key
+        self.size: int = 8
+        while self.size < size:
+            self.size *= 2
+        self._allocate(self.size)
+
+    def _allocate(self, slots: int) -> None:
+        """
+        Private method that resets the table to `slots` empty slots.
+        """
+        self.size = slots
+        self._keys: List[Any] = [_EMPTY] * slots
+        self._lookup_keys: List[Hashable] = [None] * slots
+        self._values: List[Any] = [None] * slots
+        self._hashes: List[int] = [0] * slots
+        self._count: int = 0
+        self._tombstones: int = 0
+
+    def _resize(self) -> None:
+        """
+        Private method that rehashes every live entry into a new table.
+        The table doubles unless most of the used slots are tombstones,
+        in which case it is rebuilt at the same size.
+        """
+        keys, lookup_keys = self._keys, self._lookup_keys
+        values, hashes = self._values, self._hashes
+        slots: int = self.size
+        if (self._count + 1) > slots * self.load_factor / 2:
+            slots *= 2
+
+        self._allocate(slots)
+        mask: int = slots - 1
+        for key, lookup_key, value, hash_code in zip(keys, lookup_keys, values, hashes):
+            if key is _EMPTY or key is _TOMBSTONE:
+                continue
+            index: int = hash_code & mask
+            while self._keys[index] is not _EMPTY:
+                index = (index + 1) & mask
+            self._keys[index] = key
+            self._lookup_keys[index] = lookup_key
+            self._values[index] = value
+            self._hashes[index] = hash_code
+            self._count += 1
+
+    def _find(self, lookup_key: Hashable, hash_code: int) -> int:
+        """
+        Private method that probes for a lookup key.
+
+        Returns:
+            The slot holding the key, or -1 if the key is not present.
+        """
+        mask: int = self.size - 1
+        index: int = hash_code & mask
+        keys: List[Any] = self._keys
+        hashes: List[int] = self._hashes
+        while True:
+            slot_key: Any = keys[index]
+            if slot_key is _EMPTY:
+                return -1
+            if slot_key is not _TOMBSTONE and hashes[index] == hash_code:
+                slot_lookup_key: Hashable = self._lookup_keys[index]
+                if slot_lookup_key is lookup_key or slot_lookup_key == lookup_key:
+                    return index
+            index = (index + 1) & mask
+
+    def add(
+            self,
+            key: Union[object, Any],
+            value: Any,
+            object_key: Optional[str] = None
+    ) -> bool:
+        """Adds a key-value pair to the hash map, replacing the value
+        if the key is already present.
+
+        Args:
+            key: The key to add.
+            value: The value to add.
+            object_key: The attribute of `key` to look it up by, if any.
+
+        Returns:
+            True once the key-value pair has been added.
+        """
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        hash_code: int = hash(lookup_key)
+        index: int = self._find(lookup_key, hash_code)
+        if index != -1:
+            self._keys[index] = key
+            self._values[index] = value
+            return True
+
+        if self._count + self._tombstones + 1 > self.size * self.load_factor:
+            self._resize()
+
+        # Reuse the first tombstone on the probe path, if there is one
+        mask: int = self.size - 1
+        index = hash_code & mask
+        while self._keys[index] is not _EMPTY and self._keys[index] is not _TOMBSTONE:
+            index = (index + 1) & mask
+        if self._keys[index] is _TOMBSTONE:
+            self._tombstones -= 1
+
+        self._keys[index] = key
+        self._lookup_keys[index] = lookup_key
+        self._values[index] = value
+        self._hashes[index] = hash_code
+        self._count += 1
+        return True
+
+    def get(self, key: Any, object_key: Optional[str] = None) -> Optional[Any]:
+        """Gets the value associated with a key in the hash map.
+
+        Args:
+            key: The key to get the value for.
+            object_key: The attribute of `key` to look it up by, if any.
+
+        Returns:
+            The value associated with the key, or None
+            if the key is not present in the hash map.
+        """
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        index: int = self._find(lookup_key, hash(lookup_key))
+        return None if index == -1 else self._values[index]
+
+    def remove(self, key: Any, object_key: Optional[str] = None) -> bool:
+        """Removes a key-value pair from the hash map, leaving a tombstone
+        in its slot.
+
+        Args:
+            key: The key to remove.
+            object_key: The attribute of `key` to look it up by, if any.
+
+        Returns:
+            True if the key-value pair was removed successfully,
+            False otherwise.
+        """
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        index: int = self._find(lookup_key, hash(lookup_key))
+        if index == -1:
+            return False
+
+        self._keys[index] = _TOMBSTONE
+        self._lookup_keys[index] = None
+        self._values[index] = None
+        self._count -= 1
+        self._tombstones += 1
+        return True
+
+    def contains(self, key: Any, object_key: Optional[str] = None) -> bool:
+        """Checks if a key is present in the hash map.
+
+        Args:
+            key: The key to check for.
+            object_key: The attribute of `key` to look it up by, if any.
+
+        Returns:
+            True if the key is present in the hash map, False otherwise.
+        """
+        lookup_key: Hashable = self._lookup_key(key, object_key)
+        return self._find(lookup_key, hash(lookup_key)) != -1
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, keeping its current number of slots.
+        """
+        self._allocate(self.size)
+
+    def __len__(self) -> int:
+        """
+        Gets the number of key-value pairs in the hash map.
+
+        Returns:
+            The number of key-value pairs.
+        """
+        return self._count
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        """
+        Iterates over the (key, value) pairs in slot order without building
+        a list. The hash map must not be changed while iterating.
+
+        Returns:
+            An iterator of (key, value) tuples.
+        """
+        for key, value in zip(self._keys, self._values):
+            if key is not _EMPTY and key is not _TOMBSTONE:
+                yield key, value
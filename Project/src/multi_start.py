@@ -0,0 +1,143 @@
+import copy
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence
+
+from constants import VRP_BUDGET_SECONDS
+from src.vrp_solver import VrpProblem, VrpSolution, VrpSolver
+
+# The problem each worker process solves, attached once by _attach_worker.
+_worker_block: Optional[shared_memory.SharedMemory] = None
+_worker_problem: Optional[VrpProblem] = None
+
+
+class MultiStart:
+    """
+    Runs the VRP solver from many seeds and keeps the best plan.
+
+    Independent restarts explore different parts of the search space, so
+    the best of several short runs usually beats one long run. Runs are
+    spread over a process pool; the distance matrix is copied into shared
+    memory once and every worker reads it in place instead of receiving
+    its own pickled copy.
+    """
+
+    @staticmethod
+    def solve(
+            problem: VrpProblem,
+            seeds: Sequence[int],
+            budget_seconds: float = VRP_BUDGET_SECONDS,
+            max_iterations: Optional[int] = None,
+            workers: Optional[int] = None,
+            on_improvement: Optional[Callable[[VrpSolution], None]] = None
+    ) -> VrpSolution:
+        """
+        Solves a problem once per seed within one wall-clock budget.
+
+        Each run gets an equal share of the budget: with more seeds than
+        workers the runs go in rounds, so every round is given
+        budget_seconds / rounds.
+
+        Args:
+            problem (VrpProblem): The deliveries to plan.
+            seeds (Sequence[int]): One seed per run.
+            budget_seconds (float): How long all runs together may take.
+            max_iterations (Optional[int]): Stop each run after this many
+                iterations even if there is time left.
+            workers (Optional[int]): The number of processes to use, one
+                per CPU if not given. Runs stay in this process when it is 1.
+            on_improvement (Optional[Callable[[VrpSolution], None]]): Called
+                with a run's plan when it beats every run before it, in seed order.
+
+        Returns:
+            The plan with the least lateness, and of those the fewest miles.
+
+        Raises:
+            ValueError: If no seeds are given.
+        """
+        if not seeds:
+            raise ValueError("At least one seed is needed")
+        workers = min(len(seeds), workers or os.cpu_count() or 1)
+        run_budget: float = budget_seconds / math.ceil(len(seeds) / workers)
+
+        if workers > 1:
+            solutions = MultiStart._solve_in_parallel(problem, seeds, run_budget, max_iterations, workers)
+        else:
+            solutions = (
+                VrpSolver(problem=problem, seed=seed).solve(
+                    budget_seconds=run_budget, max_iterations=max_iterations
+                )
+                for seed in seeds
+            )
+
+        best: Optional[VrpSolution] = None
+        for solution in solutions:
+            if best is None or (solution.lateness, solution.miles) < (best.lateness, best.miles):
+                best = solution
+                if on_improvement:
+                    on_improvement(best)
+        return best
+
+    @staticmethod
+    def _solve_in_parallel(
+            problem: VrpProblem,
+            seeds: Sequence[int],
+            run_budget: float,
+            max_iterations: Optional[int],
+            workers: int
+    ) -> List[VrpSolution]:
+        """
+        Private method that runs one solver per seed across a process pool.
+
+        The distance matrix goes into a shared memory block as row-major
+        float64 values; the rest of the problem is small and is pickled
+        once per worker.
+        """
+        size: int = len(problem.distances)
+        flat: array = array('d', (distance for row in problem.distances for distance in row))
+        length: int = len(flat) * flat.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(1, length))
+        try:
+            block.buf[:length] = memoryview(flat).cast('B')
+            shared_problem: VrpProblem = copy.copy(problem)
+            shared_problem.distances = []
+
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_attach_worker,
+                    initargs=(block.name, size, shared_problem)
+            ) as executor:
+                return list(executor.map(
+                    _solve_seed, seeds, [run_budget] * len(seeds), [max_iterations] * len(seeds)
+                ))
+        finally:
+            block.close()
+            block.unlink()
+
+
+def _attach_worker(block_name: str, size: int, problem: VrpProblem) -> None:
+    """
+    Process pool initializer that attaches the shared distance matrix to
+    the problem once per worker.
+    """
+    global _worker_block, _worker_problem
+
+    _worker_block = shared_memory.SharedMemory(name=block_name)
+    flat: memoryview = _worker_block.buf[:size * size * 8].cast('d')
+    problem.distances = [flat[row * size:(row + 1) * size] for row in range(size)]
+    _worker_problem = problem
+
+
+def _solve_seed(seed: int, budget_seconds: float, max_iterations: Optional[int]) -> VrpSolution:
+    """
+    Runs the solver from one seed over the worker's problem.
+
+    Returns:
+        The best plan the run found.
+    """
+    return VrpSolver(problem=_worker_problem, seed=seed).solve(
+        budget_seconds=budget_seconds, max_iterations=max_iterations
+    )
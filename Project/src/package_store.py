@@ -0,0 +1,294 @@
+from bisect import insort
+from datetime import time
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from model.package import Package, PackageStatus
+from src.hash_map import HashMap, OpenAddressingHashMap
+from src.parser import Parser
+
+
+class PackageStore:
+    """
+    Stores packages by id and keeps secondary indexes up to date as
+    packages are loaded, delivered or re-addressed.
+
+    Every index is an OpenAddressingHashMap from an index key to the set of
+    package ids that share it, so answering "which packages ..." costs time
+    proportional to the answer, not to the number of packages. A package's
+    status and truck are only kept on the package itself; stored packages
+    change status through `set_status` so the indexes follow.
+
+    Attributes:
+        packages (HashMap): Packages keyed by package id.
+        by_address (HashMap): Normalized address -> set of package ids.
+        by_status (HashMap): PackageStatus -> set of package ids.
+        by_truck (HashMap): Truck id -> set of package ids loaded on that
+            truck, delivered or not.
+    """
+
+    def __init__(self, packages: Iterable[Package] = ()) -> None:
+        """
+        Initializes the store and indexes the given packages.
+
+        Args:
+            packages (Iterable[Package]): The packages to store.
+        """
+        self.packages: HashMap = OpenAddressingHashMap()
+        self.by_address: HashMap = OpenAddressingHashMap()
+        self.by_status: HashMap = OpenAddressingHashMap()
+        self.by_truck: HashMap = OpenAddressingHashMap()
+        self._deadline_order: List[Tuple[time, int]] = []
+
+        for package in packages:
+            self.add(package)
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def __iter__(self) -> Iterator[Package]:
+        return self.packages.values()
+
+    def add(self, package: Package) -> None:
+        """
+        Adds a package to the store under its current status and truck,
+        replacing any package with the same id.
+
+        Args:
+            package (Package): The package to add.
+        """
+        if self.packages.contains(package.package_id):
+            self.remove(package.package_id)
+
+        self.packages.add(key=package.package_id, value=package)
+        self._index(self.by_address, Parser.normalize_address(package.address), package.package_id)
+        self._index(self.by_status, package.status_code, package.package_id)
+        if package.status_truck_id is not None:
+            self._index(self.by_truck, package.status_truck_id, package.package_id)
+        insort(self._deadline_order, (package.delivery_time, package.package_id))
+
+    def remove(self, package_id: int) -> bool:
+        """
+        Removes a package and all of its index entries.
+
+        Args:
+            package_id (int): The id of the package to remove.
+
+        Returns:
+            True if the package was removed, False if it was not stored.
+        """
+        package: Optional[Package] = self.packages.get(package_id)
+        if package is None:
+            return False
+
+        self._unindex(self.by_address, Parser.normalize_address(package.address), package_id)
+        self._unindex(self.by_status, package.status_code, package_id)
+        if package.status_truck_id is not None:
+            self._unindex(self.by_truck, package.status_truck_id, package_id)
+        self._deadline_order.remove((package.delivery_time, package_id))
+        self.packages.remove(package_id)
+        return True
+
+    def get(self, key: int) -> Optional[Package]:
+        """
+        Gets a package by id.
+
+        Args:
+            key (int): The package id.
+
+        Returns:
+            The package, or None if it is not stored.
+        """
+        return self.packages.get(key)
+
+    def contains(self, key: int) -> bool:
+        return self.packages.contains(key)
+
+    def values(self) -> Iterator[Package]:
+        return self.packages.values()
+
+    def status_of(self, package_id: int) -> Optional[PackageStatus]:
+        """
+        Gets the status of a package.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The status of the package, or None if it is not stored.
+        """
+        package: Optional[Package] = self.packages.get(package_id)
+        return package.status_code if package is not None else None
+
+    def truck_of(self, package_id: int) -> Optional[int]:
+        """
+        Gets the truck a package was loaded on.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The truck id, or None if the package has not been loaded.
+        """
+        package: Optional[Package] = self.packages.get(package_id)
+        return package.status_truck_id if package is not None else None
+
+    def set_status(
+            self,
+            package_id: int,
+            status: PackageStatus,
+            truck_id: Optional[int] = None,
+            status_time: Optional[int] = None
+    ) -> None:
+        """
+        Moves a package to a new status, and onto a truck if one is given.
+
+        Args:
+            package_id (int): The package id.
+            status (PackageStatus): The new status.
+            truck_id (Optional[int]): The truck the package is on.
+            status_time (Optional[int]): The time the package was delivered,
+                in seconds since midnight.
+        """
+        package: Package = self.packages.get(package_id)
+        self._unindex(self.by_status, package.status_code, package_id)
+        self._index(self.by_status, status, package_id)
+
+        previous_truck_id: Optional[int] = package.status_truck_id
+        if truck_id is not None and previous_truck_id != truck_id:
+            if previous_truck_id is not None:
+                self._unindex(self.by_truck, previous_truck_id, package_id)
+            self._index(self.by_truck, truck_id, package_id)
+        package.update_status(
+            status=status,
+            truck_id=truck_id if truck_id is not None else previous_truck_id,
+            status_time=status_time
+        )
+
+    def change_address(self, package_id: int, address: str) -> None:
+        """
+        Changes the delivery address of a package.
+
+        Args:
+            package_id (int): The package id.
+            address (str): The new address.
+        """
+        package: Package = self.packages.get(package_id)
+        self._unindex(self.by_address, Parser.normalize_address(package.address), package_id)
+        package.address = address
+        self._index(self.by_address, Parser.normalize_address(address), package_id)
+
+    def change_deadline(self, package_id: int, delivery_time: time) -> None:
+        """
+        Changes the delivery deadline of a package.
+
+        Args:
+            package_id (int): The package id.
+            delivery_time (time): The new deadline.
+        """
+        package: Package = self.packages.get(package_id)
+        self._deadline_order.remove((package.delivery_time, package_id))
+        package.delivery_time = delivery_time
+        insort(self._deadline_order, (delivery_time, package_id))
+
+    def reset_statuses(self) -> None:
+        """
+        Moves every package back to the hub and off every truck.
+        """
+        for table in (self.by_status, self.by_truck):
+            table.clear()
+        for package in self.packages.values():
+            package.update_status(status=PackageStatus.AT_HUB)
+            self._index(self.by_status, PackageStatus.AT_HUB, package.package_id)
+
+    def ids_at_address(self, address: str) -> Set[int]:
+        """
+        Gets the ids of every package going to an address.
+
+        Args:
+            address (str): The address. Spelling variants are normalized.
+
+        Returns:
+            The package ids. The set must not be modified.
+        """
+        return self.by_address.get(Parser.normalize_address(address)) or set()
+
+    def ids_with_status(self, status: PackageStatus) -> Set[int]:
+        """
+        Gets the ids of every package with a status.
+
+        Args:
+            status (PackageStatus): The status.
+
+        Returns:
+            The package ids. The set must not be modified.
+        """
+        return self.by_status.get(status) or set()
+
+    def ids_on_truck(self, truck_id: int) -> Set[int]:
+        """
+        Gets the ids of every package loaded on a truck, delivered or not.
+
+        Args:
+            truck_id (int): The truck id.
+
+        Returns:
+            The package ids. The set must not be modified.
+        """
+        return self.by_truck.get(truck_id) or set()
+
+    def by_deadline(self) -> Iterator[Package]:
+        """
+        Iterates over the packages from the earliest delivery deadline to
+        the latest, breaking ties by package id.
+
+        Returns:
+            An iterator of packages.
+        """
+        for _, package_id in self._deadline_order:
+            yield self.packages.get(package_id)
+
+    def clear(self) -> None:
+        """
+        Removes every package and index entry.
+        """
+        for table in (self.packages, self.by_address, self.by_status, self.by_truck):
+            table.clear()
+        self._deadline_order.clear()
+
+    def display_package_status(self) -> None:
+        """
+        Displays all packages to the console, one package per line.
+        """
+        self.packages.display_package_status()
+
+    def print_package(self, key: int) -> None:
+        """
+        Displays one selected package to the console.
+
+        Args:
+            key (int): The package id.
+        """
+        self.packages.print_package(key)
+
+    @staticmethod
+    def _index(index: HashMap, key: object, package_id: int) -> None:
+        """
+        Private method that adds a package id to an index entry.
+        """
+        package_ids: Optional[Set[int]] = index.get(key)
+        if package_ids is None:
+            index.add(key=key, value={package_id})
+        else:
+            package_ids.add(package_id)
+
+    @staticmethod
+    def _unindex(index: HashMap, key: object, package_id: int) -> None:
+        """
+        Private method that removes a package id from an index entry,
+        dropping the entry once it is empty.
+        """
+        package_ids: Optional[Set[int]] = index.get(key)
+        if package_ids is not None:
+            package_ids.discard(package_id)
+            if not package_ids:
+                index.remove(key)
@@ -0,0 +1,263 @@
+import operator
+from array import array
+from datetime import time
+from itertools import compress, repeat
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from constants import PACKAGE_TABLE_NUMERIC_COLUMNS
+from model.package import PackageStatus
+from utils.clock import seconds_to_time, time_to_seconds
+
+# Comparison operators accepted by PackageTable.mask and PackageTable.where.
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class PackageTable:
+    """
+    Stores packages column by column instead of one object per package.
+
+    Numeric fields live in typed arrays and text fields in plain lists, all
+    indexed by row. Filters run one column at a time and produce byte masks,
+    so selecting rows never builds a Python object per package. Code that
+    still wants attribute access can wrap a row in a PackageView.
+
+    Attributes:
+        package_id, zipcode, weight, deadline, hub_index (array): Signed
+            integer columns. `deadline` is in seconds since midnight and
+            `hub_index` is -1 when the address has no hub.
+        status (array): PackageStatus codes.
+        address, city, state, notes (List[str]): Text columns.
+    """
+
+    def __init__(self) -> None:
+        self.package_id: array = array('l')
+        self.zipcode: array = array('l')
+        self.weight: array = array('l')
+        self.deadline: array = array('l')
+        self.hub_index: array = array('l')
+        self.status: array = array('b')
+        self.address: List[str] = []
+        self.city: List[str] = []
+        self.state: List[str] = []
+        self.notes: List[str] = []
+        self._rows_by_id: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.package_id)
+
+    @staticmethod
+    def from_columns(columns: Dict[str, Sequence[Any]]) -> "PackageTable":
+        """
+        Builds a table around existing columns without copying them, e.g.
+        memoryviews over a compiled bundle. Such a table can be filtered and
+        viewed, but only columns that support it can be appended to.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Every column by name. The status
+                column may be left out, in which case every package is at the hub.
+
+        Returns:
+            The table.
+        """
+        table: PackageTable = PackageTable()
+        for column in PACKAGE_TABLE_NUMERIC_COLUMNS + ("address", "city", "state", "notes"):
+            if column != "status" or column in columns:
+                setattr(table, column, columns[column])
+
+        if "status" not in columns:
+            table.status = array('b', bytes(len(table.package_id)))
+        table._rows_by_id = {package_id: row for row, package_id in enumerate(table.package_id)}
+        return table
+
+    def __iter__(self) -> Iterator["PackageView"]:
+        for row in range(len(self)):
+            yield PackageView(table=self, row=row)
+
+    def append(
+            self,
+            package_id: int,
+            address: str,
+            city: str,
+            state: str,
+            zipcode: int,
+            delivery_time: time,
+            weight: int,
+            notes: str,
+            hub_index: int = -1,
+            status: PackageStatus = PackageStatus.AT_HUB
+    ) -> int:
+        """
+        Appends one package to the table.
+
+        Returns:
+            The row the package was stored in.
+        """
+        row: int = len(self)
+        self.package_id.append(package_id)
+        self.zipcode.append(zipcode)
+        self.weight.append(weight)
+        self.deadline.append(time_to_seconds(delivery_time))
+        self.hub_index.append(hub_index)
+        self.status.append(status)
+        self.address.append(address)
+        self.city.append(city)
+        self.state.append(state)
+        self.notes.append(notes)
+        self._rows_by_id[package_id] = row
+        return row
+
+    def extend(self, other: "PackageTable") -> None:
+        """
+        Appends every row of another table, keeping their order.
+
+        Args:
+            other (PackageTable): The table to append.
+        """
+        first_row: int = len(self)
+        for column in PACKAGE_TABLE_NUMERIC_COLUMNS + ("address", "city", "state", "notes"):
+            getattr(self, column).extend(getattr(other, column))
+        for offset, package_id in enumerate(other.package_id):
+            self._rows_by_id[package_id] = first_row + offset
+
+    def row_of(self, package_id: int) -> Optional[int]:
+        """
+        Gets the row a package is stored in.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            The row, or None if the package is not in the table.
+        """
+        return self._rows_by_id.get(package_id)
+
+    def view(self, package_id: int) -> Optional["PackageView"]:
+        """
+        Gets an attribute-style view of a package.
+
+        Args:
+            package_id (int): The package id.
+
+        Returns:
+            A view of the package's row, or None if it is not in the table.
+        """
+        row: Optional[int] = self._rows_by_id.get(package_id)
+        return None if row is None else PackageView(table=self, row=row)
+
+    def mask(self, column: str, comparison: str, value: Any) -> bytearray:
+        """
+        Compares every value in a column against `value`.
+
+        Args:
+            column (str): The column name, e.g. "deadline" or "status".
+            comparison (str): One of ==, !=, <, <=, >, >=.
+            value (Any): The value to compare against. A time is converted
+                to seconds when comparing the deadline column.
+
+        Returns:
+            One byte per row, 1 where the comparison holds.
+        """
+        if column == "deadline" and isinstance(value, time):
+            value = time_to_seconds(value)
+
+        compare: Callable[[Any, Any], bool] = _OPERATORS[comparison]
+        return bytearray(map(compare, getattr(self, column), repeat(value)))
+
+    def where(self, *conditions: Tuple[str, str, Any]) -> List[int]:
+        """
+        Selects the rows that meet every condition.
+
+        Example:
+            table.where(("deadline", "<", time(10, 30)), ("status", "==", PackageStatus.AT_HUB))
+
+        Args:
+            conditions: (column, comparison, value) tuples. See `mask`.
+
+        Returns:
+            The matching row numbers in table order.
+        """
+        selected: bytearray = bytearray(b"\x01") * len(self)
+        for column, comparison, value in conditions:
+            selected = bytearray(map(operator.and_, selected, self.mask(column, comparison, value)))
+        return list(compress(range(len(self)), selected))
+
+    def take(self, column: str, rows: Sequence[int]) -> List[Any]:
+        """
+        Gets the values of a column at the given rows.
+
+        Args:
+            column (str): The column name.
+            rows (Sequence[int]): The rows to read.
+
+        Returns:
+            The values in the same order as `rows`.
+        """
+        values: Sequence[Any] = getattr(self, column)
+        return [values[row] for row in rows]
+
+
+class PackageView:
+    """
+    A read-mostly view of one package stored in a PackageTable. It holds only
+    the table and the row, and reads each attribute from its column.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: PackageTable, row: int) -> None:
+        self._table: PackageTable = table
+        self._row: int = row
+
+    @property
+    def package_id(self) -> int:
+        return self._table.package_id[self._row]
+
+    @property
+    def address(self) -> str:
+        return self._table.address[self._row]
+
+    @property
+    def city(self) -> str:
+        return self._table.city[self._row]
+
+    @property
+    def state(self) -> str:
+        return self._table.state[self._row]
+
+    @property
+    def zipcode(self) -> int:
+        return self._table.zipcode[self._row]
+
+    @property
+    def delivery_time(self) -> time:
+        return seconds_to_time(self._table.deadline[self._row])
+
+    @property
+    def weight(self) -> int:
+        return self._table.weight[self._row]
+
+    @property
+    def notes(self) -> str:
+        return self._table.notes[self._row]
+
+    @property
+    def hub_index(self) -> int:
+        return self._table.hub_index[self._row]
+
+    @property
+    def status_code(self) -> PackageStatus:
+        return PackageStatus(self._table.status[self._row])
+
+    @status_code.setter
+    def status_code(self, status: PackageStatus) -> None:
+        self._table.status[self._row] = status
+
+    def __repr__(self):
+        return f"Package ID: {self.package_id}, Delivery address: {self.address}, Deliver by: {self.delivery_time}, Status: {self.status_code.name}"
@@ -1,9 +1,16 @@
-from typing import Union
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, Union
 
-from constants import EOD_TEXT, HUB_TEXT, WGU_ADDRESS, WGU_ZIPCODE
+from constants import (
+    ADDRESS_ABBREVIATIONS, DEADLINE_CACHE_SIZE, DEFAULT_DELIVERY_END_TIME,
+    EOD_TEXT, HUB_TEXT, WGU_ADDRESS, WGU_ZIPCODE
+)
 import datetime
 from typing import Optional
 
+from utils.clock import time_to_seconds
+
 
 class Parser:
     """
@@ -43,21 +50,126 @@ class Parser:
                 return WGU_ZIPCODE
             return int(((cell.strip().split("\n"))[1])[1:6])
 
+    def parse_hub_cells(
+            self,
+            name_cell: str,
+            address_cell: str
+    ) -> Tuple[str, str, int]:
+        """
+        Parses the two header cells of a hub row, splitting each cell once.
+
+        Args:
+            name_cell (str): The cell holding the hub name and address.
+            address_cell (str): The cell holding the address and, on its
+                second line, the zip code in parentheses.
+
+        Returns:
+            The hub name, address and zip code.
+        """
+        hub_name: str = name_cell.strip().split("\n", 1)[0].strip()
+
+        address_lines: List[str] = address_cell.strip().split("\n", 2)
+        if address_lines[0] == HUB_TEXT:
+            return hub_name, WGU_ADDRESS, WGU_ZIPCODE
+        return hub_name, address_lines[0].strip(), int(address_lines[1][1:6])
+
+    @staticmethod
+    def normalize_address(address: str) -> str:
+        """
+        Normalizes an address so spelling variants of the same street
+        compare equal, e.g. "410 South State Street." and "410 S State St".
+
+        Args:
+            address (str): The address to normalize.
+
+        Returns:
+            The lower-cased address with punctuation removed, whitespace
+            collapsed and common street words abbreviated.
+        """
+        words = address.lower().replace(".", " ").replace(",", " ").split()
+        return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
     def validate_delivery_time_from_cell(
             self,
             cell: str
-    ) -> datetime:
+    ) -> datetime.time:
         """
         Validates the delivery time.
 
+        Deadlines are written as "EOD" or as "%I:%M %p", e.g. "10:30 AM".
+        Files repeat a few distinct deadlines many times, so each distinct
+        cell is parsed once and the result is reused.
+
         Args:
             cell: The delivery time.
 
         Returns:
             The validated delivery time.
+
+        Raises:
+            ValueError: If the cell is not a supported deadline.
+        """
+        return _parse_delivery_time(cell)
+
+    @staticmethod
+    def delivery_seconds_from_column(cells: Sequence[str]) -> array:
+        """
+        Converts a whole column of deadline cells to seconds since midnight,
+        parsing each distinct cell only once.
+
+        Args:
+            cells (Sequence[str]): The deadline cells.
+
+        Returns:
+            array: One deadline in seconds per cell, in the same order.
+
+        Raises:
+            ValueError: If a cell is not a supported deadline.
         """
+        seconds_by_cell: Dict[str, int] = {
+            cell: time_to_seconds(_parse_delivery_time(cell)) for cell in set(cells)
+        }
+        return array('l', map(seconds_by_cell.__getitem__, cells))
+
+
+@lru_cache(maxsize=DEADLINE_CACHE_SIZE)
+def _parse_delivery_time(cell: str) -> datetime.time:
+    """
+    Parses "EOD" or a "%I:%M %p" deadline such as "9:00 AM" without going
+    through strptime. As with strptime, the time and AM/PM may be separated
+    by any run of whitespace, but the cell may not start or end with any.
+    Results are cached by cell text.
+
+    Args:
+        cell (str): The deadline cell.
+
+    Returns:
+        The deadline.
+
+    Raises:
+        ValueError: If the cell is not a supported deadline.
+    """
+    if cell == EOD_TEXT:
+        return DEFAULT_DELIVERY_END_TIME
+
+    # Like strptime, only the gap between the time and AM/PM may be any whitespace
+    fields: List[str] = cell.split()
+    if len(fields) != 2 or cell != cell.strip():
+        raise ValueError(f"time data {cell!r} does not match format '%I:%M %p'")
+    clock, meridiem = fields
+    hours, _, minutes = clock.partition(":")
+    meridiem = meridiem.upper()
+    if not (
+            hours.isascii() and hours.isdigit() and len(hours) <= 2 and
+            minutes.isascii() and minutes.isdigit() and len(minutes) <= 2 and
+            meridiem in ("AM", "PM")
+    ):
+        raise ValueError(f"time data {cell!r} does not match format '%I:%M %p'")
+
+    hour: int = int(hours)
+    minute: int = int(minutes)
+    if not 1 <= hour <= 12 or minute > 59:
+        raise ValueError(f"time data {cell!r} does not match format '%I:%M %p'")
 
-        if isinstance(cell, str) and cell == EOD_TEXT:
-            return datetime.time(17, 0)
-        else:
-            return (datetime.datetime.strptime(cell, "%I:%M %p")).time()
+    # 12 AM is midnight and 12 PM is noon
+    return datetime.time(hour % 12 + (12 if meridiem == "PM" else 0), minute)
@@ -0,0 +1,333 @@
+import math
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from constants import (
+    ROUTE_STRATEGY_CHEAPEST_INSERTION,
+    ROUTE_STRATEGY_CHRISTOFIDES,
+    ROUTE_STRATEGY_FARTHEST_INSERTION,
+    ROUTE_STRATEGY_NEAREST_NEIGHBOR,
+    ROUTE_STRATEGY_SAVINGS
+)
+
+# A square distance matrix. Row and column 0 are the depot the route starts
+# from, and 1 .. n - 1 are the stops.
+DistanceRows = Sequence[Sequence[float]]
+
+# Marks the last stop of a route in a `following` array.
+_END: int = -1
+
+
+class RouteConstruction:
+    """
+    Builds the order to visit a set of stops in, starting from a depot.
+
+    Every strategy works on a precomputed distance matrix and returns an
+    open route: the truck leaves the depot, visits every stop once and does
+    not drive back. The route is returned as the stop indices in visiting
+    order, without the depot.
+    """
+
+    @staticmethod
+    def build(
+            distances: DistanceRows,
+            strategy: str = ROUTE_STRATEGY_CHEAPEST_INSERTION
+    ) -> List[int]:
+        """
+        Builds a route with the given strategy.
+
+        Args:
+            distances (DistanceRows): The distance matrix, depot first.
+            strategy (str): One of the ROUTE_STRATEGY_* constants.
+
+        Returns:
+            The stops in visiting order.
+
+        Raises:
+            ValueError: If the strategy is not known.
+        """
+        builder: Callable[[DistanceRows], List[int]] = _BUILDERS.get(strategy)
+        if builder is None:
+            raise ValueError(f"Unknown route strategy {strategy!r}")
+        if len(distances) <= 2:
+            return list(range(1, len(distances)))
+        return builder(distances)
+
+    @staticmethod
+    def route_length(distances: DistanceRows, route: Sequence[int]) -> float:
+        """
+        Gets the distance driven along a route from the depot.
+
+        Args:
+            distances (DistanceRows): The distance matrix, depot first.
+            route (Sequence[int]): The stops in visiting order.
+
+        Returns:
+            The total distance.
+        """
+        length: float = 0.0
+        previous: int = 0
+        for stop in route:
+            length += distances[previous][stop]
+            previous = stop
+        return length
+
+    @staticmethod
+    def nearest_neighbor(distances: DistanceRows) -> List[int]:
+        """
+        Always drives to the closest stop not visited yet. O(n^2).
+        """
+        unvisited: List[int] = list(range(1, len(distances)))
+        route: List[int] = []
+        current: int = 0
+        while unvisited:
+            row: Sequence[float] = distances[current]
+            current = min(unvisited, key=row.__getitem__)
+            unvisited.remove(current)
+            route.append(current)
+        return route
+
+    @staticmethod
+    def cheapest_insertion(distances: DistanceRows) -> List[int]:
+        """
+        Repeatedly inserts the stop that lengthens the route the least, at
+        the position where it does so.
+
+        Each stop remembers its cheapest position. An insertion only
+        replaces one edge of the route with two, so a stop only has to search
+        the whole route again when the replaced edge was its cheapest
+        position and neither new edge is as cheap.
+        """
+        size: int = len(distances)
+        following: List[int] = [_END] * size
+        routed: List[int] = [0]
+        unrouted: List[int] = list(range(1, size))
+
+        # Every stop starts out appended after the depot
+        best_after: List[int] = [0] * size
+        best_cost: List[float] = list(distances[0])
+
+        while unrouted:
+            stop: int = min(unrouted, key=best_cost.__getitem__)
+            unrouted.remove(stop)
+            after: int = best_after[stop]
+            following[stop] = following[after]
+            following[after] = stop
+            routed.append(stop)
+
+            for other in unrouted:
+                after_cost: float = _insertion_cost(distances, after, stop, other)
+                stop_cost: float = _insertion_cost(distances, stop, following[stop], other)
+                new_after, cost = (after, after_cost) if after_cost <= stop_cost else (stop, stop_cost)
+                if cost < best_cost[other] or (best_after[other] == after and cost == best_cost[other]):
+                    best_after[other] = new_after
+                    best_cost[other] = cost
+                elif best_after[other] == after:
+                    # Its cheapest edge was just split and neither new edge is
+                    # as cheap, so search the whole route again
+                    best_after[other], best_cost[other] = _cheapest_position(
+                        distances, following, routed, other
+                    )
+
+        return _walk(following)
+
+    @staticmethod
+    def farthest_insertion(distances: DistanceRows) -> List[int]:
+        """
+        Repeatedly takes the stop farthest from the route so far and inserts
+        it where it lengthens the route the least. Settling the outline of
+        the route first avoids the long return legs nearest neighbor leaves
+        for the end. O(n^2).
+        """
+        size: int = len(distances)
+        following: List[int] = [_END] * size
+        routed: List[int] = [0]
+        unrouted: List[int] = list(range(1, size))
+        distance_to_route: List[float] = list(distances[0])
+
+        while unrouted:
+            stop: int = max(unrouted, key=distance_to_route.__getitem__)
+            unrouted.remove(stop)
+            after, _ = _cheapest_position(distances, following, routed, stop)
+            following[stop] = following[after]
+            following[after] = stop
+            routed.append(stop)
+
+            row: Sequence[float] = distances[stop]
+            for other in unrouted:
+                if row[other] < distance_to_route[other]:
+                    distance_to_route[other] = row[other]
+
+        return _walk(following)
+
+    @staticmethod
+    def savings(distances: DistanceRows) -> List[int]:
+        """
+        Clarke-Wright savings for a single truck. Every stop starts on its
+        own out-and-back trip, and trips are joined end to end in order of
+        the distance saved by skipping the depot between them,
+        d(0, i) + d(0, j) - d(i, j). O(n^2 log n).
+        """
+        size: int = len(distances)
+        depot: Sequence[float] = distances[0]
+        candidates: List[Tuple[float, int, int]] = [
+            (depot[first] + depot[second] - distances[first][second], first, second)
+            for first in range(1, size)
+            for second in range(first + 1, size)
+        ]
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        links: List[List[int]] = [[] for _ in range(size)]
+        chain: List[int] = list(range(size))
+
+        def find(stop: int) -> int:
+            while chain[stop] != stop:
+                chain[stop] = chain[chain[stop]]
+                stop = chain[stop]
+            return stop
+
+        joins: int = 0
+        for _, first, second in candidates:
+            if len(links[first]) < 2 and len(links[second]) < 2:
+                first_chain: int = find(first)
+                second_chain: int = find(second)
+                if first_chain != second_chain:
+                    links[first].append(second)
+                    links[second].append(first)
+                    chain[first_chain] = second_chain
+                    joins += 1
+                    if joins == size - 2:
+                        break
+
+        # Start from whichever end of the joined trip is closer to the depot
+        ends: List[int] = [stop for stop in range(1, size) if len(links[stop]) < 2]
+        current: int = min(ends, key=depot.__getitem__)
+        route: List[int] = [current]
+        previous: int = 0
+        while len(route) < size - 1:
+            current, previous = next(stop for stop in links[current] if stop != previous), current
+            route.append(current)
+        return route
+
+    @staticmethod
+    def christofides(distances: DistanceRows) -> List[int]:
+        """
+        A Christofides-style tour: a minimum spanning tree, plus a greedy
+        matching of its odd-degree vertices (instead of a minimum-weight
+        perfect matching), walked as an Euler circuit with repeated stops
+        skipped. The circuit is opened at the longer of its two depot edges.
+        O(n^2 log n).
+        """
+        size: int = len(distances)
+        edges: List[Tuple[int, int]] = []
+
+        # Prim's algorithm on the dense matrix
+        cheapest: List[float] = [math.inf] * size
+        parent: List[int] = [_END] * size
+        cheapest[0] = 0.0
+        outside: List[int] = list(range(size))
+        while outside:
+            vertex: int = min(outside, key=cheapest.__getitem__)
+            outside.remove(vertex)
+            if parent[vertex] != _END:
+                edges.append((parent[vertex], vertex))
+            row: Sequence[float] = distances[vertex]
+            for other in outside:
+                if row[other] < cheapest[other]:
+                    cheapest[other] = row[other]
+                    parent[other] = vertex
+
+        # Greedily pair up the vertices with an odd number of tree edges
+        degree: List[int] = [0] * size
+        for first, second in edges:
+            degree[first] += 1
+            degree[second] += 1
+        odd: List[int] = [vertex for vertex in range(size) if degree[vertex] % 2]
+        pairs: List[Tuple[float, int, int]] = sorted(
+            (distances[first][second], first, second)
+            for position, first in enumerate(odd)
+            for second in odd[position + 1:]
+        )
+        matched: List[bool] = [False] * size
+        for _, first, second in pairs:
+            if not matched[first] and not matched[second]:
+                matched[first] = matched[second] = True
+                edges.append((first, second))
+
+        # Hierholzer's algorithm for an Euler circuit from the depot
+        incident: List[List[Tuple[int, int]]] = [[] for _ in range(size)]
+        for edge, (first, second) in enumerate(edges):
+            incident[first].append((second, edge))
+            incident[second].append((first, edge))
+        used: List[bool] = [False] * len(edges)
+        position: List[int] = [0] * size
+        stack: List[int] = [0]
+        circuit: List[int] = []
+        while stack:
+            vertex = stack[-1]
+            while position[vertex] < len(incident[vertex]) and used[incident[vertex][position[vertex]][1]]:
+                position[vertex] += 1
+            if position[vertex] == len(incident[vertex]):
+                circuit.append(stack.pop())
+            else:
+                other, edge = incident[vertex][position[vertex]]
+                used[edge] = True
+                stack.append(other)
+
+        # Skip stops already visited, then drop the longer depot edge
+        route: List[int] = [stop for stop in dict.fromkeys(circuit) if stop != 0]
+        if distances[0][route[0]] > distances[0][route[-1]]:
+            route.reverse()
+        return route
+
+
+def _insertion_cost(distances: DistanceRows, after: int, before: int, stop: int) -> float:
+    """
+    Gets how much longer the route gets by visiting `stop` between `after`
+    and `before`, or after `after` when it is the last stop.
+    """
+    if before == _END:
+        return distances[after][stop]
+    return distances[after][stop] + distances[stop][before] - distances[after][before]
+
+
+def _cheapest_position(
+        distances: DistanceRows,
+        following: List[int],
+        routed: List[int],
+        stop: int
+) -> Tuple[int, float]:
+    """
+    Finds the routed stop to insert `stop` after.
+
+    Returns:
+        The stop to insert after and the cost of inserting there.
+    """
+    best_after: int = 0
+    best_cost: float = math.inf
+    for after in routed:
+        cost: float = _insertion_cost(distances, after, following[after], stop)
+        if cost < best_cost:
+            best_after = after
+            best_cost = cost
+    return best_after, best_cost
+
+
+def _walk(following: List[int]) -> List[int]:
+    """
+    Lists the stops of a route held as a `following` array, without the depot.
+    """
+    route: List[int] = []
+    stop: int = following[0]
+    while stop != _END:
+        route.append(stop)
+        stop = following[stop]
+    return route
+
+
+_BUILDERS: Dict[str, Callable[[DistanceRows], List[int]]] = {
+    ROUTE_STRATEGY_NEAREST_NEIGHBOR: RouteConstruction.nearest_neighbor,
+    ROUTE_STRATEGY_CHEAPEST_INSERTION: RouteConstruction.cheapest_insertion,
+    ROUTE_STRATEGY_FARTHEST_INSERTION: RouteConstruction.farthest_insertion,
+    ROUTE_STRATEGY_SAVINGS: RouteConstruction.savings,
+    ROUTE_STRATEGY_CHRISTOFIDES: RouteConstruction.christofides,
+}
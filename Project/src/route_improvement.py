@@ -0,0 +1,328 @@
+import heapq
+import time
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from constants import (
+    MAX_TRUCK_DISTANCE_PER_SECOND,
+    OR_OPT_MAX_SEGMENT_LENGTH,
+    ROUTE_IMPROVEMENT_BUDGET_SECONDS,
+    ROUTE_IMPROVEMENT_NEIGHBORS
+)
+from src.route_construction import DistanceRows
+
+# The earliest and latest time a stop may be reached, in seconds since
+# midnight. A truck that arrives early waits until the stop is ready.
+TimeWindow = Tuple[int, int]
+
+# Moves have to save more than this many miles to count as improvements, so
+# floating point noise cannot make two moves undo each other forever.
+_EPSILON: float = 1e-9
+
+
+class RouteImprovement:
+    """
+    Shortens a route with 2-opt and Or-opt moves.
+
+    A 2-opt move reverses a stretch of the route and an Or-opt move moves a
+    run of up to three stops somewhere else, either way round. Only moves
+    that put a stop next to one of its nearest neighbors are tried, and
+    stops whose surroundings have not changed since they last failed to
+    improve are skipped (don't-look bits).
+
+    Pricing a move is O(1), so looking at one stop costs O(k) for k
+    neighbors instead of O(n). Applying a move is O(n): a 2-opt move
+    reverses up to n stops and an Or-opt move rebuilds the tour and the
+    positions. With time windows every move that would shorten the route
+    is also timed along the whole tour before it is kept, which is O(n)
+    per candidate.
+
+    Routes are open paths over a symmetric distance matrix: index 0 is the
+    depot the truck leaves from and the route lists the stops after it. The
+    route does not have to visit every stop in the matrix.
+    """
+
+    @staticmethod
+    def neighbor_lists(
+            distances: DistanceRows,
+            count: int = ROUTE_IMPROVEMENT_NEIGHBORS
+    ) -> List[List[int]]:
+        """
+        Finds the closest stops to every stop. Building the lists is
+        O(n^2), so callers improving several routes over one matrix should
+        build them once and pass them to `improve`.
+
+        Args:
+            distances (DistanceRows): The distance matrix, depot first.
+            count (int): How many neighbors to keep per stop.
+
+        Returns:
+            The neighbors of each stop, closest first. The depot can be a
+            neighbor, the stop itself never is.
+        """
+        size: int = len(distances)
+        return [
+            heapq.nsmallest(
+                count,
+                (other for other in range(size) if other != stop),
+                key=distances[stop].__getitem__
+            )
+            for stop in range(size)
+        ]
+
+    @staticmethod
+    def improve(
+            distances: DistanceRows,
+            route: Sequence[int],
+            time_windows: Optional[Sequence[Optional[TimeWindow]]] = None,
+            start_time: int = 0,
+            speed: float = MAX_TRUCK_DISTANCE_PER_SECOND,
+            budget_seconds: float = ROUTE_IMPROVEMENT_BUDGET_SECONDS,
+            neighbors: Optional[List[List[int]]] = None
+    ) -> List[int]:
+        """
+        Improves a route until no move helps or the time budget runs out.
+
+        With time windows a move is only kept when it does not add to the
+        total time the route runs past the windows' deadlines, so a route
+        that meets every deadline keeps meeting them.
+
+        Args:
+            distances (DistanceRows): The distance matrix, depot first.
+            route (Sequence[int]): The stops in visiting order, without the depot.
+            time_windows (Optional[Sequence[Optional[TimeWindow]]]): The
+                window of each stop by matrix index, or None where a stop
+                has no window.
+            start_time (int): When the truck leaves the depot, in seconds.
+            speed (float): The truck's speed in miles per second.
+            budget_seconds (float): How long to search for.
+            neighbors (Optional[List[List[int]]]): Neighbor lists from
+                `neighbor_lists`, built here if not given.
+
+        Returns:
+            The improved route, without the depot.
+        """
+        if len(route) < 2:
+            return list(route)
+
+        stop_time: float = time.perf_counter() + budget_seconds
+        if neighbors is None:
+            neighbors = RouteImprovement.neighbor_lists(distances)
+        state: _RouteState = _RouteState(
+            distances=distances,
+            route=route,
+            time_windows=time_windows,
+            start_time=start_time,
+            speed=speed
+        )
+
+        active: Deque[int] = deque(route)
+        queued: List[bool] = [False] * len(distances)
+        for stop in route:
+            queued[stop] = True
+
+        while active and time.perf_counter() < stop_time:
+            stop: int = active.popleft()
+            queued[stop] = False
+            touched: Optional[Tuple[int, ...]] = (
+                state.try_two_opt(stop, neighbors[stop]) or state.try_or_opt(stop, neighbors[stop])
+            )
+            if touched:
+                for touched_stop in touched:
+                    if touched_stop != 0 and not queued[touched_stop]:
+                        queued[touched_stop] = True
+                        active.append(touched_stop)
+
+        return state.tour[1:]
+
+
+class _RouteState:
+    """
+    The route being improved, held as a tour that starts with the depot
+    together with the position of every stop in it.
+    """
+
+    __slots__ = ("distances", "tour", "position", "time_windows", "start_time", "speed", "lateness")
+
+    def __init__(
+            self,
+            distances: DistanceRows,
+            route: Sequence[int],
+            time_windows: Optional[Sequence[Optional[TimeWindow]]],
+            start_time: int,
+            speed: float
+    ) -> None:
+        self.distances: DistanceRows = distances
+        self.tour: List[int] = [0] + list(route)
+        # Stops of the matrix that are not on the route stay at -1
+        self.position: List[int] = [-1] * len(distances)
+        for index, stop in enumerate(self.tour):
+            self.position[stop] = index
+        self.time_windows: Optional[Sequence[Optional[TimeWindow]]] = time_windows
+        self.start_time: int = start_time
+        self.speed: float = speed
+        self.lateness: float = self._lateness(self.tour)
+
+    def try_two_opt(self, stop: int, neighbors: List[int]) -> Optional[Tuple[int, ...]]:
+        """
+        Tries the reversals that make `stop` and one of its neighbors
+        adjacent, keeping the first one that shortens the route.
+
+        Returns:
+            The stops whose edges changed, or None if nothing improved.
+        """
+        tour: List[int] = self.tour
+        position: int = self.position[stop]
+        for neighbor in neighbors:
+            neighbor_position: int = self.position[neighbor]
+            if neighbor_position < 0:
+                continue
+            low: int = min(position, neighbor_position)
+            high: int = max(position, neighbor_position)
+            # Either the stops after both of them or the stops before both are joined
+            for first, last in ((low + 1, high), (low, high - 1)):
+                if first < 1 or last <= first:
+                    continue
+                if self._reversal_delta(first, last) < -_EPSILON:
+                    candidate: Optional[List[int]] = None
+                    if self.time_windows is not None:
+                        candidate = tour[:first] + tour[first:last + 1][::-1] + tour[last + 1:]
+                        lateness: float = self._lateness(candidate)
+                        if lateness > self.lateness + _EPSILON:
+                            continue
+                        self.lateness = lateness
+
+                    touched: Tuple[int, ...] = (
+                        tour[first - 1], tour[first], tour[last],
+                        tour[last + 1] if last + 1 < len(tour) else 0
+                    )
+                    tour[first:last + 1] = tour[first:last + 1][::-1]
+                    for index in range(first, last + 1):
+                        self.position[tour[index]] = index
+                    return touched
+        return None
+
+    def try_or_opt(self, stop: int, neighbors: List[int]) -> Optional[Tuple[int, ...]]:
+        """
+        Tries moving a run of stops that starts or ends at `stop` next to
+        one of its neighbors, either way round, keeping the first move that
+        shortens the route.
+
+        Returns:
+            The stops whose edges changed, or None if nothing improved.
+        """
+        tour: List[int] = self.tour
+        distances: DistanceRows = self.distances
+        end: int = len(tour)
+        position: int = self.position[stop]
+
+        for length in range(1, OR_OPT_MAX_SEGMENT_LENGTH + 1):
+            for first in ((position,) if length == 1 else (position, position - length + 1)):
+                last: int = first + length - 1
+                if first < 1 or last >= end:
+                    continue
+
+                # Taking the run out joins the stops on either side of it
+                before: int = tour[first - 1]
+                after: Optional[int] = tour[last + 1] if last + 1 < end else None
+                removal_saving: float = distances[before][tour[first]]
+                if after is not None:
+                    removal_saving += distances[tour[last]][after] - distances[before][after]
+
+                for neighbor in neighbors:
+                    neighbor_position: int = self.position[neighbor]
+                    if neighbor_position < 0 or first <= neighbor_position <= last:
+                        continue
+                    for insert_after in (neighbor_position, neighbor_position - 1):
+                        if insert_after < 0 or insert_after == first - 1 or first <= insert_after <= last:
+                            continue
+                        delta, reverse = self._insertion_delta(insert_after, first, last, removal_saving)
+                        if delta >= -_EPSILON:
+                            continue
+
+                        segment: List[int] = tour[first:last + 1]
+                        if reverse:
+                            segment.reverse()
+                        remaining: List[int] = tour[:first] + tour[last + 1:]
+                        index: int = insert_after + 1 if insert_after < first else insert_after + 1 - length
+                        candidate: List[int] = remaining[:index] + segment + remaining[index:]
+                        if self.time_windows is not None:
+                            lateness: float = self._lateness(candidate)
+                            if lateness > self.lateness + _EPSILON:
+                                continue
+                            self.lateness = lateness
+
+                        touched: Tuple[int, ...] = (
+                            before, after or 0, tour[insert_after],
+                            tour[insert_after + 1] if insert_after + 1 < end else 0,
+                            *segment
+                        )
+                        self.tour = tour = candidate
+                        for new_position, moved_stop in enumerate(tour):
+                            self.position[moved_stop] = new_position
+                        return touched
+        return None
+
+    def _reversal_delta(self, first: int, last: int) -> float:
+        """
+        Private method that gets how much reversing tour[first:last + 1]
+        changes the route length.
+        """
+        tour: List[int] = self.tour
+        distances: DistanceRows = self.distances
+        before: int = tour[first - 1]
+        delta: float = distances[before][tour[last]] - distances[before][tour[first]]
+        if last + 1 < len(tour):
+            after: int = tour[last + 1]
+            delta += distances[tour[first]][after] - distances[tour[last]][after]
+        return delta
+
+    def _insertion_delta(
+            self,
+            insert_after: int,
+            first: int,
+            last: int,
+            removal_saving: float
+    ) -> Tuple[float, bool]:
+        """
+        Private method that gets how much moving tour[first:last + 1] to
+        follow tour[insert_after] changes the route length, and whether it
+        is shorter to put the run in backwards.
+        """
+        tour: List[int] = self.tour
+        distances: DistanceRows = self.distances
+        previous: int = tour[insert_after]
+        following: Optional[int] = tour[insert_after + 1] if insert_after + 1 < len(tour) else None
+
+        forward: float = distances[previous][tour[first]]
+        backward: float = distances[previous][tour[last]]
+        if following is not None:
+            forward += distances[tour[last]][following] - distances[previous][following]
+            backward += distances[tour[first]][following] - distances[previous][following]
+        if backward < forward:
+            return backward - removal_saving, True
+        return forward - removal_saving, False
+
+    def _lateness(self, tour: List[int]) -> float:
+        """
+        Private method that adds up how many seconds a tour reaches its
+        stops after their deadlines.
+        """
+        if self.time_windows is None:
+            return 0.0
+
+        distances: DistanceRows = self.distances
+        clock: float = self.start_time
+        lateness: float = 0.0
+        previous: int = tour[0]
+        for stop in tour[1:]:
+            clock += distances[previous][stop] / self.speed
+            window: Optional[TimeWindow] = self.time_windows[stop]
+            if window is not None:
+                ready, due = window
+                if clock < ready:
+                    clock = ready
+                elif clock > due:
+                    lateness += clock - due
+            previous = stop
+        return lateness
@@ -0,0 +1,100 @@
+import math
+from array import array
+from typing import List, Mapping, Optional, Sequence
+
+from model.hub import Hub
+
+
+class ShortestPaths:
+    """
+    The immutable result of a single-source shortest path search.
+
+    Distances and predecessors are stored in flat arrays indexed by the
+    dense hub index the search used, so the result holds no references
+    into the graph's edge table and never changes once built. The hubs and
+    their indexes are a read-only snapshot shared by every search over the
+    same hubs, not a copy per result.
+
+    Attributes:
+        source (Hub): The hub the search started from.
+        distances (memoryview): Read-only distance from the source to each
+            hub index. Unreached hubs are infinity.
+        predecessors (memoryview): Read-only index of the previous hub on
+            the shortest path to each hub index, or -1 if there is none.
+    """
+
+    __slots__ = ("_source", "_hubs", "_hub_index", "_distances", "_predecessors")
+
+    def __init__(
+            self,
+            source: Hub,
+            hubs: Sequence[Hub],
+            hub_index: Mapping[Hub, int],
+            distances: array,
+            predecessors: array
+    ) -> None:
+        object.__setattr__(self, "_source", source)
+        object.__setattr__(self, "_hubs", hubs)
+        object.__setattr__(self, "_hub_index", hub_index)
+        object.__setattr__(self, "_distances", memoryview(distances).toreadonly())
+        object.__setattr__(self, "_predecessors", memoryview(predecessors).toreadonly())
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the search result.
+
+        Returns:
+            A string representation of the search result.
+        """
+        return f"ShortestPaths(source={self._source})"
+
+    @property
+    def source(self) -> Hub:
+        return self._source
+
+    @property
+    def distances(self) -> memoryview:
+        return self._distances
+
+    @property
+    def predecessors(self) -> memoryview:
+        return self._predecessors
+
+    def distance_to(self, hub: Hub) -> float:
+        """
+        Gets the length of the shortest path from the source to a hub.
+
+        Args:
+            hub (Hub): The destination hub.
+        Returns:
+            distance (float): The shortest distance, or infinity if the hub
+                was not reached.
+        """
+        index: Optional[int] = self._hub_index.get(hub)
+        return math.inf if index is None else self._distances[index]
+
+    def path_to(self, hub: Hub) -> List[Hub]:
+        """
+        Reconstructs the shortest path from the source to a hub.
+
+        Args:
+            hub (Hub): The destination hub.
+        Returns:
+            path (List[Hub]): The hubs along the path, starting with the
+                source and ending with `hub`, or an empty list if the hub
+                was not reached.
+        """
+        index: Optional[int] = self._hub_index.get(hub)
+        if index is None or self._distances[index] == math.inf:
+            return []
+
+        path: List[Hub] = []
+        while index != -1:
+            path.append(self._hubs[index])
+            index = self._predecessors[index]
+
+        path.reverse()
+        return path
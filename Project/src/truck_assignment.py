@@ -0,0 +1,837 @@
+import heapq
+import math
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from constants import (
+    ASSIGNMENT_BALANCE_WEIGHT,
+    ASSIGNMENT_CANDIDATE_TRUCKS,
+    ASSIGNMENT_MAX_ITERATIONS,
+    DEFAULT_DELIVERY_START_SECONDS,
+    DELAYED_START_SECONDS,
+    MAX_NUMBER_OF_DRIVERS,
+    MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+    MAX_TRUCK_CAPACITY,
+    MAX_TRUCK_DISTANCE_PER_SECOND
+)
+from model.package import Package
+from src.business_rules import BusinessRules, CoDeliveryGroup, PackageRules
+from src.route_construction import DistanceRows
+from utils.clock import time_to_seconds
+
+# The earliest a stop can be delivered to and when it is due, in seconds.
+TimeWindow = Tuple[int, int]
+
+
+class TruckAssignment:
+    """
+    Splits a day's packages between the trucks.
+
+    Packages that have to travel together are first joined into units:
+    every "Must be delivered with" group becomes one unit, and other
+    packages going to the same stop under the same rules are packed into
+    units of up to a truckload. Units are then clustered around one medoid
+    stop per truck (k-medoids on the distance matrix). Each unit goes to
+    one of the trucks with the closest medoids that has room and may carry
+    it, preferring trucks on which every deadline is still made and then
+    those with less estimated driving so far. The truck with the longest
+    estimated drive then hands units to, or swaps them with, nearby trucks
+    while that shortens it. Finally the medoids move to the middle of their
+    trucks' stops and the units are assigned again until nothing changes.
+
+    Deadlines are checked by driving each truck's stops nearest first, the
+    way the dispatcher does, passing over a corrected address until it is
+    known; such a unit goes on the truck that waits least for it. Trucks
+    past the number of drivers leave once a driver is estimated to be back
+    from an earlier truck, so their departure times are worked out again
+    after every round.
+
+    The rules are compiled from the package notes by BusinessRules:
+        - "Can only be on truck N" pins a package to truck N; a package
+          allowed on several trucks is pinned to the first of them.
+        - "Must be delivered with A, B" keeps a package on the truck with A and B.
+        - Delayed packages only go on trucks that leave once they arrive.
+    """
+
+    @staticmethod
+    def assign(
+            packages: Sequence[Package],
+            stops: Sequence[int],
+            distances: DistanceRows,
+            truck_count: int = MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+            capacity: int = MAX_TRUCK_CAPACITY,
+            departure_times: Optional[Sequence[int]] = None,
+            speed: float = MAX_TRUCK_DISTANCE_PER_SECOND,
+            driver_count: Optional[int] = MAX_NUMBER_OF_DRIVERS
+    ) -> List[List[int]]:
+        """
+        Assigns every package to a truck.
+
+        Args:
+            packages (Sequence[Package]): The packages to deliver.
+            stops (Sequence[int]): The distance matrix index of each package's stop.
+            distances (DistanceRows): The distance matrix, depot first.
+            truck_count (int): How many trucks to load.
+            capacity (int): How many packages fit on a truck.
+            departure_times (Optional[Sequence[int]]): The earliest each
+                truck may leave the depot, in seconds. By default the
+                trucks with a driver may leave at the start of the day and
+                the rest once the delayed packages arrive.
+            speed (float): The trucks' speed in miles per second.
+            driver_count (Optional[int]): How many drivers there are. The
+                trucks past the first driver_count also wait for a driver
+                to get back from an earlier truck. None if every truck has
+                its own driver.
+
+        Returns:
+            The package ids loaded on each truck, truck 1 first.
+
+        Raises:
+            ValueError: If the rules cannot all be met, e.g. a group of
+                packages that must travel together does not fit on a truck.
+        """
+        if driver_count is not None and driver_count < 1:
+            raise ValueError("At least one driver is needed")
+        drivers: int = truck_count if driver_count is None else min(driver_count, truck_count)
+        if departure_times is None:
+            departure_times = [
+                DEFAULT_DELIVERY_START_SECONDS if truck < drivers else DELAYED_START_SECONDS
+                for truck in range(truck_count)
+            ]
+        if len(packages) > truck_count * capacity:
+            raise ValueError(f"{len(packages)} packages do not fit on {truck_count} trucks of {capacity}")
+
+        units: List[_Unit] = TruckAssignment._build_units(packages, stops, distances, capacity, truck_count)
+        state: _AssignmentState = _AssignmentState(
+            units=units,
+            distances=distances,
+            truck_count=truck_count,
+            capacity=capacity,
+            departure_times=departure_times,
+            speed=speed,
+            driver_count=drivers
+        )
+
+        for _ in range(ASSIGNMENT_MAX_ITERATIONS):
+            state.assign_units()
+            waited: bool = state.wait_for_drivers()
+            if not state.move_medoids() and not waited:
+                break
+        state.balance()
+
+        loads: List[List[int]] = [[] for _ in range(truck_count)]
+        for unit, truck in zip(units, state.trucks_of_units):
+            loads[truck].extend(unit.package_ids)
+        for load in loads:
+            load.sort()
+        return loads
+
+    @staticmethod
+    def estimated_miles(
+            loads: Sequence[Sequence[int]],
+            stops_by_package: Dict[int, int],
+            distances: DistanceRows
+    ) -> List[float]:
+        """
+        Estimates how far each truck drives: from the depot to the nearest
+        of its stops each time, the way the dispatcher drives, and back.
+
+        Args:
+            loads (Sequence[Sequence[int]]): The package ids on each truck.
+            stops_by_package (Dict[int, int]): Package id -> distance matrix index.
+            distances (DistanceRows): The distance matrix, depot first.
+
+        Returns:
+            The estimated miles of each truck.
+        """
+        return [
+            _tour_miles(
+                _nearest_first(dict.fromkeys(stops_by_package[package_id] for package_id in load), distances),
+                distances
+            )
+            for load in loads
+        ]
+
+    @staticmethod
+    def _build_units(
+            packages: Sequence[Package],
+            stops: Sequence[int],
+            distances: DistanceRows,
+            capacity: int,
+            truck_count: int
+    ) -> List["_Unit"]:
+        """
+        Private method that joins the packages that have to share a truck.
+
+        Returns:
+            The units, in manifest order of their first package.
+        """
+        rules: BusinessRules = BusinessRules(packages)
+
+        # Rows of each "Must be delivered with" group, then every other package on its own
+        members: Dict[int, List[int]] = {}
+        for row, package in enumerate(packages):
+            group: Optional[CoDeliveryGroup] = rules.group_of(package.package_id)
+            key: int = group.group_id if group is not None else len(rules.groups) + row
+            members.setdefault(key, []).append(row)
+
+        units: List[_Unit] = []
+        open_units: Dict[Tuple[int, Optional[int], int, int], _Unit] = {}
+        for rows in members.values():
+            allowed: Optional[FrozenSet[int]] = None
+            for row in rows:
+                package_rules: Optional[PackageRules] = rules.get(packages[row].package_id)
+                if package_rules is not None and package_rules.trucks is not None:
+                    allowed = package_rules.trucks if allowed is None else allowed & package_rules.trucks
+            allowed_trucks: List[int] = sorted(
+                truck - 1 for truck in allowed or () if 0 < truck <= truck_count
+            )
+            if allowed is not None and not allowed_trucks:
+                raise ValueError(f"Packages {_ids(packages, rows)} are only allowed on trucks that are not dispatched")
+            # A unit allowed on several trucks is pinned to the first of them
+            truck: Optional[int] = allowed_trucks[0] if allowed_trucks else None
+            release: int = max(rules.release_time(packages[row].package_id) for row in rows)
+            ready: int = max(rules.ready_time(packages[row].package_id) for row in rows)
+
+            if len(rows) > 1:
+                if len(rows) > capacity:
+                    raise ValueError(f"Packages {_ids(packages, rows)} must travel together but do not fit on a truck")
+                units.append(_Unit(
+                    packages=[packages[row] for row in rows],
+                    stops=list(dict.fromkeys(stops[row] for row in rows)),
+                    distances=distances,
+                    truck=truck,
+                    release=release,
+                    ready=ready,
+                    grouped=True
+                ))
+                continue
+
+            # Packages without a group share a unit with others for the same
+            # stop under the same rules, up to a truckload
+            key: Tuple[int, Optional[int], int, int] = (stops[rows[0]], truck, release, ready)
+            unit: Optional[_Unit] = open_units.get(key)
+            if unit is None or unit.size >= capacity:
+                unit = _Unit(
+                    packages=[packages[rows[0]]],
+                    stops=[stops[rows[0]]],
+                    distances=distances,
+                    truck=truck,
+                    release=release,
+                    ready=ready,
+                    grouped=False
+                )
+                open_units[key] = unit
+                units.append(unit)
+            else:
+                unit.add(packages[rows[0]])
+        return units
+
+
+class _Unit:
+    """
+    Packages that go on the same truck. Units of packages that merely share
+    a stop (not `grouped`) may be split again when they fit on no truck.
+    """
+
+    __slots__ = (
+        "package_ids", "deadlines", "stops", "stop", "truck", "release", "ready", "grouped", "size", "deadline"
+    )
+
+    def __init__(
+            self,
+            packages: List[Package],
+            stops: List[int],
+            distances: DistanceRows,
+            truck: Optional[int],
+            release: int,
+            ready: int,
+            grouped: bool
+    ) -> None:
+        self.package_ids: List[int] = [package.package_id for package in packages]
+        self.deadlines: List[int] = [time_to_seconds(package.delivery_time) for package in packages]
+        self.stops: List[int] = stops
+        self.stop: int = _medoid(stops, distances)
+        self.truck: Optional[int] = truck
+        self.release: int = release
+        # When the unit's address is known, so it can be delivered
+        self.ready: int = ready
+        self.grouped: bool = grouped
+        self.size: int = len(self.package_ids)
+        self.deadline: int = min(self.deadlines)
+
+    def add(self, package: Package) -> None:
+        """
+        Adds a package for the unit's stop.
+        """
+        self.package_ids.append(package.package_id)
+        self.deadlines.append(time_to_seconds(package.delivery_time))
+        self.size += 1
+        self.deadline = min(self.deadline, self.deadlines[-1])
+
+    def split(self) -> List["_Unit"]:
+        """
+        Splits the unit in half.
+        """
+        half: int = self.size // 2
+        pieces: List[_Unit] = []
+        for start, end in ((0, half), (half, self.size)):
+            piece: _Unit = _Unit.__new__(_Unit)
+            piece.package_ids = self.package_ids[start:end]
+            piece.deadlines = self.deadlines[start:end]
+            piece.stops = self.stops
+            piece.stop = self.stop
+            piece.truck = self.truck
+            piece.release = self.release
+            piece.ready = self.ready
+            piece.grouped = False
+            piece.size = end - start
+            piece.deadline = min(piece.deadlines)
+            pieces.append(piece)
+        return pieces
+
+
+class _AssignmentState:
+    """
+    The trucks' medoids, loads, departure times and estimated miles during
+    one assignment.
+    """
+
+    def __init__(
+            self,
+            units: List[_Unit],
+            distances: DistanceRows,
+            truck_count: int,
+            capacity: int,
+            departure_times: Sequence[int],
+            speed: float,
+            driver_count: int
+    ) -> None:
+        self.units: List[_Unit] = units
+        self.distances: DistanceRows = distances
+        self.truck_count: int = truck_count
+        self.capacity: int = capacity
+        self.earliest_departures: Sequence[int] = departure_times
+        self.departure_times: List[int] = list(departure_times)
+        self.speed: float = speed
+        self.driver_count: int = driver_count
+        self.trucks_of_units: List[int] = []
+
+        self.order: List[int] = self._placement_order()
+        self.medoids: List[int] = self._seed_medoids()
+
+    def assign_units(self) -> List[int]:
+        """
+        Assigns every unit to a truck around the current medoids.
+
+        A unit of packages that only share a stop is split into single
+        packages when no truck has room for all of it.
+
+        Returns:
+            The truck of each unit.
+
+        Raises:
+            ValueError: If a package or group of packages fits on no truck.
+        """
+        distances: DistanceRows = self.distances
+        units: List[_Unit] = self.units
+        room: List[int] = [self.capacity] * self.truck_count
+        miles: List[float] = [distances[0][medoid] for medoid in self.medoids]
+        stop_windows: List[Dict[int, TimeWindow]] = [{} for _ in range(self.truck_count)]
+        # Stops reached past their deadline, and by how many seconds in total
+        lateness: List[Tuple[int, float]] = [(0, 0.0)] * self.truck_count
+
+        # Trucks at each medoid stop, latest departure first
+        trucks_at: Dict[int, List[int]] = {}
+        for truck in sorted(range(self.truck_count), key=lambda truck: -self.departure_times[truck]):
+            trucks_at.setdefault(self.medoids[truck], []).append(truck)
+        medoid_stops: List[int] = list(trucks_at)
+        closest_medoids: Dict[int, List[int]] = {}
+
+        assignment: List[int] = [0] * len(units)
+        pending: Deque[int] = deque(self.order)
+        while pending:
+            position: int = pending.popleft()
+            unit: _Unit = units[position]
+            if unit.truck is not None:
+                candidates: List[int] = [unit.truck] if room[unit.truck] >= unit.size else []
+            else:
+                ordered: Optional[List[int]] = closest_medoids.get(unit.stop)
+                if ordered is None:
+                    ordered = sorted(medoid_stops, key=distances[unit.stop].__getitem__)
+                    closest_medoids[unit.stop] = ordered
+                candidates = self._closest_trucks(unit, ordered, trucks_at, room)
+            if not candidates:
+                if unit.grouped or unit.size == 1:
+                    raise ValueError(f"Packages {unit.package_ids} fit on no truck")
+                first_half, second_half = unit.split()
+                units[position] = first_half
+                units.append(second_half)
+                assignment.append(0)
+                pending.appendleft(len(units) - 1)
+                pending.appendleft(position)
+                continue
+
+            # Take the truck on which every deadline is still made with the
+            # least waiting for the unit's address, detour and driving so far,
+            # or else the one that adds the least lateness
+            row: Sequence[float] = distances[unit.stop]
+            candidates.sort(
+                key=lambda candidate: (
+                    max(0, unit.ready - self.departure_times[candidate]),
+                    row[self.medoids[candidate]] + ASSIGNMENT_BALANCE_WEIGHT * miles[candidate]
+                )
+            )
+            truck: int = candidates[0]
+            added_lateness: Tuple[float, float] = (math.inf, math.inf)
+            truck_windows: Dict[int, TimeWindow] = {}
+            truck_lateness: Tuple[int, float] = (0, 0.0)
+            for candidate in candidates:
+                trial_windows: Dict[int, TimeWindow] = dict(stop_windows[candidate])
+                _add_windows(trial_windows, unit)
+                trial_late_stops, trial_late_seconds, _, _ = self._drive(
+                    trial_windows, self.departure_times[candidate]
+                )
+                added: Tuple[float, float] = (
+                    trial_late_stops - lateness[candidate][0], trial_late_seconds - lateness[candidate][1]
+                )
+                if added < added_lateness:
+                    truck, truck_windows, added_lateness = candidate, trial_windows, added
+                    truck_lateness = (trial_late_stops, trial_late_seconds)
+                    if added[0] <= 0 and added[1] <= 0:
+                        break
+            stop_windows[truck] = truck_windows
+            lateness[truck] = truck_lateness
+
+            assignment[position] = truck
+            room[truck] -= unit.size
+            if room[truck] == 0:
+                trucks_at[self.medoids[truck]].remove(truck)
+            medoid_row: Sequence[float] = distances[self.medoids[truck]]
+            miles[truck] += sum(2 * medoid_row[stop] for stop in unit.stops)
+
+        if len(units) != len(self.order):
+            self.order = self._placement_order()
+        self.trucks_of_units = assignment
+        return assignment
+
+    def balance(self) -> None:
+        """
+        Evens out the estimated miles of the trucks.
+
+        The truck with the longest estimated tour gives one of its units
+        to, or swaps one with, a truck whose medoid is among the closest to
+        the unit. Exchanges are ranked by the longer of the two tours they
+        leave, priced by taking the unit's stops out of one tour and
+        inserting them into the other; the best one that really shortens
+        the longest tour without leaving more stops late is made. This
+        repeats until the longest tour cannot be shortened. Pinned units
+        stay where they are.
+        """
+        distances: DistanceRows = self.distances
+        units: List[_Unit] = self.units
+        truck_units: List[List[int]] = [[] for _ in range(self.truck_count)]
+        for position, truck in enumerate(self.trucks_of_units):
+            truck_units[truck].append(position)
+        stop_counts: List[Dict[int, int]] = [{} for _ in range(self.truck_count)]
+        room: List[int] = [self.capacity] * self.truck_count
+        for truck, positions in enumerate(truck_units):
+            for position in positions:
+                _count_stops(stop_counts[truck], units[position], 1)
+                room[truck] -= units[position].size
+        tours: List[List[int]] = [_nearest_first(counts, distances) for counts in stop_counts]
+        days: List[Tuple[int, float, float, float]] = [
+            self._drive(self._stop_windows(positions), self.departure_times[truck])
+            for truck, positions in enumerate(truck_units)
+        ]
+        miles: List[float] = [day[2] for day in days]
+        late_stops: List[int] = [day[0] for day in days]
+
+        trucks_at: Dict[int, List[int]] = {}
+        for truck, medoid in enumerate(self.medoids):
+            trucks_at.setdefault(medoid, []).append(truck)
+        closest_medoids: Dict[int, List[int]] = {}
+
+        longest: List[Tuple[float, int]] = [(-truck_miles, truck) for truck, truck_miles in enumerate(miles)]
+        heapq.heapify(longest)
+        for _ in range(len(units)):
+            while -longest[0][0] != miles[longest[0][1]]:
+                # Left behind by an exchange
+                heapq.heappop(longest)
+            truck: int = longest[0][1]
+
+            # Exchanges priced by removal and insertion costs, as
+            # (longer tour, unit position, other truck, partner position or None)
+            options: List[Tuple[float, int, int, Optional[int]]] = []
+            partner_costs: Dict[int, Tuple[float, float]] = {}
+            for position in truck_units[truck]:
+                unit: _Unit = units[position]
+                if unit.truck is not None:
+                    continue
+                ordered: Optional[List[int]] = closest_medoids.get(unit.stop)
+                if ordered is None:
+                    ordered = sorted(trucks_at, key=distances[unit.stop].__getitem__)
+                    closest_medoids[unit.stop] = ordered
+                removal: float = _removal_gain(tours[truck], stop_counts[truck], unit, distances)
+                for other in self._nearby_trucks(unit, truck, ordered, trucks_at):
+                    insertion: float = _insertion_cost(tours[other], stop_counts[other], unit, distances)
+                    if room[other] >= unit.size:
+                        longer: float = max(miles[truck] - removal, miles[other] + insertion)
+                        if longer < miles[truck]:
+                            options.append((longer, position, other, None))
+                    for partner_position in truck_units[other]:
+                        partner: _Unit = units[partner_position]
+                        if (
+                                partner.truck is not None
+                                or partner.release > self.departure_times[truck]
+                                or room[truck] + unit.size < partner.size
+                                or room[other] + partner.size < unit.size
+                        ):
+                            continue
+                        costs: Optional[Tuple[float, float]] = partner_costs.get(partner_position)
+                        if costs is None:
+                            costs = (
+                                _removal_gain(tours[other], stop_counts[other], partner, distances),
+                                _insertion_cost(tours[truck], stop_counts[truck], partner, distances)
+                            )
+                            partner_costs[partner_position] = costs
+                        longer = max(miles[truck] - removal + costs[1], miles[other] - costs[0] + insertion)
+                        if longer < miles[truck]:
+                            options.append((longer, position, other, partner_position))
+
+            # Make the best exchange that holds up once both tours are driven again
+            exchange: Optional[Tuple[int, int, Optional[int], List[Tuple[List[int], float, int]]]] = None
+            for _, position, other, partner_position in sorted(options, key=lambda option: option[0]):
+                trial_loads: List[List[int]] = [
+                    [current for current in truck_units[truck] if current != position],
+                    [current for current in truck_units[other] if current != partner_position] + [position]
+                ]
+                if partner_position is not None:
+                    trial_loads[0].append(partner_position)
+                trials: List[Tuple[List[int], float, int]] = []
+                for changed, positions in zip((truck, other), trial_loads):
+                    windows: Dict[int, TimeWindow] = self._stop_windows(positions)
+                    trial_late, _, trial_miles, _ = self._drive(windows, self.departure_times[changed])
+                    trials.append((_nearest_first(windows, distances), trial_miles, trial_late))
+                if (
+                        max(trials[0][1], trials[1][1]) < miles[truck]
+                        and trials[0][2] + trials[1][2] <= late_stops[truck] + late_stops[other]
+                ):
+                    exchange = (position, other, partner_position, trials)
+                    break
+            if exchange is None:
+                break
+
+            position, other, partner_position, trials = exchange
+            for source, target, moved in ((truck, other, position), (other, truck, partner_position)):
+                if moved is None:
+                    continue
+                truck_units[source].remove(moved)
+                truck_units[target].append(moved)
+                _count_stops(stop_counts[source], units[moved], -1)
+                _count_stops(stop_counts[target], units[moved], 1)
+                room[source] += units[moved].size
+                room[target] -= units[moved].size
+                self.trucks_of_units[moved] = target
+            for changed, (tour, tour_miles, tour_late_stops) in zip((truck, other), trials):
+                tours[changed], miles[changed], late_stops[changed] = tour, tour_miles, tour_late_stops
+                heapq.heappush(longest, (-tour_miles, changed))
+
+    def wait_for_drivers(self) -> bool:
+        """
+        Moves the departure of every truck past the drivers to when the
+        first driver is estimated to be back from an earlier truck.
+
+        Returns:
+            True if a departure time changed.
+        """
+        truck_units: List[List[int]] = [[] for _ in range(self.truck_count)]
+        for position, truck in enumerate(self.trucks_of_units):
+            truck_units[truck].append(position)
+
+        drivers_back: List[int] = []
+        changed: bool = False
+        for truck in range(self.truck_count):
+            departure: int = self.earliest_departures[truck]
+            if truck >= self.driver_count:
+                departure = max(departure, heapq.heappop(drivers_back))
+            changed = changed or departure != self.departure_times[truck]
+            self.departure_times[truck] = departure
+            _, _, _, back = self._drive(self._stop_windows(truck_units[truck]), departure)
+            heapq.heappush(drivers_back, math.ceil(back))
+        return changed
+
+    def move_medoids(self) -> bool:
+        """
+        Moves each truck's medoid to the stop with the least total distance
+        to the truck's other stops.
+
+        Returns:
+            False once the set of medoid stops stops changing. Trucks at the
+            same stop are interchangeable, so which one holds which
+            medoid does not matter.
+        """
+        previous_medoids: List[int] = sorted(self.medoids)
+        stops_by_truck: List[List[int]] = [[] for _ in range(self.truck_count)]
+        for unit, truck in zip(self.units, self.trucks_of_units):
+            stops_by_truck[truck].extend(unit.stops)
+        for truck, truck_stops in enumerate(stops_by_truck):
+            if truck_stops:
+                self.medoids[truck] = _medoid(list(dict.fromkeys(truck_stops)), self.distances)
+        return sorted(self.medoids) != previous_medoids
+
+    def _placement_order(self) -> List[int]:
+        """
+        Private method that orders the units for placement: the most
+        constrained first, groups that cannot be split before packages that
+        can, then the ones with the earliest deadlines, then the ones
+        farthest from the depot.
+        """
+        units: List[_Unit] = self.units
+        depot: Sequence[float] = self.distances[0]
+        return sorted(
+            range(len(units)),
+            key=lambda unit: (
+                units[unit].truck is None, -units[unit].release, not units[unit].grouped,
+                units[unit].deadline, -depot[units[unit].stop], -units[unit].size
+            )
+        )
+
+    def _closest_trucks(
+            self,
+            unit: _Unit,
+            ordered_medoids: List[int],
+            trucks_at: Dict[int, List[int]],
+            room: List[int]
+    ) -> List[int]:
+        """
+        Private method that finds up to ASSIGNMENT_CANDIDATE_TRUCKS trucks
+        with room for a unit that may carry it, closest medoid first.
+        """
+        candidates: List[int] = []
+        full_medoids: int = 0
+        size: int = unit.size
+        release: int = unit.release
+        departure_times: Sequence[int] = self.departure_times
+        for medoid in ordered_medoids:
+            trucks: List[int] = trucks_at[medoid]
+            if not trucks:
+                full_medoids += 1
+                continue
+            for truck in trucks:
+                if release > departure_times[truck]:
+                    # The rest of the trucks here leave even earlier
+                    break
+                if room[truck] >= size:
+                    candidates.append(truck)
+                    if len(candidates) == ASSIGNMENT_CANDIDATE_TRUCKS:
+                        break
+            if len(candidates) == ASSIGNMENT_CANDIDATE_TRUCKS:
+                break
+
+        # Stop walking past medoids whose trucks are all full
+        if full_medoids > ASSIGNMENT_CANDIDATE_TRUCKS:
+            ordered_medoids[:] = [medoid for medoid in ordered_medoids if trucks_at[medoid]]
+        return candidates
+
+    def _seed_medoids(self) -> List[int]:
+        """
+        Private method that picks the first medoids. Pinned trucks start at
+        the stop of their first unit; the other trucks start at the stops
+        farthest from the depot and from each other.
+        """
+        medoids: List[Optional[int]] = [None] * self.truck_count
+        for position in self.order:
+            unit: _Unit = self.units[position]
+            if unit.truck is not None and medoids[unit.truck] is None:
+                medoids[unit.truck] = unit.stop
+
+        unit_stops: List[int] = list(dict.fromkeys(unit.stop for unit in self.units))
+        nearest: List[float] = [self.distances[0][stop] for stop in unit_stops]
+        for medoid in medoids:
+            if medoid is not None:
+                self._update_nearest(unit_stops, nearest, medoid)
+
+        for truck in range(self.truck_count):
+            if medoids[truck] is None:
+                farthest: int = max(range(len(unit_stops)), key=nearest.__getitem__)
+                medoids[truck] = unit_stops[farthest]
+                self._update_nearest(unit_stops, nearest, unit_stops[farthest])
+        return medoids
+
+    def _update_nearest(self, unit_stops: List[int], nearest: List[float], medoid: int) -> None:
+        """
+        Private method that lowers each stop's distance to its nearest
+        medoid after a medoid is added.
+        """
+        row: Sequence[float] = self.distances[medoid]
+        for index, stop in enumerate(unit_stops):
+            if row[stop] < nearest[index]:
+                nearest[index] = row[stop]
+
+    def _nearby_trucks(
+            self,
+            unit: _Unit,
+            truck: int,
+            ordered_medoids: List[int],
+            trucks_at: Dict[int, List[int]]
+    ) -> List[int]:
+        """
+        Private method that finds up to ASSIGNMENT_CANDIDATE_TRUCKS other
+        trucks that may carry a unit, closest medoid first, full or not.
+        """
+        nearby: List[int] = []
+        for medoid in ordered_medoids:
+            for other in trucks_at[medoid]:
+                departure: int = self.departure_times[other]
+                if other == truck or unit.release > departure:
+                    continue
+                if unit.ready > departure and departure < self.departure_times[truck]:
+                    # Its driver would wait even longer for the unit's address
+                    continue
+                nearby.append(other)
+                if len(nearby) == ASSIGNMENT_CANDIDATE_TRUCKS:
+                    return nearby
+        return nearby
+
+    def _stop_windows(self, positions: List[int]) -> Dict[int, TimeWindow]:
+        """
+        Private method that gets the time window of each stop of some units.
+        """
+        stop_windows: Dict[int, TimeWindow] = {}
+        for position in positions:
+            _add_windows(stop_windows, self.units[position])
+        return stop_windows
+
+    def _drive(self, stop_windows: Dict[int, TimeWindow], departure: int) -> Tuple[int, float, float, float]:
+        """
+        Private method that estimates a truck's day by driving to the
+        nearest of its stops each time, the way the dispatcher does, and
+        back to the depot. Stops whose address is not known yet are passed
+        over, and the truck waits for the next one when nothing else is left.
+
+        Returns:
+            The number of stops reached past their deadline, the seconds
+            they are late in total, the miles driven and when the truck is
+            back at the depot.
+        """
+        distances: DistanceRows = self.distances
+        location: int = 0
+        miles: float = 0.0
+        clock: float = departure
+        late_stops: int = 0
+        late_seconds: float = 0.0
+        remaining: Dict[int, TimeWindow] = dict(stop_windows)
+        while remaining:
+            ready: List[int] = [stop for stop, (opens, _) in remaining.items() if opens <= clock]
+            if not ready:
+                clock = min(opens for opens, _ in remaining.values())
+                continue
+            row: Sequence[float] = distances[location]
+            stop: int = min(ready, key=row.__getitem__)
+            miles += row[stop]
+            clock += row[stop] / self.speed
+            location = stop
+            late: float = clock - remaining.pop(stop)[1]
+            if late > 0:
+                late_stops += 1
+                late_seconds += late
+        return late_stops, late_seconds, miles + distances[location][0], clock + distances[location][0] / self.speed
+
+
+def _medoid(stops: List[int], distances: DistanceRows) -> int:
+    """
+    Gets the stop with the least total distance to the others.
+    """
+    if len(stops) <= 2:
+        return stops[0]
+    return min(stops, key=lambda stop: math.fsum(distances[stop][other] for other in stops))
+
+
+def _nearest_first(stops: Iterable[int], distances: DistanceRows) -> List[int]:
+    """
+    Orders stops the way the dispatcher drives them: from the depot to the
+    nearest stop left each time.
+    """
+    remaining: List[int] = list(stops)
+    order: List[int] = []
+    location: int = 0
+    while remaining:
+        row: Sequence[float] = distances[location]
+        location = min(remaining, key=row.__getitem__)
+        remaining.remove(location)
+        order.append(location)
+    return order
+
+
+def _tour_miles(tour: List[int], distances: DistanceRows) -> float:
+    """
+    Gets the miles from the depot along a tour and back.
+    """
+    if not tour:
+        return 0.0
+    return (
+        distances[0][tour[0]]
+        + sum(distances[start][end] for start, end in zip(tour, tour[1:]))
+        + distances[tour[-1]][0]
+    )
+
+
+def _removal_gain(tour: List[int], stop_counts: Dict[int, int], unit: _Unit, distances: DistanceRows) -> float:
+    """
+    Estimates the miles saved by taking a unit off a truck: each stop only
+    the unit goes to is cut out of the tour on its own.
+    """
+    gain: float = 0.0
+    for stop in unit.stops:
+        if stop_counts.get(stop) != 1:
+            continue
+        index: int = tour.index(stop)
+        before: int = tour[index - 1] if index > 0 else 0
+        after: int = tour[index + 1] if index + 1 < len(tour) else 0
+        gain += distances[before][stop] + distances[stop][after] - distances[before][after]
+    return gain
+
+
+def _insertion_cost(tour: List[int], stop_counts: Dict[int, int], unit: _Unit, distances: DistanceRows) -> float:
+    """
+    Estimates the miles added by putting a unit on a truck: each stop the
+    truck does not go to yet is inserted where it adds the least on its own.
+    """
+    cost: float = 0.0
+    legs: List[Tuple[int, int]] = list(zip([0] + tour, tour + [0]))
+    for stop in unit.stops:
+        if stop in stop_counts:
+            continue
+        row: Sequence[float] = distances[stop]
+        cost += min(distances[start][stop] + row[end] - distances[start][end] for start, end in legs)
+    return cost
+
+
+def _add_windows(stop_windows: Dict[int, TimeWindow], unit: _Unit) -> None:
+    """
+    Adds a unit's stops to a truck's stops. A stop opens once every unit
+    going there can be delivered and is due by the earliest deadline.
+    """
+    for stop in unit.stops:
+        opens, due = stop_windows.get(stop, (unit.ready, unit.deadline))
+        stop_windows[stop] = (max(opens, unit.ready), min(due, unit.deadline))
+
+
+def _count_stops(stop_counts: Dict[int, int], unit: _Unit, step: int) -> None:
+    """
+    Counts a unit's stops on or off a truck, dropping stops no unit goes to.
+    """
+    for stop in unit.stops:
+        count: int = stop_counts.get(stop, 0) + step
+        if count:
+            stop_counts[stop] = count
+        else:
+            del stop_counts[stop]
+
+
+def _ids(packages: Sequence[Package], rows: List[int]) -> List[int]:
+    """
+    Gets the package ids of manifest rows, for error messages.
+    """
+    return [packages[row].package_id for row in rows]
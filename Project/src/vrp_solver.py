@@ -0,0 +1,609 @@
+import heapq
+import math
+import random
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from constants import (
+    DEFAULT_DELIVERY_END_SECONDS,
+    DEFAULT_DELIVERY_START_SECONDS,
+    MAX_NUMBER_OF_DRIVERS,
+    MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+    MAX_TRUCK_CAPACITY,
+    MAX_TRUCK_DISTANCE_PER_SECOND,
+    VRP_ACCEPTED_SCORE,
+    VRP_BUDGET_SECONDS,
+    VRP_COOLING_RATE,
+    VRP_DEFAULT_SEED,
+    VRP_IMPROVED_SCORE,
+    VRP_LATENESS_PENALTY,
+    VRP_MAX_REMOVAL_FRACTION,
+    VRP_MIN_REMOVAL_FRACTION,
+    VRP_NEW_BEST_SCORE,
+    VRP_REACTION_FACTOR,
+    VRP_SEGMENT_ITERATIONS,
+    VRP_START_TEMPERATURE_RATIO
+)
+from model.package import Package
+from src.business_rules import BusinessRules, CoDeliveryGroup, PackageRules
+from src.route_construction import DistanceRows
+from utils.clock import time_to_seconds
+
+# The packages on each truck in delivery order, as package numbers.
+Routes = List[List[int]]
+
+
+class VrpProblem:
+    """
+    A day's deliveries for the VRP solver.
+
+    Packages are numbered 0 .. n - 1 in the order they were given, and stop
+    0 of the distance matrix is the depot. Packages that must share a truck
+    are joined into units, which the solver always moves as a whole.
+
+    Attributes:
+        package_ids (List[int]): The package id of each package number.
+        stops (List[int]): The distance matrix index of each package's stop.
+        distances (DistanceRows): The distance matrix, depot first.
+        deadlines (List[int]): When each package is due, in seconds.
+        releases (List[int]): When each package reaches the depot, in seconds.
+        ready_times (List[int]): The earliest each package can be handed
+            over, e.g. once its corrected address is known, in seconds.
+        units (List[List[int]]): The package numbers of each unit.
+        unit_trucks (List[Optional[List[int]]]): The trucks each unit may
+            go on, as 0-based indexes, or None if it may go on any.
+        truck_count (int): How many trucks can be loaded.
+        driver_count (int): How many drivers there are. Trucks past the
+            first driver_count wait for a driver to come back to the depot.
+        capacity (int): How many packages fit on a truck.
+        speed (float): The trucks' speed in miles per second.
+        start_time (int): When the first trucks may leave, in seconds.
+        end_time (int): When the last delivery must be made, in seconds.
+    """
+
+    def __init__(
+            self,
+            package_ids: List[int],
+            stops: List[int],
+            distances: DistanceRows,
+            deadlines: List[int],
+            releases: List[int],
+            ready_times: List[int],
+            units: List[List[int]],
+            unit_trucks: List[Optional[List[int]]],
+            truck_count: int = MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+            driver_count: int = MAX_NUMBER_OF_DRIVERS,
+            capacity: int = MAX_TRUCK_CAPACITY,
+            speed: float = MAX_TRUCK_DISTANCE_PER_SECOND,
+            start_time: int = DEFAULT_DELIVERY_START_SECONDS,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS
+    ) -> None:
+        self.package_ids: List[int] = package_ids
+        self.stops: List[int] = stops
+        self.distances: DistanceRows = distances
+        self.deadlines: List[int] = deadlines
+        self.releases: List[int] = releases
+        self.ready_times: List[int] = ready_times
+        self.units: List[List[int]] = units
+        self.unit_trucks: List[Optional[List[int]]] = unit_trucks
+        self.truck_count: int = truck_count
+        self.driver_count: int = driver_count
+        self.capacity: int = capacity
+        self.speed: float = speed
+        self.start_time: int = start_time
+        self.end_time: int = end_time
+
+    @staticmethod
+    def from_packages(
+            packages: Sequence[Package],
+            stops: Sequence[int],
+            distances: DistanceRows,
+            truck_count: int = MAX_NUMBER_OF_TRUCKS_TO_DISPATCH,
+            driver_count: int = MAX_NUMBER_OF_DRIVERS,
+            capacity: int = MAX_TRUCK_CAPACITY,
+            speed: float = MAX_TRUCK_DISTANCE_PER_SECOND,
+            start_time: int = DEFAULT_DELIVERY_START_SECONDS,
+            end_time: int = DEFAULT_DELIVERY_END_SECONDS
+    ) -> "VrpProblem":
+        """
+        Builds a problem from packages, reading the business rules from
+        their notes.
+
+        Args:
+            packages (Sequence[Package]): The packages to deliver.
+            stops (Sequence[int]): The distance matrix index of each package's stop.
+            distances (DistanceRows): The distance matrix, depot first.
+            truck_count, driver_count, capacity, speed, start_time, end_time:
+                See the class attributes.
+
+        Returns:
+            The problem.
+
+        Raises:
+            ValueError: If the rules contradict each other or a group of
+                packages that must share a truck does not fit on one.
+        """
+        rules: BusinessRules = BusinessRules(packages)
+
+        # Package numbers of each "Must be delivered with" group, then every other package on its own
+        members: Dict[int, List[int]] = {}
+        for row, package in enumerate(packages):
+            group: Optional[CoDeliveryGroup] = rules.group_of(package.package_id)
+            members.setdefault(group.group_id if group is not None else len(rules.groups) + row, []).append(row)
+        units: List[List[int]] = list(members.values())
+
+        unit_trucks: List[Optional[List[int]]] = []
+        for unit in units:
+            allowed: Optional[FrozenSet[int]] = None
+            for row in unit:
+                package_rules: Optional[PackageRules] = rules.get(packages[row].package_id)
+                if package_rules is not None and package_rules.trucks is not None:
+                    allowed = package_rules.trucks if allowed is None else allowed & package_rules.trucks
+            trucks: Optional[List[int]] = (
+                None if allowed is None else sorted(truck - 1 for truck in allowed if 0 < truck <= truck_count)
+            )
+            if len(unit) > capacity or trucks == []:
+                raise ValueError(
+                    f"Packages {[packages[row].package_id for row in unit]} must share a truck but cannot"
+                )
+            unit_trucks.append(trucks)
+
+        return VrpProblem(
+            package_ids=[package.package_id for package in packages],
+            stops=list(stops),
+            distances=distances,
+            deadlines=[time_to_seconds(package.delivery_time) for package in packages],
+            releases=[rules.release_time(package.package_id) for package in packages],
+            ready_times=[rules.ready_time(package.package_id) for package in packages],
+            units=units,
+            unit_trucks=unit_trucks,
+            truck_count=truck_count,
+            driver_count=driver_count,
+            capacity=capacity,
+            speed=speed,
+            start_time=start_time,
+            end_time=end_time
+        )
+
+
+class VrpSolution:
+    """
+    A delivery plan: which packages each truck carries, in what order, and
+    when each truck leaves.
+
+    Attributes:
+        routes (List[List[int]]): The package ids on each truck in delivery order.
+        departure_times (List[Optional[int]]): When each truck leaves the
+            depot, in seconds, or None if it stays there.
+        miles (float): The miles driven to the last delivery of every truck.
+        lateness (float): The seconds past deadlines, summed over packages.
+        cost (float): miles + VRP_LATENESS_PENALTY * lateness.
+        iterations (int): The iterations run to find the plan. Solving
+            again with the same seed and max_iterations gives the same plan.
+        seed (int): The seed the solver ran with.
+    """
+
+    __slots__ = ("routes", "departure_times", "miles", "lateness", "cost", "iterations", "seed")
+
+    def __init__(
+            self,
+            routes: List[List[int]],
+            departure_times: List[Optional[int]],
+            miles: float,
+            lateness: float,
+            cost: float,
+            iterations: int,
+            seed: int
+    ) -> None:
+        self.routes: List[List[int]] = routes
+        self.departure_times: List[Optional[int]] = departure_times
+        self.miles: float = miles
+        self.lateness: float = lateness
+        self.cost: float = cost
+        self.iterations: int = iterations
+        self.seed: int = seed
+
+    @property
+    def loads(self) -> List[List[int]]:
+        """
+        The package ids on each truck, in id order.
+        """
+        return [sorted(route) for route in self.routes]
+
+    def __repr__(self):
+        return (
+            f"VrpSolution(miles={self.miles:.1f}, lateness={self.lateness:.0f}s, "
+            f"iterations={self.iterations}, seed={self.seed})"
+        )
+
+
+class _Evaluation:
+    """
+    The cost of a set of routes, and when each truck could leave.
+    """
+
+    __slots__ = ("cost", "miles", "lateness", "departures", "available")
+
+    def __init__(self) -> None:
+        self.cost: float = 0.0
+        self.miles: float = 0.0
+        self.lateness: float = 0.0
+        self.departures: List[Optional[int]] = []
+        self.available: List[float] = []
+
+
+class VrpSolver:
+    """
+    Decides truck loads and delivery order together with adaptive large
+    neighbourhood search.
+
+    Each iteration removes some units from the current plan with one of
+    three destroy operators (random, worst, related) and puts them back
+    with one of two repair operators (greedy, regret-2). Operators that
+    keep finding good plans are picked more often. A new plan is kept when
+    it is better, or with a probability that shrinks as the temperature
+    cools (simulated annealing).
+
+    The temperature cools per iteration, not per second, so a seed always
+    follows the same trajectory; the time budget only decides how far
+    along it the search gets.
+    """
+
+    def __init__(self, problem: VrpProblem, seed: int = VRP_DEFAULT_SEED) -> None:
+        """
+        Prepares a solver.
+
+        Args:
+            problem (VrpProblem): The deliveries to plan.
+            seed (int): Seeds every random choice the solver makes.
+        """
+        self.problem: VrpProblem = problem
+        self.seed: int = seed
+        self._random: random.Random = random.Random(seed)
+        self._unit_of_package: List[int] = [0] * len(problem.package_ids)
+        for unit, packages in enumerate(problem.units):
+            for package in packages:
+                self._unit_of_package[package] = unit
+        self._destroy_operators: List[Callable[[Routes, _Evaluation, int], List[int]]] = [
+            self._random_removal, self._worst_removal, self._related_removal
+        ]
+        self._repair_operators: List[Callable[[Routes, _Evaluation, List[int]], None]] = [
+            self._greedy_insertion, self._regret_insertion
+        ]
+
+    def solve(
+            self,
+            budget_seconds: float = VRP_BUDGET_SECONDS,
+            max_iterations: Optional[int] = None,
+            on_improvement: Optional[Callable[[VrpSolution], None]] = None
+    ) -> VrpSolution:
+        """
+        Searches for the cheapest plan until the budget runs out.
+
+        Args:
+            budget_seconds (float): How long to search for.
+            max_iterations (Optional[int]): Stop after this many iterations
+                even if there is time left, e.g. to replay a run.
+            on_improvement (Optional[Callable[[VrpSolution], None]]): Called
+                with the best plan so far every time it improves.
+
+        Returns:
+            The best plan found.
+
+        Raises:
+            ValueError: If the packages cannot all be loaded.
+        """
+        stop_time: float = time.perf_counter() + budget_seconds
+        problem: VrpProblem = self.problem
+
+        current: Routes = [[] for _ in range(problem.truck_count)]
+        current_evaluation: _Evaluation = self._evaluate(current)
+        self._greedy_insertion(current, current_evaluation, list(range(len(problem.units))))
+        current_evaluation = self._evaluate(current)
+
+        best: Routes = [list(route) for route in current]
+        best_evaluation: _Evaluation = current_evaluation
+        if on_improvement:
+            on_improvement(self._solution(best, best_evaluation, 0))
+
+        temperature: float = max(current_evaluation.cost * VRP_START_TEMPERATURE_RATIO, 1e-3)
+        destroy_weights: List[float] = [1.0] * len(self._destroy_operators)
+        repair_weights: List[float] = [1.0] * len(self._repair_operators)
+        destroy_scores: List[float] = [0.0] * len(destroy_weights)
+        repair_scores: List[float] = [0.0] * len(repair_weights)
+        destroy_uses: List[int] = [0] * len(destroy_weights)
+        repair_uses: List[int] = [0] * len(repair_weights)
+
+        unit_count: int = len(problem.units)
+        fewest_removed: int = max(1, round(unit_count * VRP_MIN_REMOVAL_FRACTION))
+        most_removed: int = max(fewest_removed, round(unit_count * VRP_MAX_REMOVAL_FRACTION))
+
+        iteration: int = 0
+        while unit_count and time.perf_counter() < stop_time and (
+                max_iterations is None or iteration < max_iterations
+        ):
+            iteration += 1
+            destroy: int = self._random.choices(range(len(destroy_weights)), weights=destroy_weights)[0]
+            repair: int = self._random.choices(range(len(repair_weights)), weights=repair_weights)[0]
+
+            candidate: Routes = [list(route) for route in current]
+            removed: List[int] = self._destroy_operators[destroy](
+                candidate, current_evaluation, self._random.randint(fewest_removed, most_removed)
+            )
+            score: float = 0.0
+            try:
+                self._repair_operators[repair](candidate, self._evaluate(candidate), removed)
+                repaired: bool = True
+            except ValueError:
+                # The repair boxed a unit out of every truck it may use, so the candidate is dropped
+                repaired = False
+
+            if repaired:
+                evaluation: _Evaluation = self._evaluate(candidate)
+                if evaluation.cost < best_evaluation.cost - 1e-9:
+                    best, best_evaluation = [list(route) for route in candidate], evaluation
+                    score = VRP_NEW_BEST_SCORE
+                    if on_improvement:
+                        on_improvement(self._solution(best, best_evaluation, iteration))
+                elif evaluation.cost < current_evaluation.cost - 1e-9:
+                    score = VRP_IMPROVED_SCORE
+                elif self._random.random() < math.exp((current_evaluation.cost - evaluation.cost) / temperature):
+                    score = VRP_ACCEPTED_SCORE
+                if score:
+                    current, current_evaluation = candidate, evaluation
+
+            destroy_scores[destroy] += score
+            repair_scores[repair] += score
+            destroy_uses[destroy] += 1
+            repair_uses[repair] += 1
+            if iteration % VRP_SEGMENT_ITERATIONS == 0:
+                _update_weights(destroy_weights, destroy_scores, destroy_uses)
+                _update_weights(repair_weights, repair_scores, repair_uses)
+            temperature *= VRP_COOLING_RATE
+
+        return self._solution(best, best_evaluation, iteration)
+
+    def _solution(self, routes: Routes, evaluation: _Evaluation, iterations: int) -> VrpSolution:
+        """
+        Private method that converts routes of package numbers to a VrpSolution.
+        """
+        package_ids: List[int] = self.problem.package_ids
+        return VrpSolution(
+            routes=[[package_ids[package] for package in route] for route in routes],
+            departure_times=list(evaluation.departures),
+            miles=evaluation.miles,
+            lateness=evaluation.lateness,
+            cost=evaluation.cost,
+            iterations=iterations,
+            seed=self.seed
+        )
+
+    def _evaluate(self, routes: Routes) -> _Evaluation:
+        """
+        Private method that schedules every truck and adds up the miles and
+        lateness. The first driver_count trucks leave at the start of the
+        day; each later truck takes whichever driver gets back to the depot
+        first. No truck leaves before all of its packages have arrived.
+        """
+        problem: VrpProblem = self.problem
+        evaluation: _Evaluation = _Evaluation()
+        drivers_free: List[float] = []
+        for truck, route in enumerate(routes):
+            if truck < problem.driver_count:
+                available: float = problem.start_time
+            else:
+                available = drivers_free[0] if drivers_free else problem.start_time
+            evaluation.available.append(available)
+
+            if not route:
+                evaluation.departures.append(None)
+                if truck < problem.driver_count:
+                    heapq.heappush(drivers_free, available)
+                continue
+            if truck >= problem.driver_count and drivers_free:
+                heapq.heappop(drivers_free)
+
+            departure: float = max(available, max(problem.releases[package] for package in route))
+            miles, lateness, returned = self._schedule(route, departure)
+            evaluation.departures.append(int(departure))
+            evaluation.miles += miles
+            evaluation.lateness += lateness
+            heapq.heappush(drivers_free, returned)
+
+        evaluation.cost = evaluation.miles + VRP_LATENESS_PENALTY * evaluation.lateness
+        return evaluation
+
+    def _schedule(self, route: List[int], departure: float) -> Tuple[float, float, float]:
+        """
+        Private method that drives one route.
+
+        Returns:
+            The miles to the last delivery, the seconds past deadlines and
+            the end of the day, and when the truck is back at the depot.
+        """
+        problem: VrpProblem = self.problem
+        distances: DistanceRows = problem.distances
+        clock: float = departure
+        miles: float = 0.0
+        lateness: float = 0.0
+        previous: int = 0
+        for package in route:
+            stop: int = problem.stops[package]
+            miles += distances[previous][stop]
+            clock += distances[previous][stop] / problem.speed
+            if clock < problem.ready_times[package]:
+                clock = problem.ready_times[package]
+            if clock > problem.deadlines[package]:
+                lateness += clock - problem.deadlines[package]
+            previous = stop
+        if clock > problem.end_time:
+            lateness += clock - problem.end_time
+        return miles, lateness, clock + distances[previous][0] / problem.speed
+
+    def _route_cost(self, route: List[int], available: float) -> float:
+        """
+        Private method that gets the cost of one route for a truck whose
+        driver is available at `available`.
+        """
+        if not route:
+            return 0.0
+        departure: float = max(available, max(self.problem.releases[package] for package in route))
+        miles, lateness, _ = self._schedule(route, departure)
+        return miles + VRP_LATENESS_PENALTY * lateness
+
+    def _best_insertion(
+            self,
+            routes: Routes,
+            evaluation: _Evaluation,
+            unit: int
+    ) -> List[Tuple[float, int, List[int]]]:
+        """
+        Private method that finds where a unit would go on each truck that
+        may carry it. Each package of the unit goes to its cheapest position
+        in turn.
+
+        Returns:
+            (added cost, truck, new route) for each truck, cheapest first.
+        """
+        problem: VrpProblem = self.problem
+        members: List[int] = problem.units[unit]
+        allowed: Optional[List[int]] = problem.unit_trucks[unit]
+        trucks: Sequence[int] = range(problem.truck_count) if allowed is None else allowed
+
+        options: List[Tuple[float, int, List[int]]] = []
+        for truck in trucks:
+            route: List[int] = routes[truck]
+            if len(route) + len(members) > problem.capacity:
+                continue
+            available: float = evaluation.available[truck]
+            base_cost: float = self._route_cost(route, available)
+            new_route: List[int] = route
+            cost: float = base_cost
+            for package in members:
+                best_cost: float = math.inf
+                best_route: List[int] = new_route
+                for position in range(len(new_route) + 1):
+                    trial: List[int] = new_route[:position] + [package] + new_route[position:]
+                    trial_cost: float = self._route_cost(trial, available)
+                    if trial_cost < best_cost:
+                        best_cost, best_route = trial_cost, trial
+                new_route, cost = best_route, best_cost
+            options.append((cost - base_cost, truck, new_route))
+        options.sort(key=lambda option: option[0])
+        return options
+
+    def _greedy_insertion(self, routes: Routes, evaluation: _Evaluation, units: List[int]) -> None:
+        """
+        Private method that puts units back one at a time, in random order,
+        each where it adds the least cost. Units limited to some trucks and
+        large units go first so the space they need is not taken by units
+        that could go anywhere.
+        """
+        problem: VrpProblem = self.problem
+        self._random.shuffle(units)
+        units.sort(key=lambda unit: (problem.unit_trucks[unit] is None, -len(problem.units[unit])))
+        for unit in units:
+            options = self._best_insertion(routes, evaluation, unit)
+            if not options:
+                raise ValueError(f"Packages {self._ids(unit)} fit on no truck")
+            _, truck, route = options[0]
+            routes[truck] = route
+
+    def _regret_insertion(self, routes: Routes, evaluation: _Evaluation, units: List[int]) -> None:
+        """
+        Private method that repeatedly puts back the unit that would cost
+        the most to leave for later: the one with the biggest gap between
+        its best and second best truck.
+        """
+        remaining: List[int] = list(units)
+        while remaining:
+            chosen: Optional[Tuple[float, int, int, List[int]]] = None
+            for unit in remaining:
+                options = self._best_insertion(routes, evaluation, unit)
+                if not options:
+                    raise ValueError(f"Packages {self._ids(unit)} fit on no truck")
+                regret: float = options[1][0] - options[0][0] if len(options) > 1 else math.inf
+                if chosen is None or regret > chosen[0]:
+                    chosen = (regret, unit, options[0][1], options[0][2])
+            _, unit, truck, route = chosen
+            routes[truck] = route
+            remaining.remove(unit)
+
+    def _random_removal(self, routes: Routes, evaluation: _Evaluation, count: int) -> List[int]:
+        """
+        Private method that removes random units.
+        """
+        units: List[int] = self._random.sample(range(len(self.problem.units)), count)
+        self._remove(routes, units)
+        return units
+
+    def _worst_removal(self, routes: Routes, evaluation: _Evaluation, count: int) -> List[int]:
+        """
+        Private method that removes the units whose removal saves the most,
+        with some randomness so the same units are not always picked.
+        """
+        savings: List[Tuple[float, int]] = []
+        for truck, route in enumerate(routes):
+            available: float = evaluation.available[truck]
+            route_cost: float = self._route_cost(route, available)
+            for unit in dict.fromkeys(self._unit_of_package[package] for package in route):
+                members = set(self.problem.units[unit])
+                shorter: List[int] = [package for package in route if package not in members]
+                savings.append((route_cost - self._route_cost(shorter, available), unit))
+        savings.sort(key=lambda saving: -saving[0])
+
+        units: List[int] = []
+        while len(units) < count and savings:
+            units.append(savings.pop(int(len(savings) * self._random.random() ** 3))[1])
+        self._remove(routes, units)
+        return units
+
+    def _related_removal(self, routes: Routes, evaluation: _Evaluation, count: int) -> List[int]:
+        """
+        Private method that removes a random unit and the units closest to
+        it, so they can be reshuffled between the trucks that serve that
+        part of town.
+        """
+        problem: VrpProblem = self.problem
+        seed_unit: int = self._random.randrange(len(problem.units))
+        row: Sequence[float] = problem.distances[problem.stops[problem.units[seed_unit][0]]]
+        others: List[int] = sorted(
+            (unit for unit in range(len(problem.units)) if unit != seed_unit),
+            key=lambda unit: row[problem.stops[problem.units[unit][0]]]
+        )
+
+        units: List[int] = [seed_unit]
+        while len(units) < count and others:
+            units.append(others.pop(int(len(others) * self._random.random() ** 3)))
+        self._remove(routes, units)
+        return units
+
+    def _remove(self, routes: Routes, units: List[int]) -> None:
+        """
+        Private method that takes the packages of some units off their trucks.
+        """
+        removed = {package for unit in units for package in self.problem.units[unit]}
+        for truck, route in enumerate(routes):
+            routes[truck] = [package for package in route if package not in removed]
+
+    def _ids(self, unit: int) -> List[int]:
+        """
+        Private method that gets the package ids of a unit, for error messages.
+        """
+        return [self.problem.package_ids[package] for package in self.problem.units[unit]]
+
+
+def _update_weights(weights: List[float], scores: List[float], uses: List[int]) -> None:
+    """
+    Moves each operator's weight towards its average score over the last
+    segment, and starts a new segment.
+    """
+    for operator in range(len(weights)):
+        if uses[operator]:
+            weights[operator] = (
+                (1 - VRP_REACTION_FACTOR) * weights[operator]
+                + VRP_REACTION_FACTOR * scores[operator] / uses[operator]
+            )
+            weights[operator] = max(weights[operator], 0.1)
+        scores[operator] = 0.0
+        uses[operator] = 0
@@ -0,0 +1,36 @@
+from datetime import time
+
+SECONDS_PER_MINUTE: int = 60
+SECONDS_PER_HOUR: int = 3600
+
+
+def time_to_seconds(clock_time: time) -> int:
+    """
+    Converts a time of day into seconds since midnight.
+
+    Args:
+        clock_time (time): The time of day.
+
+    Returns:
+        int: The number of whole seconds since midnight.
+    """
+    return clock_time.hour * SECONDS_PER_HOUR + clock_time.minute * SECONDS_PER_MINUTE + clock_time.second
+
+
+def seconds_to_time(seconds: float) -> time:
+    """
+    Converts seconds since midnight into a time of day.
+
+    Args:
+        seconds (float): The number of seconds since midnight. Fractions of a
+            second are dropped.
+
+    Returns:
+        time: The time of day.
+    """
+    whole_seconds: int = int(seconds)
+    return time(
+        hour=whole_seconds // SECONDS_PER_HOUR,
+        minute=(whole_seconds // SECONDS_PER_MINUTE) % 60,
+        second=whole_seconds % 60
+    )
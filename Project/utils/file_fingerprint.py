@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+
+class FileFingerprint:
+    """
+    Remembers the modification time, size and content hash of a file so
+    later reads can tell whether the file has really changed.
+
+    Attributes:
+        path: The file being watched.
+        modified_ns: The modification time of the file in nanoseconds.
+        size: The size of the file in bytes.
+        digest: The SHA-256 digest of the file contents.
+    """
+
+    __slots__ = ("path", "modified_ns", "size", "digest")
+
+    def __init__(self, path: str) -> None:
+        """
+        Takes the fingerprint of a file.
+
+        Args:
+            path (str): The file to fingerprint.
+        """
+        self.path: str = path
+        stat: os.stat_result = os.stat(path)
+        self.modified_ns: int = stat.st_mtime_ns
+        self.size: int = stat.st_size
+        self.digest: bytes = self._hash_contents(path)
+
+    def check_for_changes(self) -> bool:
+        """
+        Checks whether the contents of the file have changed since the
+        fingerprint was last taken, and takes it again if so.
+
+        The file is only hashed when its modification time or size differ,
+        so checking an untouched file costs one stat call. A file that was
+        saved without being edited counts as unchanged.
+
+        Returns:
+            bool: True if the contents changed, False otherwise.
+        """
+        stat: os.stat_result = os.stat(self.path)
+        if stat.st_mtime_ns == self.modified_ns and stat.st_size == self.size:
+            return False
+
+        digest: bytes = self._hash_contents(self.path)
+        changed: bool = digest != self.digest
+        self.modified_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.digest = digest
+        return changed
+
+    @staticmethod
+    def _hash_contents(path: str) -> bytes:
+        """
+        Private method that hashes a file in 1 MiB blocks.
+        """
+        content_hash = hashlib.sha256()
+        with open(path, 'rb') as source:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                content_hash.update(chunk)
+        return content_hash.digest()